@@ -1,15 +1,24 @@
 """
 AI Travel Planner - 主应用文件
 """
-from flask import Flask, render_template, request, jsonify, session
+from flask import Flask, render_template, request, jsonify, session, Response, stream_with_context
 from flask_cors import CORS
-from flask_socketio import SocketIO, emit
+from flask_socketio import SocketIO, emit, join_room
+from werkzeug.exceptions import RequestEntityTooLarge
 import os
 import json
 
 from config import Config
-from services.speech_recognition_service import SpeechRecognitionSyncWrapper
+from services.speech_session_manager import SpeechSessionManager
+from services.speech_loop_host import SpeechLoopHost
+from services.result_throttle import InterimResultThrottle
+from services.speech_recognition_service import SpeechRecognitionService
+from services.batch_transcription_service import BatchTranscriptionService, AudioTooLongError
 from services.deepseek_service import DeepSeekService
+from services.plan_cache import PlanCache
+from services.plan_similarity_index import PlanSimilarityIndex
+from services.plan_job_queue import PlanJobQueue
+from services.singleflight import SingleFlight
 from services.supabase_service import SupabaseService
 from services.amap_service import AmapService
 from services.preference_service import PreferenceService
@@ -35,17 +44,82 @@ print(f"Supabase URL: {'已设置' if Config.SUPABASE_URL else '❌ 未设置'}"
 print("=" * 60)
 
 # 初始化服务
-speech_recognition_service = SpeechRecognitionSyncWrapper(
+# 所有语音识别协程共享的常驻事件循环
+speech_loop_host = SpeechLoopHost(num_loops=Config.SPEECH_EVENT_LOOPS)
+# 语音识别按连接（sid）管理，每个说话人独占一个识别会话
+speech_session_manager = SpeechSessionManager(
     app_id=Config.SPEECH_APP_ID,
     access_key=Config.SPEECH_ACCESS_KEY,
     secret_key=Config.SPEECH_SECRET_KEY,
-    model_id=Config.SPEECH_MODEL_ID
+    model_id=Config.SPEECH_MODEL_ID,
+    max_sessions=Config.SPEECH_MAX_SESSIONS,
+    loop_host=speech_loop_host,
+    service_options={
+        'compression': Config.SPEECH_AUDIO_COMPRESSION,
+        'vad_enabled': Config.SPEECH_VAD_ENABLED,
+        'vad_end_silence_ms': Config.SPEECH_VAD_END_SILENCE_MS,
+        'url': Config.SPEECH_ASR_URL,
+        'reconnect_attempts': Config.SPEECH_RECONNECT_ATTEMPTS,
+        'replay_seconds': Config.SPEECH_REPLAY_SECONDS
+    },
+    pool_size=Config.SPEECH_POOL_SIZE,
+    pool_idle_ttl=Config.SPEECH_POOL_IDLE_TTL,
+    connect_timeout=Config.SPEECH_CONNECT_TIMEOUT,
+    ingest_max_frames=Config.SPEECH_INGEST_MAX_FRAMES,
+    ingest_policy=Config.SPEECH_INGEST_POLICY
+)
+# 每个连接（sid）的中间结果节流器，结束识别时取出被节流的最后一段中间结果
+interim_throttles = {}
+# 上传音频批量转写（每次读取最新的 Config 凭据，不启用 VAD 以免提前结束）
+batch_transcription_service = BatchTranscriptionService(
+    loop_host=speech_loop_host,
+    service_factory=lambda: SpeechRecognitionService(
+        app_id=Config.SPEECH_APP_ID,
+        access_key=Config.SPEECH_ACCESS_KEY,
+        secret_key=Config.SPEECH_SECRET_KEY,
+        model_id=Config.SPEECH_MODEL_ID,
+        compression=Config.SPEECH_AUDIO_COMPRESSION,
+        url=Config.SPEECH_ASR_URL,
+        reconnect_attempts=Config.SPEECH_RECONNECT_ATTEMPTS,
+        replay_seconds=Config.SPEECH_REPLAY_SECONDS
+    ),
+    max_workers=Config.SPEECH_BATCH_WORKERS,
+    max_pending=Config.SPEECH_BATCH_MAX_PENDING,
+    max_seconds=Config.SPEECH_BATCH_MAX_SECONDS
+)
+# 旅行计划生成结果缓存（配置重载重建 DeepSeekService 时沿用同一实例）
+plan_cache = PlanCache(
+    ttl=Config.PLAN_CACHE_TTL,
+    max_entries=Config.PLAN_CACHE_MAX_ENTRIES,
+    max_bytes=Config.PLAN_CACHE_MAX_BYTES,
+    disk_dir=Config.PLAN_CACHE_DIR
+) if Config.PLAN_CACHE_ENABLED else None
+# 近似需求索引（措辞不同的同一需求复用缓存中的计划）
+plan_index = PlanSimilarityIndex(
+    threshold=Config.PLAN_SIMILARITY_THRESHOLD,
+    max_entries=Config.PLAN_SIMILARITY_MAX_ENTRIES
+) if plan_cache is not None and Config.PLAN_SIMILARITY_ENABLED else None
+# 合并并发的相同计划请求（配置重载后沿用同一实例，进行中的调用仍可被合并）
+plan_singleflight = SingleFlight('plan-singleflight') if Config.PLAN_SINGLEFLIGHT_ENABLED else None
+deepseek_service = DeepSeekService(
+    plan_cache=plan_cache,
+    plan_index=plan_index,
+    singleflight=plan_singleflight,
+    singleflight_timeout=Config.PLAN_SINGLEFLIGHT_TIMEOUT
 )
-deepseek_service = DeepSeekService()
 supabase_service = SupabaseService()
 amap_service = AmapService()
 preference_service = PreferenceService()
 expense_service = ExpenseService()
+# 异步计划生成任务（工作线程执行 _run_plan_job，状态变化推送到 plan_job:<id> 房间）
+plan_job_queue = PlanJobQueue(
+    runner=lambda payload: _run_plan_job(payload),
+    max_workers=Config.PLAN_JOB_WORKERS,
+    max_queue=Config.PLAN_JOB_MAX_QUEUE,
+    max_per_user=Config.PLAN_JOB_MAX_PER_USER,
+    result_ttl=Config.PLAN_JOB_RESULT_TTL,
+    on_update=lambda job: socketio.emit('plan_job_update', job, to=f"plan_job:{job['id']}")
+)
 
 @app.route('/')
 def landing():
@@ -223,10 +297,9 @@ def save_config_to_env():
             pass
 
         # 重新初始化服务以使用新配置；如果创建失败则回退到现有实例（安全重试）
-        global deepseek_service, speech_recognition_service, supabase_service, amap_service, preference_service, expense_service
+        global deepseek_service, supabase_service, amap_service, preference_service, expense_service
 
         existing_deepseek = globals().get('deepseek_service')
-        existing_speech = globals().get('speech_recognition_service')
         existing_supabase = globals().get('supabase_service')
         existing_amap = globals().get('amap_service')
 
@@ -238,19 +311,23 @@ def save_config_to_env():
 
         # 创建新的 service 实例（失败则回退）
         try:
-            new_deepseek = DeepSeekService()
+            new_deepseek = DeepSeekService(
+                plan_cache=plan_cache,
+                plan_index=plan_index,
+                singleflight=plan_singleflight,
+                singleflight_timeout=Config.PLAN_SINGLEFLIGHT_TIMEOUT,
+                reuse_from=existing_deepseek
+            )
         except Exception:
             new_deepseek = existing_deepseek
 
-        try:
-            new_speech = SpeechRecognitionSyncWrapper(
-                app_id=Config.SPEECH_APP_ID,
-                access_key=Config.SPEECH_ACCESS_KEY,
-                secret_key=Config.SPEECH_SECRET_KEY,
-                model_id=Config.SPEECH_MODEL_ID
-            )
-        except Exception:
-            new_speech = existing_speech
+        # 语音识别凭据仅对新建的会话生效，正在进行的会话不受影响
+        speech_session_manager.update_credentials(
+            app_id=Config.SPEECH_APP_ID,
+            access_key=Config.SPEECH_ACCESS_KEY,
+            secret_key=Config.SPEECH_SECRET_KEY,
+            model_id=Config.SPEECH_MODEL_ID
+        )
 
         try:
             new_supabase = SupabaseService()
@@ -264,7 +341,6 @@ def save_config_to_env():
 
         # 指定回退或新的实例到全局变量
         deepseek_service = new_deepseek
-        speech_recognition_service = new_speech
         supabase_service = new_supabase
         amap_service = new_amap
 
@@ -279,56 +355,143 @@ def save_config_to_env():
         traceback.print_exc()
         return jsonify({'success': False, 'message': str(e)}), 500
 
+def _prepare_plan_request(data):
+    """解析生成计划的请求参数，返回 (user_input, augmented_input, user_preferences, trip_days, user_id)"""
+    user_input = data.get('input', '')
+    departure_date = data.get('departure_date')
+    trip_days = data.get('trip_days')
+    user_id = data.get('user_id')
+    
+    # 获取用户偏好设置
+    user_preferences = None
+    if user_id and supabase_service.is_configured():
+        user_preferences = preference_service.get_user_preferences(user_id)
+    
+    # 如果前端提供了出发日期或天数，追加到提示
+    augmented_input = user_input
+    if departure_date:
+        augmented_input = augmented_input + f"\n\n出发日期: {departure_date}"
+    if trip_days:
+        augmented_input = augmented_input + f"\n\n预计出行天数: {trip_days}"
+    
+    return user_input, augmented_input, user_preferences, trip_days, user_id
+
+def _finish_plan(plan, user_input, trip_days, user_id):
+    """补全模型遗漏的字段，并为登录用户保存到Supabase"""
+    # 如果模型未返回 duration 字段但前端输入了 trip_days，则填充
+    try:
+        if plan and isinstance(plan, dict):
+            if (not plan.get('duration') or str(plan.get('duration')).strip() == '') and trip_days:
+                plan['duration'] = str(trip_days)
+            # 填充 total_budget 的默认值
+            if not plan.get('total_budget') and plan.get('budget'):
+                try:
+                    plan['total_budget'] = float(plan.get('budget'))
+                except Exception:
+                    plan['total_budget'] = 0
+            if 'total_budget' not in plan:
+                plan['total_budget'] = plan.get('total_budget', 0)
+    except Exception:
+        pass
+    
+    # 保存到Supabase
+    if user_id and supabase_service.is_configured():
+        plan_id = supabase_service.save_travel_plan(user_id, plan, user_input)
+        plan['id'] = plan_id
+    
+    return plan
+
 @app.route('/api/travel/plan', methods=['POST'])
 def create_travel_plan():
     """创建旅行计划"""
     try:
-        data = request.json
-        user_input = data.get('input', '')
-        departure_date = data.get('departure_date')
-        trip_days = data.get('trip_days')
-        user_id = data.get('user_id')
-        
-        # 获取用户偏好设置
-        user_preferences = None
-        if user_id and supabase_service.is_configured():
-            user_preferences = preference_service.get_user_preferences(user_id)
-        
-        # 如果前端提供了出发日期或天数，追加到提示
-        augmented_input = user_input
-        if departure_date:
-            augmented_input = augmented_input + f"\n\n出发日期: {departure_date}"
-        if trip_days:
-            augmented_input = augmented_input + f"\n\n预计出行天数: {trip_days}"
+        user_input, augmented_input, user_preferences, trip_days, user_id = _prepare_plan_request(request.json)
 
         # 使用DeepSeek生成旅行计划（结合用户偏好）
         plan = deepseek_service.generate_travel_plan(augmented_input, user_preferences)
-
-        # 如果模型未返回 duration 字段但前端输入了 trip_days，则填充
-        try:
-            if plan and isinstance(plan, dict):
-                if (not plan.get('duration') or str(plan.get('duration')).strip() == '') and trip_days:
-                    plan['duration'] = str(trip_days)
-                # 填充 total_budget 的默认值
-                if not plan.get('total_budget') and plan.get('budget'):
-                    try:
-                        plan['total_budget'] = float(plan.get('budget'))
-                    except Exception:
-                        plan['total_budget'] = 0
-                if 'total_budget' not in plan:
-                    plan['total_budget'] = plan.get('total_budget', 0)
-        except Exception:
-            pass
-        
-        # 保存到Supabase
-        if user_id and supabase_service.is_configured():
-            plan_id = supabase_service.save_travel_plan(user_id, plan, user_input)
-            plan['id'] = plan_id
+        plan = _finish_plan(plan, user_input, trip_days, user_id)
         
         return jsonify({'success': True, 'plan': plan})
     except Exception as e:
         return jsonify({'success': False, 'message': str(e)}), 500
 
+@app.route('/api/travel/plan/stream', methods=['POST'])
+def create_travel_plan_stream():
+    """流式创建旅行计划（NDJSON，每行一个事件）
+
+    - {"type": "delta", "content": "..."}：模型输出片段，到达即转发
+    - {"type": "item", "key": "itinerary", "index": 0, "value": {...}}：某一天行程（或餐厅、住宿推荐）闭合即转发
+    - {"type": "field", "key": "destination", "value": "..."}：其他顶层字段闭合即转发
+    - {"type": "plan", "plan": {...}}：完整计划（已补全字段并保存）
+    - {"type": "error", "message": "..."}：生成失败
+    """
+    try:
+        user_input, augmented_input, user_preferences, trip_days, user_id = _prepare_plan_request(request.json)
+    except Exception as e:
+        return jsonify({'success': False, 'message': str(e)}), 500
+
+    def generate():
+        try:
+            for event in deepseek_service.generate_travel_plan_stream(augmented_input, user_preferences):
+                if event['type'] == 'plan':
+                    event['plan'] = _finish_plan(event['plan'], user_input, trip_days, user_id)
+                yield json.dumps(event, ensure_ascii=False) + '\n'
+        except Exception as e:
+            yield json.dumps({'type': 'error', 'message': str(e)}, ensure_ascii=False) + '\n'
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype='application/x-ndjson',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+def _run_plan_job(data):
+    """在任务线程中生成并保存计划（使用执行时最新的服务实例）"""
+    user_input, augmented_input, user_preferences, trip_days, user_id = _prepare_plan_request(data)
+    plan = deepseek_service.generate_travel_plan(augmented_input, user_preferences)
+    return _finish_plan(plan, user_input, trip_days, user_id)
+
+@app.route('/api/travel/jobs', methods=['POST'])
+def submit_travel_plan_job():
+    """提交异步计划生成任务，立即返回任务 ID
+
+    之后轮询 GET /api/travel/jobs/<id>，或通过 Socket.IO 发送 subscribe_plan_job 订阅 plan_job_update 推送。
+    """
+    data = request.json or {}
+    if not data.get('input'):
+        return jsonify({'success': False, 'message': '缺少input参数'}), 400
+    # 未登录用户按来源地址限制并发
+    user_key = data.get('user_id') or request.remote_addr or 'anonymous'
+    try:
+        job = plan_job_queue.submit(str(user_key), data)
+    except RuntimeError as e:
+        return jsonify({'success': False, 'message': str(e)}), 429
+    return jsonify({'success': True, 'job': job}), 202
+
+@app.route('/api/travel/jobs/metrics', methods=['GET'])
+def get_travel_plan_job_metrics():
+    """获取计划生成任务队列统计（排队深度、执行中任务数、等待 / 执行耗时直方图、拒绝次数）"""
+    return jsonify({'success': True, 'metrics': plan_job_queue.stats()})
+
+@app.route('/api/travel/jobs/<job_id>', methods=['GET'])
+def get_travel_plan_job(job_id):
+    """查询计划生成任务状态（queued / running / succeeded / failed），成功时附带计划"""
+    job = plan_job_queue.get(job_id)
+    if job is None:
+        return jsonify({'success': False, 'message': '任务不存在或已过期'}), 404
+    return jsonify({'success': True, 'job': job})
+
+@app.route('/api/travel/cache/stats', methods=['GET'])
+def get_plan_cache_stats():
+    """获取旅行计划缓存（及近似需求索引、请求合并）的命中/未命中统计"""
+    return jsonify({
+        'success': True,
+        'enabled': plan_cache is not None,
+        'stats': plan_cache.stats() if plan_cache is not None else None,
+        'similarity': plan_index.stats() if plan_index is not None else None,
+        'singleflight': plan_singleflight.stats() if plan_singleflight is not None else None
+    })
+
 @app.route('/api/travel/plans', methods=['GET'])
 def get_travel_plans():
     """获取用户的旅行计划列表"""
@@ -416,62 +579,164 @@ def register():
     except Exception as e:
         return jsonify({'success': False, 'message': str(e)}), 500
 
+@app.route('/api/speech/stats', methods=['GET'])
+def get_speech_stats():
+    """获取语音识别会话统计（活跃会话数、启动耗时、接收队列深度与丢弃计数等）"""
+    return jsonify({'success': True, 'stats': speech_session_manager.stats()})
+
+@app.route('/api/speech/metrics', methods=['GET'])
+def get_speech_metrics():
+    """获取语音链路延迟直方图（首个中间结果延迟、停止后最终结果延迟、每会话上行帧率）"""
+    return jsonify({'success': True, 'metrics': speech_session_manager.metrics_snapshot()})
+
+@app.route('/api/speech/transcribe', methods=['POST'])
+def transcribe_audio():
+    """上传音频文件转写（WAV 或 16bit 裸 PCM）
+
+    multipart 表单字段 file，或直接以请求体上传；
+    裸 PCM 可通过 sample_rate / channels 参数说明格式（默认 16000 / 1）。
+    请求体超过 MAX_CONTENT_LENGTH 或音频超过 SPEECH_BATCH_MAX_SECONDS 时返回 413。
+    """
+    try:
+        upload = request.files.get('file')
+        data = upload.read() if upload else request.get_data()
+        if not data:
+            return jsonify({'success': False, 'message': '缺少音频数据'}), 400
+        
+        sample_rate = int(request.values.get('sample_rate', 16000))
+        channels = int(request.values.get('channels', 1))
+        
+        result = batch_transcription_service.transcribe(data, sample_rate=sample_rate, channels=channels)
+        return jsonify({'success': True, **result})
+    except RequestEntityTooLarge:
+        return jsonify({'success': False, 'message': f'上传内容过大，最大 {Config.SPEECH_BATCH_MAX_BYTES / (1024 * 1024):.3g}MB'}), 413
+    except AudioTooLongError as e:
+        return jsonify({'success': False, 'message': str(e)}), 413
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+    except RuntimeError as e:
+        return jsonify({'success': False, 'message': str(e)}), 503
+    except Exception as e:
+        return jsonify({'success': False, 'message': str(e)}), 500
+
 @socketio.on('connect')
 def handle_connect():
     """WebSocket连接"""
     print('Client connected')
     emit('connected', {'status': 'connected'})
 
+@socketio.on('disconnect')
+def handle_disconnect():
+    """WebSocket断开，清理该连接的语音识别会话"""
+    sid = request.sid
+    if speech_session_manager.get(sid):
+        speech_session_manager.stop(sid)
+        print(f"[OK] 连接断开，已清理语音识别会话: {sid}")
+    _close_interim_throttle(sid)
+    print('Client disconnected')
+
+def _close_interim_throttle(sid):
+    """移除并关闭连接的中间结果节流器（取消未触发的补发）"""
+    throttle = interim_throttles.pop(sid, None)
+    if throttle is not None:
+        throttle.close()
+
+@socketio.on('subscribe_plan_job')
+def handle_subscribe_plan_job(data=None):
+    """订阅计划生成任务的状态推送（plan_job_update），订阅时立即推送一次当前状态"""
+    job_id = (data or {}).get('job_id')
+    job = plan_job_queue.get(job_id) if job_id else None
+    if job is None:
+        emit('error', {'message': '任务不存在或已过期'})
+        return
+    join_room(f"plan_job:{job_id}")
+    emit('plan_job_update', job)
+
 @socketio.on('start_recording')
-def handle_start_recording():
-    """开始语音识别"""
+def handle_start_recording(data=None):
+    """开始语音识别
+
+    data 可携带客户端实际音频格式 {'sample_rate': 48000, 'channels': 1}，
+    缺省按 16kHz 单声道处理；非 16kHz 单声道的音频在服务端重采样。
+    """
+    sid = request.sid
     try:
-        # 定义回调函数
+        audio_format = data if isinstance(data, dict) else {}
+        sample_rate = audio_format.get('sample_rate') or 16000
+        channels = audio_format.get('channels') or 1
+        
+        # 中间结果节流与增量下发（最终结果总是完整下发，被节流跳过的最新中间结果在间隔结束后补发）
+        throttle = InterimResultThrottle(
+            min_interval=Config.SPEECH_INTERIM_MIN_INTERVAL_MS / 1000.0,
+            delta=Config.SPEECH_INTERIM_DELTA,
+            on_trailing=lambda message: socketio.emit('recognition_result', message, to=sid)
+        )
+        _close_interim_throttle(sid)
+        interim_throttles[sid] = throttle
+        
+        # 定义回调函数（结果只发送给发起识别的连接）
         def on_result(result):
             """接收到识别结果"""
             text = result.get('text', '')
             is_final = result.get('is_final', False)
             
-            socketio.emit('recognition_result', {
-                'text': text,
-                'is_final': is_final
-            })
-            print(f"[语音识别] {'最终' if is_final else '临时'}结果: {text}")
+            message = throttle.process(text, is_final)
+            if message is None:
+                return
+            socketio.emit('recognition_result', message, to=sid)
+            if is_final:
+                print(f"[语音识别] 最终结果: {text}")
         
         def on_error(error_msg):
             """接收到错误"""
-            socketio.emit('error', {'message': error_msg})
+            socketio.emit('error', {'message': error_msg}, to=sid)
             print(f"[X] 语音识别错误: {error_msg}")
         
-        # 启动语音识别服务
-        speech_recognition_service.start(
+        def on_auto_end():
+            """服务端检测到尾部静音并已发送结束信号"""
+            trailing = throttle.flush()
+            if trailing is not None:
+                socketio.emit('recognition_result', trailing, to=sid)
+            socketio.emit('recording_auto_stopped', {'message': '检测到静音，语音识别已自动结束'}, to=sid)
+        
+        # 为当前连接启动语音识别会话
+        speech_session = speech_session_manager.start(
+            sid,
             on_result=on_result,
-            on_error=on_error
+            on_error=on_error,
+            on_auto_end=on_auto_end,
+            sample_rate=sample_rate,
+            channels=channels
         )
         
         # 检查是否成功连接
-        if not speech_recognition_service.is_connected:
+        if not speech_session.is_connected:
+            speech_session_manager.stop(sid)
+            _close_interim_throttle(sid)
             raise Exception("语音识别服务连接失败")
         
         emit('recording_started', {'status': 'success', 'message': '语音识别已启动，请开始说话'})
-        print("[OK] 语音识别已启动")
+        print(f"[OK] 语音识别已启动 (sid={sid}, 音频格式: {sample_rate}Hz/{channels}ch, "
+              f"活跃会话: {speech_session_manager.active_count})")
         
     except Exception as e:
+        _close_interim_throttle(sid)
         emit('error', {'message': f'启动语音识别失败: {str(e)}'})
         print(f"[X] 启动语音识别失败: {str(e)}")
 
 @socketio.on('audio_data')
 def handle_audio_data(data):
-    """接收音频数据并发送给语音识别服务（流式）"""
+    """接收音频数据并发送给语音识别服务（流式）
+
+    data 为二进制附件（客户端发送的 ArrayBuffer，到达时为 bytes），
+    或 Base64 字符串（兼容模式）。
+    """
     try:
-        if not speech_recognition_service.is_connected:
+        # 发送音频数据到当前连接的语音识别会话
+        if not speech_session_manager.send_audio(request.sid, data):
             print("[WARN] 语音识别服务未连接，忽略音频数据")
             return
         
-        # 发送音频数据到语音识别服务
-        speech_recognition_service.send_audio(data)
-        # print(f"[语音识别] 已发送音频数据")
-        
     except Exception as e:
         print(f"[X] 处理音频数据错误: {str(e)}")
         emit('error', {'message': str(e)})
@@ -480,8 +745,15 @@ def handle_audio_data(data):
 def handle_stop_recording():
     """停止语音识别"""
     try:
-        if speech_recognition_service.is_connected:
-            speech_recognition_service.stop()
+        stopped = speech_session_manager.stop(request.sid)
+        # 识别流可能不带最终结果就结束：先补发被节流的最后一段中间结果
+        throttle = interim_throttles.pop(request.sid, None)
+        if throttle is not None:
+            trailing = throttle.flush()
+            throttle.close()
+            if trailing is not None:
+                emit('recognition_result', trailing)
+        if stopped:
             emit('recording_stopped', {'status': 'success', 'message': '语音识别已结束'})
             print("[OK] 语音识别已停止")
         else:
@@ -0,0 +1,176 @@
+"""
+并发语音会话压测：N 个 SpeechRecognitionService 同时向模拟 ASR 服务推流
+
+默认在子进程中启动 benchmarks/mock_asr_server.py（每个音频包返回一条中间结果），
+因此中间结果可与发送的音频包按顺序一一对应。统计：
+- 中间结果延迟：音频包发出 -> 对应中间结果到达
+- 首个中间结果延迟：第一个音频包发出 -> 第一条中间结果到达
+- 最终结果延迟：发送结束信号 -> 最终结果到达
+- 每会话 CPU：客户端进程 CPU 时间 / 会话数（模拟服务在独立进程中，不计入）
+- --drop-after N：模拟服务在每个会话的首条连接收到 N 个音频包后断开，统计重连次数与
+  最终文本是否完整（重连后的中间结果不再计入中间结果延迟）
+
+用法:
+    python benchmarks/bench_asr_sessions.py --sessions 50 --wav a.wav b.wav
+    python benchmarks/bench_asr_sessions.py --sessions 200 --seconds 5 --no-pacing
+    python benchmarks/bench_asr_sessions.py --url ws://127.0.0.1:8765/   # 使用已启动的模拟服务
+"""
+import argparse
+import asyncio
+import contextlib
+import math
+import os
+import struct
+import subprocess
+import sys
+import time
+import wave
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import aiohttp
+
+from services.speech_recognition_service import SpeechRecognitionService
+
+FRAME_BYTES = 6400  # 200ms @ 16kHz, 16bit, mono
+FRAME_SECONDS = 0.2
+
+
+def load_wav(path: str) -> bytes:
+    with wave.open(path, 'rb') as wav:
+        if wav.getframerate() != 16000 or wav.getnchannels() != 1 or wav.getsampwidth() != 2:
+            raise SystemExit(f"{path}: 需要 16kHz / 单声道 / 16bit WAV")
+        return wav.readframes(wav.getnframes())
+
+
+def synth_pcm(seconds: float) -> bytes:
+    samples = int(16000 * seconds)
+    return struct.pack(f'<{samples}h', *(int(8000 * math.sin(2 * math.pi * 220 * i / 16000)) for i in range(samples)))
+
+
+def percentile(values, p):
+    if not values:
+        return float('nan')
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p / 100))]
+
+
+async def run_session(index: int, url: str, pcm: bytes, session: aiohttp.ClientSession, pacing: bool,
+                      stats: dict):
+    # 每个会话使用独立的 App Key，便于模拟服务按会话注入断线
+    service = SpeechRecognitionService(f'bench-{index}', 'bench', 'bench', 'bench', url=url)
+    sent_at = []
+    first_sent = None
+    final_event = asyncio.Event()
+    end_sent_at = None
+    results = 0
+
+    def on_result(result):
+        nonlocal results
+        now = time.perf_counter()
+        if result.get('is_final'):
+            stats['final'].append(now - end_sent_at)
+            stats['final_chars'].append(len(result.get('text', '')))
+            final_event.set()
+            return
+        if service.reconnects:
+            return
+        if results == 0:
+            stats['first_partial'].append(now - first_sent)
+        if results < len(sent_at):
+            stats['partial'].append(now - sent_at[results])
+        results += 1
+
+    def on_error(message):
+        stats['errors'] += 1
+        final_event.set()
+
+    service.set_callbacks(on_result=on_result, on_error=on_error)
+    service.use_session(session)
+    started = time.perf_counter()
+    await service.connect()
+    stats['connect'].append(time.perf_counter() - started)
+
+    try:
+        view = memoryview(pcm)
+        for offset in range(0, len(view) - FRAME_BYTES + 1, FRAME_BYTES):
+            now = time.perf_counter()
+            if first_sent is None:
+                first_sent = now
+            sent_at.append(now)
+            await service.send_audio(view[offset:offset + FRAME_BYTES])
+            if pacing:
+                await asyncio.sleep(FRAME_SECONDS)
+        end_sent_at = time.perf_counter()
+        await service.send_end_signal()
+        await asyncio.wait_for(final_event.wait(), timeout=30)
+    finally:
+        stats['reconnects'] += service.reconnects
+        await service.disconnect()
+
+
+async def run(args, pcms):
+    stats = {'connect': [], 'partial': [], 'first_partial': [], 'final': [], 'final_chars': [],
+             'errors': 0, 'reconnects': 0}
+    connector = aiohttp.TCPConnector(limit=0)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        cpu_start = time.process_time()
+        wall_start = time.perf_counter()
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            await asyncio.gather(*(
+                run_session(i, args.url, pcms[i % len(pcms)], session, not args.no_pacing, stats)
+                for i in range(args.sessions)
+            ))
+        wall = time.perf_counter() - wall_start
+        cpu = time.process_time() - cpu_start
+    return stats, wall, cpu
+
+
+def main():
+    parser = argparse.ArgumentParser(description='并发语音会话压测')
+    parser.add_argument('--sessions', type=int, default=20)
+    parser.add_argument('--wav', nargs='*', default=[], help='16kHz 单声道 16bit WAV 文件（轮流分配给各会话）')
+    parser.add_argument('--seconds', type=float, default=3.0, help='未提供 WAV 时合成音频的时长')
+    parser.add_argument('--no-pacing', action='store_true', help='不按实时速度推流')
+    parser.add_argument('--url', help='已启动的模拟服务地址；不提供则自动启动')
+    parser.add_argument('--latency-ms', type=float, default=50.0, help='自动启动的模拟服务的响应延迟')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--drop-after', type=int, default=0, help='自动启动的模拟服务在每个会话收到 N 个音频包后断开一次')
+    args = parser.parse_args()
+
+    pcms = [load_wav(path) for path in args.wav] or [synth_pcm(args.seconds)]
+
+    server = None
+    if not args.url:
+        args.url = f"ws://127.0.0.1:{args.port}/"
+        server = subprocess.Popen(
+            [sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'mock_asr_server.py'),
+             '--port', str(args.port), '--latency-ms', str(args.latency_ms), '--drop-after', str(args.drop_after)],
+            stdout=subprocess.PIPE, text=True
+        )
+        server.stdout.readline()  # 等待启动完成
+
+    try:
+        stats, wall, cpu = asyncio.run(run(args, pcms))
+    finally:
+        if server:
+            server.terminate()
+            server.wait()
+
+    audio_seconds = sum(len(pcms[i % len(pcms)]) for i in range(args.sessions)) / (16000 * 2)
+    print(f"会话数: {args.sessions}  音频总时长: {audio_seconds:.1f}s  墙钟: {wall:.2f}s  "
+          f"错误: {stats['errors']}  重连: {stats['reconnects']}")
+    if stats['final_chars']:
+        print(f"最终文本字数: 最少 {min(stats['final_chars'])}  最多 {max(stats['final_chars'])}")
+    print(f"客户端 CPU: {cpu:.3f}s  每会话: {cpu / args.sessions * 1000:.2f}ms  "
+          f"每音频秒: {cpu / audio_seconds * 1000:.3f}ms")
+    print(f"{'指标':<12} {'样本':>6} {'p50(ms)':>9} {'p90(ms)':>9} {'p99(ms)':>9}")
+    for name, key in (('连接+握手', 'connect'), ('中间结果', 'partial'),
+                      ('首个中间结果', 'first_partial'), ('最终结果', 'final')):
+        values = stats[key]
+        print(f"{name:<12} {len(values):>6} {percentile(values, 50) * 1000:>9.1f} "
+              f"{percentile(values, 90) * 1000:>9.1f} {percentile(values, 99) * 1000:>9.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+"""
+音频分帧微基准：对比旧的 bytearray 切片方式与 AudioRingBuffer
+
+在不同积压量（backlog）下测量每帧“写入一帧 + 取出一帧”的耗时。
+旧实现每帧都要拷贝整个积压缓冲区，耗时随积压线性增长；环形缓冲区应保持平稳。
+
+用法: python benchmarks/bench_audio_framer.py
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.audio_framer import AudioRingBuffer
+
+FRAME = 6400  # 200ms @ 16kHz, 16bit, mono
+# 客户端每次发送 4096 个采样（8192 字节），与帧大小不对齐，覆盖跨界场景
+INCOMING = 8192
+BACKLOG_SECONDS = [0, 1, 10, 60, 300]
+ITERATIONS = 2000
+
+
+def bench_legacy(backlog_bytes):
+    buf = bytearray(backlog_bytes)
+    data = bytes(INCOMING)
+    frames = 0
+    start = time.perf_counter()
+    while frames < ITERATIONS:
+        buf.extend(data)
+        while len(buf) - backlog_bytes >= FRAME:
+            bytes(buf[:FRAME])  # 旧实现取帧时的复制
+            buf = buf[FRAME:]
+            frames += 1
+    return (time.perf_counter() - start) / frames
+
+
+def bench_ring(backlog_bytes):
+    ring = AudioRingBuffer(FRAME)
+    ring.write(bytes(backlog_bytes))
+    data = bytes(INCOMING)
+    frames = 0
+    start = time.perf_counter()
+    while frames < ITERATIONS:
+        ring.write(data)
+        while len(ring) - backlog_bytes >= FRAME:
+            ring.read_frame()
+            frames += 1
+    return (time.perf_counter() - start) / frames
+
+
+def main():
+    print(f"{'积压(秒)':>8} {'积压(KB)':>10} {'旧实现 us/帧':>14} {'环形缓冲 us/帧':>16}")
+    for seconds in BACKLOG_SECONDS:
+        backlog = seconds * 16000 * 2
+        legacy = bench_legacy(backlog) * 1e6
+        ring = bench_ring(backlog) * 1e6
+        print(f"{seconds:>8} {backlog // 1024:>10} {legacy:>14.2f} {ring:>16.2f}")
+
+
+if __name__ == '__main__':
+    main()
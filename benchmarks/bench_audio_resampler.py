@@ -0,0 +1,55 @@
+"""
+服务端重采样 / 混音基准：常见浏览器采样率下单核处理 1 秒音频所需的 CPU 时间
+
+按浏览器实际送来的块大小（ScriptProcessorNode 4096 样本）流式输入 60 秒合成音频，
+输出实时倍率（音频时长 / CPU 时间），数值越大越好。
+
+用法: python benchmarks/bench_audio_resampler.py
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from services.audio_resampler import AudioResampler
+
+SECONDS = 60
+BLOCK_SAMPLES = 4096
+FORMATS = ((48000, 1), (48000, 2), (44100, 1), (44100, 2), (22050, 1), (8000, 1), (16000, 2))
+
+
+def make_pcm(rate, channels):
+    rng = np.random.default_rng(42)
+    t = np.arange(rate * SECONDS) / rate
+    signal = 0.3 * np.sin(2 * np.pi * 220 * t) + 0.15 * np.sin(2 * np.pi * 660 * t) + rng.normal(0, 0.05, len(t))
+    samples = (np.clip(signal, -1, 1) * 32767).astype('<i2')
+    return np.repeat(samples, channels).tobytes()
+
+
+def bench(rate, channels):
+    pcm = make_pcm(rate, channels)
+    block = BLOCK_SAMPLES * 2 * channels
+    resampler = AudioResampler(rate, channels)
+    out = 0
+    start = time.process_time()
+    for offset in range(0, len(pcm), block):
+        out += len(resampler.process(pcm[offset:offset + block]))
+    out += len(resampler.flush())
+    elapsed = time.process_time() - start
+    return elapsed, out / 2 / 16000
+
+
+def main():
+    print(f"{'输入格式':<14} {'CPU(ms)/音频秒':>14} {'实时倍率':>10} {'输出时长(s)':>12}")
+    for rate, channels in FORMATS:
+        elapsed, out_seconds = bench(rate, channels)
+        per_second = elapsed / SECONDS * 1000
+        factor = SECONDS / elapsed if elapsed else float('inf')
+        print(f"{f'{rate}Hz/{channels}ch':<14} {per_second:>14.3f} {factor:>9.0f}x {out_seconds:>12.2f}")
+
+
+if __name__ == '__main__':
+    main()
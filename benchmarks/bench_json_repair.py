@@ -0,0 +1,162 @@
+"""
+本地 JSON 修复基准：按常见的模型输出错误构造损坏语料，统计各类错误的修复率、还原率与耗时
+
+语料为按提示词结构随机生成的旅行计划 JSON（3-9 天），每类错误各生成 N 份：
+- 还原率：修复结果与原始计划完全一致的比例（截断类不计，截断后的内容无法还原）
+- 截断类额外统计保留下来的完整行程天数占比
+
+每次失败原本需要一次 max_tokens=8000 的模型修复调用（数十秒），本地修复为毫秒级。
+
+用法: python benchmarks/bench_json_repair.py [--samples 200]
+"""
+import argparse
+import json
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.json_repair import repair_json
+
+PLACES = ['宽窄巷子', '锦里古街', '大熊猫繁育研究基地', '武侯祠', '杜甫草堂', '春熙路', '人民公园', '都江堰', '青城山', '文殊院']
+DISHES = ['麻婆豆腐', '夫妻肺片', '担担面', '钟水饺', '龙抄手', '火锅']
+
+
+def make_plan(rng):
+    days = rng.randint(3, 9)
+    itinerary = []
+    for day in range(1, days + 1):
+        activities = []
+        for slot in range(rng.randint(3, 5)):
+            place = rng.choice(PLACES)
+            activities.append({
+                'time': f'{8 + slot * 3:02d}:00',
+                'type': rng.choice(['景点', '餐厅', '交通', '住宿']),
+                'name': place,
+                'description': f'游览{place}，感受当地文化。推荐时段：上午',
+                'details': {'address': f'成都市青羊区{rng.randint(1, 300)}号', 'price_range': '50-100元',
+                            'rating': round(rng.uniform(3.5, 5), 1), 'highlights': rng.sample(DISHES, 2)},
+                'location': {'name': place, 'lng': round(rng.uniform(103.9, 104.2), 4),
+                             'lat': round(rng.uniform(30.5, 30.8), 4)},
+                'cost': rng.randint(0, 300),
+                'duration': f'{rng.randint(1, 3)}小时'
+            })
+        itinerary.append({'day': day, 'date': f'第{day}天', 'activities': activities,
+                          'total_cost': sum(a['cost'] for a in activities)})
+    return {
+        'destination': '成都', 'duration': days, 'budget': 5000, 'people': rng.randint(1, 4),
+        'preferences': ['美食', '文化'], 'itinerary': itinerary,
+        'accommodation_summary': [{'hotel_name': '成都太古里博舍', 'nights': days - 1, 'total_cost': 1200,
+                                   'address': '锦江区笔帖式街81号', 'features': ['近春熙路', '设计感']}],
+        'restaurant_recommendations': [{'name': '陈麻婆豆腐', 'cuisine': '川菜', 'signature_dishes': DISHES[:2],
+                                        'avg_cost': 80, 'address': '青华路10号'}],
+        'total_budget': 5000, 'tips': ['建议提前预约熊猫基地门票', '注意防晒']
+    }
+
+
+def dump(plan):
+    return json.dumps(plan, ensure_ascii=False, indent=2)
+
+
+# ------------------------- 损坏方式 -------------------------
+def trailing_commas(plan, rng):
+    return re.sub(r'(\n\s*)([}\]])', r',\1\2', dump(plan))
+
+
+def single_quotes(plan, rng):
+    return dump(plan).replace('"', "'")
+
+
+def comments(plan, rng):
+    lines = dump(plan).split('\n')
+    for i in sorted(rng.sample(range(1, len(lines)), min(8, len(lines) - 1)), reverse=True):
+        lines.insert(i, rng.choice(['// 以下为推荐内容', '/* 价格仅供参考 */']))
+    return '\n'.join(lines)
+
+
+def raw_newlines(plan, rng):
+    for day in plan['itinerary']:
+        for activity in day['activities']:
+            activity['description'] = activity['description'].replace('。', '。\n\t')
+    return dump(plan).replace('\\n', '\n').replace('\\t', '\t')
+
+
+def inner_quotes(plan, rng):
+    for day in plan['itinerary']:
+        for activity in day['activities']:
+            activity['description'] = activity['description'].replace('感受', '感受"').replace('文化', '文化"')
+    return dump(plan).replace('\\"', '"')
+
+
+def python_literals(plan, rng):
+    plan['tips'] = [True, None, '注意防晒']
+    return dump(plan).replace('true', 'True').replace('null', 'None')
+
+
+def fenced_with_text(plan, rng):
+    return '好的，以下是为您生成的旅行计划：\n```json\n' + dump(plan) + '\n```\n如需调整请告诉我。'
+
+
+def truncated(plan, rng):
+    text = dump(plan)
+    return text[:rng.randint(len(text) // 3, len(text) - 2)]
+
+
+CORRUPTIONS = [
+    ('悬挂逗号', trailing_commas),
+    ('单引号', single_quotes),
+    ('注释', comments),
+    ('未转义换行/制表符', raw_newlines),
+    ('未转义引号', inner_quotes),
+    ('Python 字面量', python_literals),
+    ('代码块+说明文字', fenced_with_text),
+    ('输出截断', truncated),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='本地 JSON 修复基准')
+    parser.add_argument('--samples', type=int, default=200)
+    args = parser.parse_args()
+
+    rng = random.Random(11)
+    print(f"{'错误类型':<16} {'json.loads':>10} {'修复率':>8} {'还原率':>8} {'保留天数':>8} {'平均(ms)':>9} {'p99(ms)':>9}")
+    for name, corrupt in CORRUPTIONS:
+        loads_ok = repaired = exact = 0
+        kept_days = total_days = 0
+        times = []
+        for _ in range(args.samples):
+            expected = make_plan(rng)
+            # 部分损坏方式会先改写计划内容（插入换行、引号等），改写后的计划即期望结果
+            text = corrupt(expected, rng)
+            try:
+                json.loads(text)
+                loads_ok += 1
+            except ValueError:
+                pass
+
+            start = time.perf_counter()
+            result = repair_json(text)
+            times.append((time.perf_counter() - start) * 1000)
+            if result is None:
+                continue
+            parsed = json.loads(result)
+            if not isinstance(parsed, dict):
+                continue
+            repaired += 1
+            exact += parsed == expected
+            total_days += len(expected['itinerary'])
+            kept_days += sum(1 for day in parsed.get('itinerary', [])
+                             if isinstance(day, dict) and day in expected['itinerary'])
+        times.sort()
+        n = args.samples
+        exact_text = '-' if corrupt is truncated else f'{exact / n:.1%}'
+        print(f"{name:<16} {loads_ok / n:>10.1%} {repaired / n:>8.1%} {exact_text:>8} {kept_days / max(total_days, 1):>8.1%} "
+              f"{sum(times) / n:>9.2f} {times[int(n * 0.99)]:>9.2f}")
+
+
+if __name__ == '__main__':
+    main()
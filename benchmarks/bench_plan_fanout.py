@@ -0,0 +1,132 @@
+"""
+分天并行生成基准：一次生成整份计划（single）vs 骨架 + 按天并行生成（fanout）的墙钟耗时与截断
+
+不调用真实模型：模拟的模型按输出长度计时（首字延迟 + 每个 token 固定耗时），输出超过 max_tokens 时截断。
+- single：一次 max_tokens=8000 的调用；长行程输出被截断时本地修复结果不采用，再调用一次模型修复
+  （模拟模型同样输出截断的文本），最终只得到占位结构
+- fanout：需求中的天数达到阈值时直接骨架 + 每天一次调用（PLAN_FANOUT_WORKERS 个并行），
+  耗时约为骨架 + 最慢的一批天；未达到阈值的需求先一次生成，被截断时再改为按天生成
+
+用法: python benchmarks/bench_plan_fanout.py [--days 3 5 7 10 14] [--token-ms 2] [--workers 4]
+"""
+import argparse
+import importlib.util
+import json
+import os
+import random
+import sys
+import time
+import types
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+if importlib.util.find_spec('volcenginesdkarkruntime') is None:
+    # 基准只替换 _call_api，不需要真实的 SDK：未安装时注册一个空模块，让 deepseek_service 可以导入
+    sdk = types.ModuleType('volcenginesdkarkruntime')
+    sdk.Ark = lambda **kwargs: None
+    sys.modules['volcenginesdkarkruntime'] = sdk
+
+from services.deepseek_service import DeepSeekService
+
+PLACES = ['宽窄巷子', '锦里古街', '大熊猫繁育研究基地', '武侯祠', '杜甫草堂', '春熙路', '人民公园', '都江堰', '青城山', '文殊院']
+CHARS_PER_TOKEN = 1.5   # 中文 JSON 输出的平均每 token 字符数（粗略）
+FIRST_TOKEN_MS = 800
+
+
+def make_activity(rng, slot):
+    place = rng.choice(PLACES)
+    return {
+        'time': f'{8 + slot * 3:02d}:00', 'type': rng.choice(['景点', '餐厅', '交通', '住宿']), 'name': place,
+        'description': f'游览{place}，感受当地文化与美食，建议提前预约并错峰出行。',
+        'details': {'address': f'成都市青羊区{rng.randint(1, 300)}号', 'price_range': '50-100元',
+                    'rating': round(rng.uniform(3.5, 5), 1), 'highlights': ['特色1', '特色2']},
+        'location': {'name': place, 'lng': round(rng.uniform(103.9, 104.2), 4), 'lat': round(rng.uniform(30.5, 30.8), 4)},
+        'cost': rng.randint(0, 300), 'duration': f'{rng.randint(1, 3)}小时'
+    }
+
+
+def make_day(rng, day):
+    activities = [make_activity(rng, slot) for slot in range(5)]
+    return {'day': day, 'date': f'第{day}天', 'activities': activities, 'total_cost': sum(a['cost'] for a in activities)}
+
+
+def make_skeleton(days):
+    return {
+        'destination': '成都', 'duration': days, 'budget': 800 * days, 'people': 2, 'preferences': ['美食', '文化'],
+        'days': [{'day': d, 'date': f'第{d}天', 'theme': f'主题{d}', 'area': '青羊区', 'hotel': '成都太古里博舍',
+                  'budget': 800} for d in range(1, days + 1)],
+        'accommodation_summary': [{'hotel_name': '成都太古里博舍', 'nights': days - 1, 'total_cost': 600 * (days - 1),
+                                   'address': '锦江区笔帖式街81号', 'features': ['近春熙路']}],
+        'restaurant_recommendations': [{'name': '陈麻婆豆腐', 'cuisine': '川菜', 'signature_dishes': ['麻婆豆腐'],
+                                        'avg_cost': 80, 'address': '青华路10号'}],
+        'total_budget': 800 * days, 'tips': ['建议提前预约熊猫基地门票']
+    }
+
+
+class SimulatedModel:
+    """按输出长度计时的模拟模型，输出超过 max_tokens 时截断"""
+
+    def __init__(self, days, token_ms, seed=5):
+        self.days = days
+        self.token_ms = token_ms
+        self.seed = seed
+        self.calls = 0
+        self.truncated = 0
+
+    def __call__(self, service, messages, temperature=0.7, max_tokens=2000):
+        self.calls += 1
+        system = messages[0]['content']
+        user = messages[1]['content']
+        rng = random.Random(self.seed)
+        if '骨架' in system:
+            output = make_skeleton(self.days)
+        elif '请安排第 ' in user:
+            day = int(user.split('请安排第 ')[1].split(' ')[0])
+            output = make_day(rng, day)
+        else:
+            output = make_skeleton(self.days)
+            output.pop('days')
+            output['itinerary'] = [make_day(rng, d) for d in range(1, self.days + 1)]
+        text = json.dumps(output, ensure_ascii=False, indent=2)
+        tokens = int(len(text) / CHARS_PER_TOKEN)
+        if tokens > max_tokens:
+            self.truncated += 1
+            tokens = max_tokens
+            text = text[:int(max_tokens * CHARS_PER_TOKEN)]
+        time.sleep((FIRST_TOKEN_MS + tokens * self.token_ms) / 1000)
+        return text
+
+
+def run(mode, days, token_ms, workers):
+    model = SimulatedModel(days, token_ms)
+    DeepSeekService._call_api = lambda service, messages, **kwargs: model(service, messages, **kwargs)
+    service = DeepSeekService()
+    service.generation_mode = mode
+    service.fanout_workers = workers
+    service.fanout_min_days = 1
+    start = time.perf_counter()
+    plan = service.generate_travel_plan(f'我想去成都玩{days}天，预算{800 * days}元，喜欢美食和文化')
+    elapsed = time.perf_counter() - start
+    complete = sum(1 for day in plan.get('itinerary', []) if isinstance(day, dict) and len(day.get('activities', [])) == 5)
+    return elapsed, complete, model.calls, model.truncated
+
+
+def main():
+    parser = argparse.ArgumentParser(description='分天并行生成基准')
+    parser.add_argument('--days', type=int, nargs='+', default=[3, 5, 7, 10, 14])
+    parser.add_argument('--token-ms', type=float, default=2.0, help='模拟模型每个输出 token 的耗时（毫秒）')
+    parser.add_argument('--workers', type=int, default=4)
+    args = parser.parse_args()
+
+    rows = []
+    for days in args.days:
+        rows.append((days, run('single', days, args.token_ms, args.workers), run('fanout', days, args.token_ms, args.workers)))
+
+    print(f"\n{'天数':>4} {'single(s)':>10} {'完整天数':>8} {'截断':>4} {'fanout(s)':>10} {'完整天数':>8} {'调用数':>6} {'加速比':>7}")
+    for days, single, fanout in rows:
+        print(f"{days:>4} {single[0]:>10.2f} {single[1]:>8} {single[3]:>4} {fanout[0]:>10.2f} {fanout[1]:>8} "
+              f"{fanout[2]:>6} {single[0] / fanout[0]:>6.1f}x")
+
+
+if __name__ == '__main__':
+    main()
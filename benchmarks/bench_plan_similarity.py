@@ -0,0 +1,114 @@
+"""
+近似需求索引基准：索引规模增长到数十万条时的插入吞吐、查询延迟分位数与内存占用
+
+需求文本由目的地 × 句式 × 天数 × 预算 × 兴趣随机组合生成；查询一半是已索引需求的改写
+（换一种句式描述同一行程，并随机换数字写法、加减标点、调换兴趣顺序），一半是新生成的需求。
+误匹配率：命中的已索引需求与查询在目的地、天数、预算、人数、兴趣上不一致的比例。
+
+用法: python benchmarks/bench_plan_similarity.py [--sizes 10000 100000 300000]
+"""
+import argparse
+import os
+import random
+import resource
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.plan_similarity_index import PlanSimilarityIndex
+
+DESTINATIONS = ['成都', '北京', '上海', '西安', '杭州', '三亚', '重庆', '厦门', '桂林', '丽江', '大理', '青岛',
+                '南京', '苏州', '长沙', '武汉', '昆明', '拉萨', '哈尔滨', '广州', '深圳', '香港', '澳门', '乌鲁木齐']
+INTERESTS = ['美食', '熊猫', '博物馆', '古镇', '海边', '徒步', '摄影', '购物', '夜景', '温泉', '亲子', '历史古迹']
+TEMPLATES = [
+    '我想去{dest}玩{days}天，预算{budget}元，喜欢{a}和{b}',
+    '{dest}{days}天{a}之旅，预算{budget}，想看{b}',
+    '计划去{dest}旅游{days}天，{people}个人，预算{budget}元，主要是{a}{b}',
+    '{people}个人去{dest}玩{days}天，预算{budget}元，想去{a}和{b}',
+    '打算{days}天时间在{dest}，偏好{a}、{b}，人均{budget}',
+    # 句首目的地后直接接 "玩"（"成都玩5天"），目的地不能被识别为 "成都玩"
+    '{dest}玩{days}天，喜欢{a}和{b}，预算{budget}元',
+]
+CN = '零一二三四五六七八九'
+
+
+def make_request(rng):
+    a, b = rng.sample(INTERESTS, 2)
+    return {
+        'template': rng.choice(TEMPLATES), 'dest': rng.choice(DESTINATIONS), 'days': rng.randint(2, 9),
+        'budget': rng.choice([2000, 3000, 5000, 8000, 10000, 15000]), 'people': rng.randint(1, 4), 'a': a, 'b': b
+    }
+
+
+def rewrite(req, rng):
+    """同一行程换一种句式：提到人数的句式之间互换，其余句式之间互换"""
+    people = '{people}' in req['template']
+    choices = [t for t in TEMPLATES if t != req['template'] and ('{people}' in t) == people]
+    return dict(req, template=rng.choice(choices))
+
+
+def render(req, rng=None):
+    fields = dict(req)
+    if rng is not None:
+        # 改写：中文数字 / 调换兴趣顺序 / 标点与空格
+        if rng.random() < 0.5:
+            fields['days'] = CN[req['days']]
+        if rng.random() < 0.5:
+            fields['a'], fields['b'] = req['b'], req['a']
+    text = req['template'].format(**fields)
+    if rng is not None and rng.random() < 0.5:
+        text = text.replace('，', ' ') + '！'
+    return text
+
+
+def same_trip(req, cached):
+    """复用是否正确：目的地、天数、预算、兴趣一致，人数都未提到或都提到且一致"""
+    people = ('{people}' in req['template'], '{people}' in cached['template'])
+    return (req['dest'] == cached['dest'] and req['budget'] == cached['budget']
+            and {req['a'], req['b']} == {cached['a'], cached['b']} and cached['days'] == req['days']
+            and (people == (False, False) or (people == (True, True) and req['people'] == cached['people'])))
+
+
+def rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description='近似需求索引基准')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000, 300000])
+    parser.add_argument('--queries', type=int, default=2000)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    print(f"{'索引条数':>10} {'插入/秒':>10} {'查询p50(ms)':>12} {'查询p99(ms)':>12} {'改写命中率':>10} {'误匹配率':>10} {'峰值RSS(MB)':>12}")
+    for size in args.sizes:
+        index = PlanSimilarityIndex(max_entries=size)
+        requests = [make_request(rng) for _ in range(size)]
+        start = time.perf_counter()
+        for i, req in enumerate(requests):
+            index.add(render(req), f'k{i}')
+        insert_rate = size / (time.perf_counter() - start)
+
+        latencies = []
+        rewrite_hits = matches = wrong = 0
+        for n in range(args.queries):
+            req = rewrite(requests[rng.randrange(size)], rng) if n % 2 == 0 else make_request(rng)
+            text = render(req, rng)
+            start = time.perf_counter()
+            match = index.query(text)
+            latencies.append((time.perf_counter() - start) * 1000)
+            if match is None:
+                continue
+            matches += 1
+            rewrite_hits += n % 2 == 0
+            if not same_trip(req, requests[int(match['key'][1:])]):
+                wrong += 1
+        latencies.sort()
+        p50 = latencies[len(latencies) // 2]
+        p99 = latencies[int(len(latencies) * 0.99)]
+        print(f"{size:>10} {insert_rate:>10.0f} {p50:>12.3f} {p99:>12.3f} {rewrite_hits / (args.queries // 2):>10.1%} "
+              f"{wrong / matches if matches else 0:>10.1%} {rss_mb():>12.0f}")
+
+if __name__ == '__main__':
+    main()
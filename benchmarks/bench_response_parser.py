@@ -0,0 +1,90 @@
+"""
+ResponseParser 微基准：每秒可解析的服务端消息数
+
+样本帧按 SAUC 协议构造（与线上抓包结构一致）：带序列号的中间结果、
+较长的累计文本结果、最后一包（NEG_WITH_SEQUENCE）以及错误响应。
+
+用法: python benchmarks/bench_response_parser.py
+"""
+import gzip
+import json
+import logging
+import os
+import struct
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.speech_recognition_service import (
+    CompressionType,
+    MessageType,
+    MessageTypeSpecificFlags,
+    ResponseParser,
+    SerializationType,
+)
+
+ITERATIONS = 20000
+
+
+def build_server_frame(message_type, flags, payload, seq=None, code=None):
+    body = gzip.compress(json.dumps(payload, ensure_ascii=False).encode('utf-8'))
+    frame = bytearray([
+        0x11,
+        (message_type << 4) | flags,
+        (SerializationType.JSON << 4) | CompressionType.GZIP,
+        0x00,
+    ])
+    if seq is not None:
+        frame.extend(struct.pack('>i', seq))
+    if code is not None:
+        frame.extend(struct.pack('>i', code))
+    frame.extend(struct.pack('>I', len(body)))
+    frame.extend(body)
+    return bytes(frame)
+
+
+def sample_frames():
+    short_text = '我想去成都玩五天'
+    long_text = '我想去成都玩五天，预算五千元，喜欢美食和动漫，带着孩子，希望行程不要太赶' * 3
+    utterance = {'text': short_text, 'start_time': 0, 'end_time': 1800, 'definite': False}
+    return {
+        '中间结果': build_server_frame(
+            MessageType.SERVER_FULL_RESPONSE, MessageTypeSpecificFlags.POS_SEQUENCE,
+            {'audio_info': {'duration': 1800}, 'result': {'text': short_text, 'utterances': [utterance]}},
+            seq=12),
+        '长文本结果': build_server_frame(
+            MessageType.SERVER_FULL_RESPONSE, MessageTypeSpecificFlags.POS_SEQUENCE,
+            {'audio_info': {'duration': 24000}, 'result': {'text': long_text, 'utterances': [utterance] * 8}},
+            seq=120),
+        '最后一包': build_server_frame(
+            MessageType.SERVER_FULL_RESPONSE, MessageTypeSpecificFlags.NEG_WITH_SEQUENCE,
+            {'result': {'text': short_text, 'is_final': True}},
+            seq=-121),
+        '错误响应': build_server_frame(
+            MessageType.SERVER_ERROR_RESPONSE, MessageTypeSpecificFlags.NO_SEQUENCE,
+            {'error': 'quota exceeded'},
+            code=45000001),
+    }
+
+
+def bench(frame):
+    parse = ResponseParser.parse_response
+    start = time.perf_counter()
+    for _ in range(ITERATIONS):
+        parse(frame)
+    return ITERATIONS / (time.perf_counter() - start)
+
+
+def main():
+    logging.basicConfig(level=logging.WARNING)
+    frames = sample_frames()
+    for name, frame in frames.items():
+        assert 'error' not in ResponseParser.parse_response(frame), name
+    print(f"{'样本':<8} {'字节':>6} {'消息/秒':>12}")
+    for name, frame in frames.items():
+        print(f"{name:<8} {len(frame):>6} {bench(frame):>12.0f}")
+
+
+if __name__ == '__main__':
+    main()
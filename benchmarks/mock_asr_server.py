@@ -0,0 +1,169 @@
+"""
+本地模拟 ASR WebSocket 服务（SAUC BigModel 二进制协议）
+
+解析 RequestBuilder 构造的请求（4 字节头 + 可选序列号 + 负载长度 + gzip/无压缩负载），
+按 ResponseParser 可解析的格式返回：
+- 初始化请求 -> SERVER_FULL_RESPONSE（POS_SEQUENCE, seq=1）
+- 每收到 interim_every 个音频包 -> 一条中间结果
+- 收到 NEG_SEQUENCE 最后一包 -> 最终结果（NEG_WITH_SEQUENCE，is_final=True）后关闭连接
+识别文本按已收到的音频时长合成，响应前等待可配置的延迟。
+设置 drop_after 时，每个 App Key 的第一条连接在收到该数量的音频包后被直接断开（用于验证断线重连）。
+
+用法:
+    python benchmarks/mock_asr_server.py --port 8765 --latency-ms 50
+然后设置 SPEECH_ASR_URL=ws://127.0.0.1:8765/
+"""
+import argparse
+import asyncio
+import gzip
+import json
+import os
+import struct
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from aiohttp import web, WSMsgType
+
+from services.speech_recognition_service import (
+    CompressionType,
+    MessageType,
+    MessageTypeSpecificFlags,
+    SerializationType,
+)
+
+SYNTHETIC_TEXT = '我想去成都玩五天预算五千元喜欢美食和熊猫基地'
+BYTES_PER_CHAR = 16000 * 2 // 10  # 每 100ms 音频合成一个字（每个 200ms 音频包都会产生新文本）
+
+
+def build_server_frame(payload: dict, seq: int, flags: int = MessageTypeSpecificFlags.POS_SEQUENCE) -> bytes:
+    """构造服务端响应帧"""
+    body = gzip.compress(json.dumps(payload, ensure_ascii=False).encode('utf-8'), compresslevel=1)
+    header = bytes([
+        0x11,
+        (MessageType.SERVER_FULL_RESPONSE << 4) | flags,
+        (SerializationType.JSON << 4) | CompressionType.GZIP,
+        0x00,
+    ])
+    return header + struct.pack('>iI', seq, len(body)) + body
+
+
+def parse_client_frame(data: bytes):
+    """解析客户端请求，返回 (message_type, flags, payload_bytes)"""
+    header_size = (data[0] & 0x0f) * 4
+    message_type = data[1] >> 4
+    flags = data[1] & 0x0f
+    compression = data[2] & 0x0f
+    offset = header_size
+    if flags & 0x01:
+        offset += 4
+    size = struct.unpack_from('>I', data, offset)[0]
+    offset += 4
+    payload = data[offset:offset + size]
+    if compression == CompressionType.GZIP:
+        payload = gzip.decompress(payload)
+    return message_type, flags, payload
+
+
+def synth_text(audio_bytes: int) -> str:
+    chars = audio_bytes // BYTES_PER_CHAR
+    return (SYNTHETIC_TEXT * (chars // len(SYNTHETIC_TEXT) + 1))[:chars]
+
+
+class MockAsrServer:
+    """模拟流式识别服务"""
+
+    def __init__(self, latency_ms: float = 50.0, interim_every: int = 1, drop_after: int = 0):
+        self.latency = latency_ms / 1000.0
+        self.interim_every = max(1, interim_every)
+        self.drop_after = drop_after
+        self.sessions = 0
+        self.dropped = 0
+        self._dropped_keys = set()
+
+    async def handle(self, request):
+        ws = web.WebSocketResponse(max_msg_size=0)
+        await ws.prepare(request)
+        self.sessions += 1
+        app_key = request.headers.get('X-Api-App-Key')
+        drop_at = 0
+        if self.drop_after and app_key not in self._dropped_keys:
+            self._dropped_keys.add(app_key)
+            drop_at = self.drop_after
+        seq = 1
+        audio_bytes = 0
+        packets = 0
+
+        try:
+            async for msg in ws:
+                if msg.type != WSMsgType.BINARY:
+                    continue
+                message_type, flags, payload = parse_client_frame(msg.data)
+
+                if message_type == MessageType.CLIENT_FULL_REQUEST:
+                    await ws.send_bytes(build_server_frame({'result': {}}, seq))
+                    continue
+
+                audio_bytes += len(payload)
+                packets += 1
+                if packets == drop_at:
+                    # 模拟连接意外中断（不发送最终结果）
+                    self.dropped += 1
+                    break
+                is_last = bool(flags & MessageTypeSpecificFlags.NEG_SEQUENCE)
+                if not is_last and packets % self.interim_every:
+                    continue
+
+                if self.latency:
+                    await asyncio.sleep(self.latency)
+                seq += 1
+                result = {
+                    'audio_info': {'duration': audio_bytes * 1000 // (16000 * 2)},
+                    'result': {'text': synth_text(audio_bytes), 'is_final': is_last}
+                }
+                if is_last:
+                    await ws.send_bytes(build_server_frame(result, -seq, MessageTypeSpecificFlags.NEG_WITH_SEQUENCE))
+                    break
+                await ws.send_bytes(build_server_frame(result, seq))
+        except ConnectionResetError:
+            # 客户端已先行断开
+            pass
+
+        await ws.close()
+        return ws
+
+
+async def start_server(host: str = '127.0.0.1', port: int = 8765, latency_ms: float = 50.0,
+                       interim_every: int = 1, drop_after: int = 0) -> web.AppRunner:
+    """在当前事件循环中启动模拟服务，返回 AppRunner（调用 cleanup() 关闭）"""
+    server = MockAsrServer(latency_ms, interim_every, drop_after)
+    app = web.Application()
+    app.router.add_get('/{tail:.*}', server.handle)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    return runner
+
+
+def main():
+    parser = argparse.ArgumentParser(description='本地模拟 ASR WebSocket 服务')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency-ms', type=float, default=50.0, help='每条结果的响应延迟')
+    parser.add_argument('--interim-every', type=int, default=1, help='每 N 个音频包返回一条中间结果')
+    parser.add_argument('--drop-after', type=int, default=0, help='每个 App Key 的首条连接收到 N 个音频包后断开')
+    args = parser.parse_args()
+
+    async def serve():
+        await start_server(args.host, args.port, args.latency_ms, args.interim_every, args.drop_after)
+        print(f"[OK] 模拟 ASR 服务已启动: ws://{args.host}:{args.port}/", flush=True)
+        await asyncio.Event().wait()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
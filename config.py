@@ -20,6 +20,39 @@ class Config:
     SPEECH_ACCESS_KEY = os.getenv('SPEECH_ACCESS_KEY', '')
     SPEECH_SECRET_KEY = os.getenv('SPEECH_SECRET_KEY', '')
     SPEECH_MODEL_ID = os.getenv('SPEECH_MODEL_ID', 'Speech_Recognition_Seed_streaming2000000451913596898')
+    # 流式识别 WebSocket 地址（可指向 benchmarks/mock_asr_server.py 做本地压测）
+    SPEECH_ASR_URL = os.getenv('SPEECH_ASR_URL', 'wss://openspeech.bytedance.com/api/v3/sauc/bigmodel_async')
+    # 单进程允许的并发语音识别会话数
+    SPEECH_MAX_SESSIONS = int(os.getenv('SPEECH_MAX_SESSIONS', '50'))
+    # 承载语音识别会话的常驻事件循环数量
+    SPEECH_EVENT_LOOPS = int(os.getenv('SPEECH_EVENT_LOOPS', '1'))
+    # 音频负载压缩：none / fast / gzip / adaptive
+    SPEECH_AUDIO_COMPRESSION = os.getenv('SPEECH_AUDIO_COMPRESSION', 'fast')
+    # 服务端语音活动检测（跳过静音），以及尾部静音多久后自动结束（毫秒，0 表示不自动结束）
+    SPEECH_VAD_ENABLED = os.getenv('SPEECH_VAD_ENABLED', '0') == '1'
+    SPEECH_VAD_END_SILENCE_MS = int(os.getenv('SPEECH_VAD_END_SILENCE_MS', '0'))
+    # 预热连接池：保持的已握手空闲连接数（0 表示关闭）及空闲回收时间（秒）
+    SPEECH_POOL_SIZE = int(os.getenv('SPEECH_POOL_SIZE', '0'))
+    SPEECH_POOL_IDLE_TTL = float(os.getenv('SPEECH_POOL_IDLE_TTL', '20'))
+    # 建立语音识别连接（含初始化握手）的最长等待时间（秒）
+    SPEECH_CONNECT_TIMEOUT = float(os.getenv('SPEECH_CONNECT_TIMEOUT', '12'))
+    # 每个会话的音频接收队列长度（帧）及溢出策略：block / drop_oldest / coalesce
+    SPEECH_INGEST_MAX_FRAMES = int(os.getenv('SPEECH_INGEST_MAX_FRAMES', '50'))
+    SPEECH_INGEST_POLICY = os.getenv('SPEECH_INGEST_POLICY', 'drop_oldest')
+    # ASR 连接意外断开时的重连次数（0 为关闭）与用于回放的已发送音频时长（秒）
+    SPEECH_RECONNECT_ATTEMPTS = int(os.getenv('SPEECH_RECONNECT_ATTEMPTS', '2'))
+    SPEECH_REPLAY_SECONDS = float(os.getenv('SPEECH_REPLAY_SECONDS', '20'))
+    # 中间结果最小下发间隔（毫秒）及是否只下发变化的后缀
+    SPEECH_INTERIM_MIN_INTERVAL_MS = int(os.getenv('SPEECH_INTERIM_MIN_INTERVAL_MS', '150'))
+    SPEECH_INTERIM_DELTA = os.getenv('SPEECH_INTERIM_DELTA', '1') == '1'
+    # 上传音频转写：同时转写的文件数与最大排队数
+    SPEECH_BATCH_WORKERS = int(os.getenv('SPEECH_BATCH_WORKERS', '4'))
+    SPEECH_BATCH_MAX_PENDING = int(os.getenv('SPEECH_BATCH_MAX_PENDING', '16'))
+    # 上传音频转写：单个文件的最长时长（秒，0 表示不限）与请求体大小上限（字节）
+    SPEECH_BATCH_MAX_SECONDS = float(os.getenv('SPEECH_BATCH_MAX_SECONDS', '600'))
+    SPEECH_BATCH_MAX_BYTES = int(os.getenv('SPEECH_BATCH_MAX_BYTES', str(64 * 1024 * 1024)))
+    # Flask 请求体大小上限（上传音频是最大的请求），超过时返回 413
+    MAX_CONTENT_LENGTH = SPEECH_BATCH_MAX_BYTES
     
     # 高德地图配置
     AMAP_API_KEY = os.getenv('AMAP_API_KEY', '')
@@ -31,6 +64,33 @@ class Config:
     ARK_BASE_URL = os.getenv('ARK_BASE_URL', 'https://ark.cn-beijing.volces.com/api/v3')
     # 使用的模型 ID
     DEEPSEEK_MODEL = os.getenv('DEEPSEEK_MODEL', 'deepseek-v3-1-250821')
+    # REST 回退请求的长连接池：最大连接数、重试次数、单次请求超时（秒）
+    ARK_HTTP_POOL_SIZE = int(os.getenv('ARK_HTTP_POOL_SIZE', '10'))
+    ARK_HTTP_RETRIES = int(os.getenv('ARK_HTTP_RETRIES', '2'))
+    ARK_HTTP_TIMEOUT = float(os.getenv('ARK_HTTP_TIMEOUT', '60'))
+    # 旅行计划生成结果缓存：是否启用、有效期（秒）、内存层条目数与字节上限、磁盘层目录（为空则不落盘）
+    PLAN_CACHE_ENABLED = os.getenv('PLAN_CACHE_ENABLED', '1') == '1'
+    PLAN_CACHE_TTL = float(os.getenv('PLAN_CACHE_TTL', '86400'))
+    PLAN_CACHE_MAX_ENTRIES = int(os.getenv('PLAN_CACHE_MAX_ENTRIES', '256'))
+    PLAN_CACHE_MAX_BYTES = int(os.getenv('PLAN_CACHE_MAX_BYTES', str(32 * 1024 * 1024)))
+    PLAN_CACHE_DIR = os.getenv('PLAN_CACHE_DIR', '')
+    # 近似需求复用：是否启用、相似度阈值（去掉句式用字后内容用字的 Jaccard）、最多索引的需求数
+    PLAN_SIMILARITY_ENABLED = os.getenv('PLAN_SIMILARITY_ENABLED', '1') == '1'
+    PLAN_SIMILARITY_THRESHOLD = float(os.getenv('PLAN_SIMILARITY_THRESHOLD', '0.65'))
+    PLAN_SIMILARITY_MAX_ENTRIES = int(os.getenv('PLAN_SIMILARITY_MAX_ENTRIES', '100000'))
+    # 异步计划生成任务：工作线程数、最大排队数、每个用户同时进行的任务数、已结束任务的保留时间（秒）
+    PLAN_JOB_WORKERS = int(os.getenv('PLAN_JOB_WORKERS', '4'))
+    PLAN_JOB_MAX_QUEUE = int(os.getenv('PLAN_JOB_MAX_QUEUE', '50'))
+    PLAN_JOB_MAX_PER_USER = int(os.getenv('PLAN_JOB_MAX_PER_USER', '2'))
+    PLAN_JOB_RESULT_TTL = float(os.getenv('PLAN_JOB_RESULT_TTL', '3600'))
+    # 合并并发的相同计划请求：是否启用，以及后到的相同请求等待共享结果的最长时间（秒）
+    PLAN_SINGLEFLIGHT_ENABLED = os.getenv('PLAN_SINGLEFLIGHT_ENABLED', '1') == '1'
+    PLAN_SINGLEFLIGHT_TIMEOUT = float(os.getenv('PLAN_SINGLEFLIGHT_TIMEOUT', '180'))
+    # 计划生成方式：single 一次生成整份计划；fanout 下天数不少于 PLAN_FANOUT_MIN_DAYS 的需求先生成骨架再按天并行生成，
+    # 其余需求仍一次生成，输出被截断时再改为按天生成（PLAN_FANOUT_WORKERS 为按天生成的并行数）
+    PLAN_GENERATION_MODE = os.getenv('PLAN_GENERATION_MODE', 'single')
+    PLAN_FANOUT_WORKERS = int(os.getenv('PLAN_FANOUT_WORKERS', '4'))
+    PLAN_FANOUT_MIN_DAYS = int(os.getenv('PLAN_FANOUT_MIN_DAYS', '4'))
 
     # Supabase配置
     SUPABASE_URL = os.getenv('SUPABASE_URL', '')
@@ -0,0 +1,152 @@
+"""
+音频分帧环形缓冲区
+固定容量、复用存储的 PCM 缓冲区，按帧输出 memoryview，避免每帧两次整块拷贝；
+以及断线重连时用于回放的已发送音频缓冲区
+"""
+from collections import deque
+from typing import Optional, List
+
+
+class AudioRingBuffer:
+    """PCM 环形缓冲区
+
+    - write() 将数据拷贝进环形存储（每字节只拷贝一次）
+    - read_frame() 以 memoryview 形式返回一帧；帧跨越存储末尾时才拷贝到复用的临时缓冲区
+    - 积压超过容量时按倍数扩容（不丢音频），之后继续复用
+
+    注意：返回的 memoryview 直接引用内部存储，只在下一次 write()/read_*() 之前有效，
+    调用方应在此之前完成压缩/打包。
+    """
+
+    def __init__(self, frame_size: int = 6400, capacity_frames: int = 32):
+        self.frame_size = frame_size
+        self._capacity = frame_size * max(2, capacity_frames)
+        self._storage = bytearray(self._capacity)
+        self._view = memoryview(self._storage)
+        self._scratch = bytearray(frame_size)
+        self._scratch_view = memoryview(self._scratch)
+        self._read_pos = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def capacity(self) -> int:
+        """当前存储容量（字节）"""
+        return self._capacity
+
+    def clear(self):
+        """清空缓冲区（保留存储）"""
+        self._read_pos = 0
+        self._size = 0
+
+    def write(self, data):
+        """写入 PCM 数据（bytes / bytearray / memoryview）"""
+        mv = memoryview(data)
+        if mv.ndim != 1 or mv.format != 'B':
+            mv = mv.cast('B')
+        n = mv.nbytes
+        if n == 0:
+            return
+        if self._size + n > self._capacity:
+            self._grow(self._size + n)
+
+        write_pos = (self._read_pos + self._size) % self._capacity
+        first = min(n, self._capacity - write_pos)
+        self._view[write_pos:write_pos + first] = mv[:first]
+        if first < n:
+            self._view[0:n - first] = mv[first:]
+        self._size += n
+
+    def read_frame(self) -> Optional[memoryview]:
+        """读取一整帧，不足一帧时返回 None"""
+        if self._size < self.frame_size:
+            return None
+        return self._take(self.frame_size)
+
+    def read_all(self) -> memoryview:
+        """读取缓冲区中剩余的全部数据"""
+        return self._take(self._size)
+
+    def _take(self, n: int) -> memoryview:
+        if n == 0:
+            return self._view[0:0]
+        start = self._read_pos
+        end = start + n
+        if end <= self._capacity:
+            frame = self._view[start:end]
+        else:
+            # 跨越存储末尾：拼接到复用的临时缓冲区
+            if n > len(self._scratch):
+                self._scratch = bytearray(n)
+                self._scratch_view = memoryview(self._scratch)
+            first = self._capacity - start
+            self._scratch_view[:first] = self._view[start:]
+            self._scratch_view[first:n] = self._view[:n - first]
+            frame = self._scratch_view[:n]
+        self._read_pos = end % self._capacity
+        self._size -= n
+        return frame
+
+    def _grow(self, min_capacity: int):
+        """扩容并把现有数据线性化到新存储开头"""
+        new_capacity = self._capacity
+        while new_capacity < min_capacity:
+            new_capacity *= 2
+        storage = bytearray(new_capacity)
+        if self._size:
+            first = min(self._size, self._capacity - self._read_pos)
+            storage[:first] = self._view[self._read_pos:self._read_pos + first]
+            if first < self._size:
+                storage[first:self._size] = self._view[:self._size - first]
+        self._storage = storage
+        self._view = memoryview(storage)
+        self._capacity = new_capacity
+        self._read_pos = 0
+
+
+class AudioReplayBuffer:
+    """最近已发送 PCM 的有界缓冲区（用于断线重连后回放）
+
+    以绝对字节偏移定位：total 为累计写入的字节数，base 为仍保留的最早字节的偏移；
+    超过 max_bytes 时从头部整帧淘汰。
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max(0, int(max_bytes))
+        self._frames = deque()  # (offset, bytes)
+        self._size = 0
+        self.base = 0
+        self.total = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def append(self, data):
+        """追加一帧（会拷贝数据，调用方可继续复用传入的 memoryview）"""
+        frame = bytes(data)
+        if not frame:
+            return
+        self._frames.append((self.total, frame))
+        self.total += len(frame)
+        self._size += len(frame)
+        while self._size > self.max_bytes and self._frames:
+            _, dropped = self._frames.popleft()
+            self._size -= len(dropped)
+        self.base = self._frames[0][0] if self._frames else self.total
+
+    def frames_from(self, offset: int) -> List[bytes]:
+        """返回从绝对偏移 offset（早于 base 时取 base）开始的全部已保留数据"""
+        frames = []
+        for start, frame in self._frames:
+            end = start + len(frame)
+            if end <= offset:
+                continue
+            frames.append(frame[offset - start:] if start < offset else frame)
+        return frames
+
+    def clear(self):
+        self._frames.clear()
+        self._size = 0
+        self.base = self.total = 0
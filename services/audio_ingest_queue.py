@@ -0,0 +1,137 @@
+"""
+语音会话音频接收队列
+Socket.IO 线程写入、事件循环中的单个发送任务读取的有界队列，带溢出策略与计数
+"""
+import asyncio
+import base64
+import threading
+from collections import deque
+from typing import Optional, Dict, Any
+
+
+class OverflowPolicy:
+    BLOCK = 'block'              # 队列满时阻塞生产者（超时后丢弃新帧）
+    DROP_OLDEST = 'drop_oldest'  # 丢弃最旧的帧
+    COALESCE = 'coalesce'        # 合并进队尾帧（超过合并上限时丢弃最旧的帧）
+
+
+class AudioIngestQueue:
+    """有界音频接收队列（线程安全生产、asyncio 消费）"""
+
+    def __init__(self, max_items: int = 50, policy: str = OverflowPolicy.DROP_OLDEST,
+                 block_timeout: float = 1.0, max_coalesce_bytes: int = 64000):
+        if policy not in (OverflowPolicy.BLOCK, OverflowPolicy.DROP_OLDEST, OverflowPolicy.COALESCE):
+            raise ValueError(f"不支持的溢出策略: {policy}")
+        self.max_items = max(1, int(max_items))
+        self.policy = policy
+        self.block_timeout = block_timeout
+        self.max_coalesce_bytes = max_coalesce_bytes
+
+        self._items = deque()
+        self._cond = threading.Condition()
+        self._closed = False
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._ready: Optional[asyncio.Event] = None
+
+        # 统计
+        self.enqueued = 0
+        self.dropped = 0
+        self.dropped_bytes = 0
+        self.coalesced = 0
+        self.max_depth = 0
+
+    def __len__(self) -> int:
+        with self._cond:
+            return len(self._items)
+
+    def put(self, data) -> bool:
+        """写入一帧（由 Socket.IO 线程调用），返回是否被接收（入队或合并）"""
+        with self._cond:
+            if self._closed:
+                return False
+            if len(self._items) >= self.max_items:
+                if self.policy == OverflowPolicy.COALESCE and self._coalesce(data):
+                    self._notify()
+                    return True
+                if not self._make_room(data):
+                    return False
+            self._items.append(data)
+            self.enqueued += 1
+            self.max_depth = max(self.max_depth, len(self._items))
+        self._notify()
+        return True
+
+    def _coalesce(self, data) -> bool:
+        """将新帧合并进队尾帧（调用方持有锁），超过合并上限时返回 False"""
+        incoming = base64.b64decode(data) if isinstance(data, str) else data
+        tail = self._items[-1]
+        if len(tail) + len(incoming) > self.max_coalesce_bytes:
+            return False
+        if not isinstance(tail, bytearray):
+            tail = bytearray(base64.b64decode(tail) if isinstance(tail, str) else tail)
+            self._items[-1] = tail
+        tail.extend(incoming)
+        self.coalesced += 1
+        return True
+
+    def _make_room(self, data) -> bool:
+        """队列已满时腾出空间（调用方持有锁），返回 False 表示新帧被丢弃"""
+        if self.policy == OverflowPolicy.BLOCK:
+            self._cond.wait_for(lambda: self._closed or len(self._items) < self.max_items,
+                                timeout=self.block_timeout)
+            if self._closed or len(self._items) >= self.max_items:
+                self._count_drop(data)
+                return False
+            return True
+
+        # DROP_OLDEST，或合并已达上限
+        self._count_drop(self._items.popleft())
+        return True
+
+    def _count_drop(self, data):
+        self.dropped += 1
+        self.dropped_bytes += len(data)
+
+    def _notify(self):
+        loop, ready = self._loop, self._ready
+        if loop is not None and ready is not None:
+            try:
+                loop.call_soon_threadsafe(ready.set)
+            except RuntimeError:
+                # 事件循环已关闭
+                pass
+
+    async def get(self):
+        """读取一帧（在事件循环中调用）；队列关闭且为空时返回 None"""
+        if self._ready is None:
+            self._loop = asyncio.get_running_loop()
+            self._ready = asyncio.Event()
+        while True:
+            self._ready.clear()
+            with self._cond:
+                if self._items:
+                    item = self._items.popleft()
+                    self._cond.notify()
+                    return item
+                if self._closed:
+                    return None
+            await self._ready.wait()
+
+    def close(self):
+        """关闭队列：不再接收新帧，剩余帧仍可被读取"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._notify()
+
+    def stats(self) -> Dict[str, Any]:
+        """队列统计"""
+        with self._cond:
+            return {
+                'depth': len(self._items),
+                'max_depth': self.max_depth,
+                'enqueued': self.enqueued,
+                'dropped': self.dropped,
+                'dropped_bytes': self.dropped_bytes,
+                'coalesced': self.coalesced
+            }
@@ -0,0 +1,138 @@
+"""
+服务端音频重采样与混音
+把客户端声明格式（任意采样率 / 声道数的 16bit PCM）向量化转换为识别服务要求的 16kHz 单声道，
+在分帧之前完成；支持流式分块输入，块边界处的滤波与插值状态会被保留
+"""
+from typing import Optional
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+TARGET_SAMPLE_RATE = 16000
+MIN_SAMPLE_RATE = 8000
+MAX_SAMPLE_RATE = 192000
+MAX_CHANNELS = 8
+
+
+def validate_format(sample_rate, channels) -> tuple:
+    """校验客户端声明的音频格式，返回 (sample_rate, channels)，不合法时抛出 ValueError"""
+    try:
+        sample_rate = int(sample_rate)
+        channels = int(channels)
+    except (TypeError, ValueError):
+        raise ValueError(f"无效的音频格式: sample_rate={sample_rate!r}, channels={channels!r}")
+    if not MIN_SAMPLE_RATE <= sample_rate <= MAX_SAMPLE_RATE:
+        raise ValueError(f"不支持的采样率: {sample_rate}Hz（支持 {MIN_SAMPLE_RATE}-{MAX_SAMPLE_RATE}Hz）")
+    if not 1 <= channels <= MAX_CHANNELS:
+        raise ValueError(f"不支持的声道数: {channels}")
+    return sample_rate, channels
+
+
+def needs_conversion(sample_rate: int, channels: int, output_rate: int = TARGET_SAMPLE_RATE) -> bool:
+    return sample_rate != output_rate or channels != 1
+
+
+def _lowpass_taps(input_rate: int, output_rate: int, num_taps: int):
+    """抗混叠低通 FIR（Hann 窗 sinc），截止频率取输出奈奎斯特频率的 90%"""
+    cutoff = 0.9 * output_rate / input_rate  # 相对输入奈奎斯特频率的归一化截止
+    n = np.arange(num_taps, dtype=np.float64) - (num_taps - 1) / 2
+    taps = cutoff * np.sinc(cutoff * n) * np.hanning(num_taps)
+    return (taps / taps.sum()).astype(np.float32)
+
+
+class AudioResampler:
+    """流式 16bit PCM 重采样器（混音为单声道 -> 抗混叠低通 -> 线性插值）
+
+    每次 process() 输入任意长度的交错 PCM 字节，返回已可确定的输出 PCM 字节；
+    不足一个采样帧的尾部字节、滤波器历史与插值相位在块之间保留，
+    因此分块输入与一次性输入的结果一致。
+    """
+
+    def __init__(self, input_rate: int, channels: int = 1, output_rate: int = TARGET_SAMPLE_RATE,
+                 num_taps: int = 63):
+        if np is None:
+            raise ImportError("音频重采样需要 numpy: pip install numpy")
+        self.input_rate, self.channels = validate_format(input_rate, channels)
+        self.output_rate = output_rate
+        self.step = self.input_rate / self.output_rate  # 每个输出样本前进的输入样本数
+
+        # 仅降采样时需要抗混叠滤波
+        self.taps = _lowpass_taps(self.input_rate, output_rate, num_taps) if self.input_rate > output_rate else None
+        self._history = np.zeros(len(self.taps) - 1 if self.taps is not None else 0, dtype=np.float32)
+
+        self._pending = b''      # 不足一个采样帧的字节
+        self._tail: Optional[np.ndarray] = None  # 上一块的最后一个（已滤波）样本
+        self._pos = 0.0          # 下一个输出样本在当前块（含 _tail）中的位置
+
+        # 统计
+        self.input_samples = 0
+        self.output_samples = 0
+
+    def _to_mono(self, data) -> np.ndarray:
+        frame_bytes = 2 * self.channels
+        if self._pending:
+            data = self._pending + bytes(data)
+        usable = len(data) - len(data) % frame_bytes
+        self._pending = bytes(data[usable:])
+        samples = np.frombuffer(data, dtype='<i2', count=usable // 2)
+        if self.channels == 1:
+            return samples.astype(np.float32)
+        return samples.reshape(-1, self.channels).mean(axis=1, dtype=np.float32)
+
+    def _filter(self, mono: np.ndarray) -> np.ndarray:
+        if self.taps is None:
+            return mono
+        padded = np.concatenate((self._history, mono))
+        self._history = padded[len(padded) - len(self._history):]
+        return np.convolve(padded, self.taps, mode='valid').astype(np.float32, copy=False)
+
+    def _interpolate(self, samples: np.ndarray) -> np.ndarray:
+        if self._tail is not None:
+            samples = np.concatenate((self._tail, samples))
+        last = len(samples) - 1
+        if last < 0:
+            return samples
+        self._tail = samples[-1:]
+        if self._pos > last:
+            self._pos -= last
+            return samples[:0]
+
+        count = int((last - self._pos) // self.step) + 1
+        positions = self._pos + self.step * np.arange(count, dtype=np.float64)
+        index = positions.astype(np.int64)
+        np.minimum(index, max(last - 1, 0), out=index)
+        frac = (positions - index).astype(np.float32)
+        upper = samples[np.minimum(index + 1, last)]
+        out = samples[index] + (upper - samples[index]) * frac
+        self._pos = positions[-1] + self.step - last
+        return out
+
+    def process(self, data) -> bytes:
+        """转换一块交错 16bit PCM，返回 16kHz（output_rate）单声道 16bit PCM"""
+        mono = self._to_mono(data)
+        if len(mono) == 0:
+            return b''
+        self.input_samples += len(mono)
+        out = self._interpolate(self._filter(mono))
+        self.output_samples += len(out)
+        return np.clip(np.rint(out), -32768, 32767).astype('<i2').tobytes()
+
+    def flush(self) -> bytes:
+        """输入结束时推出滤波器延迟中的剩余样本"""
+        if self.taps is None or len(self._history) == 0:
+            return b''
+        delay = len(self._history) // 2
+        out = self._interpolate(self._filter(np.zeros(delay, dtype=np.float32)))
+        self.output_samples += len(out)
+        return np.clip(np.rint(out), -32768, 32767).astype('<i2').tobytes()
+
+
+def resample_pcm(pcm: bytes, input_rate: int, channels: int = 1, output_rate: int = TARGET_SAMPLE_RATE) -> bytes:
+    """一次性转换整段 16bit PCM（格式已符合时原样返回）"""
+    if not needs_conversion(input_rate, channels, output_rate):
+        return pcm
+    resampler = AudioResampler(input_rate, channels, output_rate)
+    return resampler.process(pcm) + resampler.flush()
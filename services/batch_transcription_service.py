@@ -0,0 +1,148 @@
+"""
+批量语音转写服务
+将上传的 WAV/PCM 音频不做实时节拍、以协议允许的最快速度推送给流式识别服务，返回最终文本
+"""
+import concurrent.futures
+import io
+import threading
+import time
+import wave
+from typing import Callable, Dict, Any
+
+from services.speech_recognition_service import SpeechRecognitionService
+from services.audio_resampler import resample_pcm, validate_format
+
+
+class AudioTooLongError(ValueError):
+    """上传音频超过允许的最长时长"""
+
+
+class BatchTranscriptionService:
+    """上传音频转写（有界工作线程池，协程运行在共享事件循环宿主上）"""
+
+    # 每次写入识别服务的 PCM 字节数（识别服务内部再按 200ms 分帧）
+    FEED_BYTES = 64000
+    # 最短音频时长（秒）：不足一个分帧的音频不建立识别连接
+    MIN_DURATION = 0.2
+
+    def __init__(self, loop_host, service_factory: Callable[[], SpeechRecognitionService],
+                 max_workers: int = 4, max_pending: int = 16, timeout: float = 300.0,
+                 max_seconds: float = 600.0):
+        """
+        Args:
+            loop_host: SpeechLoopHost
+            service_factory: 无参可调用对象，返回一个未连接的 SpeechRecognitionService
+            max_workers: 同时转写的文件数
+            max_pending: 允许排队（含正在转写）的最大文件数，超过则直接拒绝
+            timeout: 单个文件的转写超时（秒）
+            max_seconds: 单个文件的最长音频时长（秒，0 表示不限），超过则在解码前拒绝
+        """
+        self.loop_host = loop_host
+        self.service_factory = service_factory
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self.max_seconds = max_seconds
+
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='asr-batch')
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    def transcribe(self, data: bytes, sample_rate: int = 16000, channels: int = 1) -> Dict[str, Any]:
+        """转写一段 WAV 或裸 PCM（16bit）音频，阻塞直到完成
+
+        裸 PCM 需通过 sample_rate / channels 说明格式；WAV 以文件头为准。
+        非 16kHz 单声道的音频先重采样 / 混音为 16kHz 单声道。
+        超过 max_seconds 的音频在解码前抛出 AudioTooLongError。
+        """
+        duration = self._estimate_duration(data, sample_rate, channels)
+        if self.max_seconds and duration > self.max_seconds:
+            raise AudioTooLongError(f"音频时长过长（{duration:.1f}秒），最长 {self.max_seconds:g} 秒")
+        with self._lock:
+            if self._pending >= self.max_pending:
+                raise RuntimeError(f"转写任务过多（{self.max_pending}），请稍后重试")
+            self._pending += 1
+        try:
+            future = self._executor.submit(self._transcribe, data, sample_rate, channels)
+            return future.result()
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    def _transcribe(self, data: bytes, sample_rate: int, channels: int) -> Dict[str, Any]:
+        pcm, rate, nchannels = self._decode_audio(data, sample_rate, channels)
+        # 非 16kHz 单声道音频先整体重采样 / 混音
+        rate, nchannels = validate_format(rate, nchannels)
+        pcm = resample_pcm(pcm, rate, nchannels)
+        duration = len(pcm) / (16000 * 2)
+        if duration < self.MIN_DURATION:
+            raise ValueError(f"音频时长过短（{duration:.3f}秒），至少需要 {self.MIN_DURATION:g} 秒")
+
+        started = time.monotonic()
+        worker = self.loop_host.acquire()
+        future = worker.submit(self._run(pcm, worker))
+        try:
+            text = future.result(timeout=self.timeout)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            raise RuntimeError(f"转写超时（{self.timeout:g}秒）")
+        elapsed = time.monotonic() - started
+        return {
+            'text': text,
+            'duration_seconds': round(duration, 3),
+            'elapsed_seconds': round(elapsed, 3),
+            'realtime_factor': round(elapsed / duration, 4)
+        }
+
+    @staticmethod
+    def _estimate_duration(data: bytes, sample_rate: int, channels: int) -> float:
+        """不解码音频，按 WAV 文件头的帧数（解码时只读取这么多帧）或裸 PCM 的字节数估算时长（秒）"""
+        if data[:4] != b'RIFF':
+            return len(data) / max(sample_rate * channels * 2, 1)
+        try:
+            with wave.open(io.BytesIO(data), 'rb') as wav:
+                return wav.getnframes() / max(wav.getframerate(), 1)
+        except (wave.Error, EOFError) as e:
+            raise ValueError(f"无法解析音频文件: {str(e)}")
+
+    @staticmethod
+    def _decode_audio(data: bytes, sample_rate: int, channels: int):
+        """解析 WAV；裸 PCM 先用 _pcm_to_full_wav 包装成 WAV 再统一解析"""
+        if data[:4] != b'RIFF':
+            data = SpeechRecognitionService._pcm_to_full_wav(data, sample_rate=sample_rate, channels=channels)
+        try:
+            with wave.open(io.BytesIO(data), 'rb') as wav:
+                if wav.getsampwidth() != 2:
+                    raise ValueError(f"只支持 16bit PCM（当前 {wav.getsampwidth() * 8}bit）")
+                pcm = wav.readframes(wav.getnframes())
+                return pcm, wav.getframerate(), wav.getnchannels()
+        except wave.Error as e:
+            raise ValueError(f"无法解析音频文件: {str(e)}")
+
+    async def _run(self, pcm: bytes, worker) -> str:
+        """推送整段音频（不做实时节拍）并等待识别结束，返回最后的识别文本"""
+        service = self.service_factory()
+        state = {'text': '', 'error': None}
+
+        def on_result(result):
+            state['text'] = result.get('text', '') or state['text']
+
+        def on_error(error_msg):
+            state['error'] = error_msg
+
+        service.set_callbacks(on_result=on_result, on_error=on_error)
+        service.use_session(worker.session)
+        await service.connect()
+        try:
+            view = memoryview(pcm)
+            for offset in range(0, len(view), self.FEED_BYTES):
+                await service.send_audio(view[offset:offset + self.FEED_BYTES])
+            await service.send_end_signal()
+            # 接收任务在收到最后一包或连接关闭时结束
+            await service.wait_final()
+        finally:
+            await service.disconnect()
+
+        if state['error'] and not state['text']:
+            raise RuntimeError(state['error'])
+        return state['text']
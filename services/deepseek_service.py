@@ -2,33 +2,85 @@
 DeepSeek LLM服务 - 用于行程规划和费用预算
 使用火山方舟-模型广场提供的在线推理服务
 """
+import concurrent.futures
+import copy
 import json
 import os
 import time
 import requests
 import textwrap
+import threading
 try:
     from volcenginesdkarkruntime import Ark
 except ImportError:
     raise ImportError("请先安装火山方舟SDK: pip install volcenginesdkarkruntime")
 
 from config import Config
+from services.plan_stream_parser import PlanStreamParser
+from services.plan_cache import make_plan_cache_key, make_plan_cache_scope
+from services.plan_similarity_index import extract_trip_facts
+from services.json_repair import JsonRepairer
 
 
 class DeepSeekService:
     """DeepSeek LLM服务"""
     
-    def __init__(self):
+    def __init__(self, plan_cache=None, plan_index=None, singleflight=None, singleflight_timeout=None,
+                 reuse_from=None):
+        """
+        Args:
+            plan_cache: 计划生成结果缓存（PlanCache，可选）；配置重载时传入同一实例以保留缓存
+            plan_index: 近似需求索引（PlanSimilarityIndex，可选，需同时提供 plan_cache）
+            singleflight: 请求合并（SingleFlight，可选）；相同需求并发到达时只调用一次模型
+            singleflight_timeout: 后到的相同请求等待共享结果的最长时间（秒），None 表示一直等待
+            reuse_from: 旧的 DeepSeekService（配置重载时传入）；API Key 与 base URL 未变时沿用其 Ark 客户端
+                和 HTTP 连接池，不必重新握手，否则关闭旧连接池；按天生成的并行数未变时沿用其线程池
+        """
+        self.plan_cache = plan_cache
+        self.plan_index = plan_index if plan_cache is not None else None
+        self.singleflight = singleflight
+        self.singleflight_timeout = singleflight_timeout
         self.api_key = Config.DEEPSEEK_API_KEY
         self.base_url = getattr(Config, 'ARK_BASE_URL', 'https://ark.cn-beijing.volces.com/api/v3')
         self.model = getattr(Config, 'DEEPSEEK_MODEL', 'deepseek-v3-1-250821')  # 火山方舟模型ID
-        try:
-            self.client = Ark(
-                api_key=self.api_key,
-                base_url=self.base_url
-            )
-        except Exception as e:
-            raise Exception(f"初始化火山方舟客户端失败: {str(e)}")
+        # REST 回退请求的连接池参数
+        self.http_pool_size = getattr(Config, 'ARK_HTTP_POOL_SIZE', 10)
+        self.http_retries = getattr(Config, 'ARK_HTTP_RETRIES', 2)
+        self.http_timeout = getattr(Config, 'ARK_HTTP_TIMEOUT', 60)
+        # 生成方式：single 为一次生成整份计划；fanout 为先生成骨架，再按天并行生成活动
+        self.generation_mode = getattr(Config, 'PLAN_GENERATION_MODE', 'single')
+        self.fanout_workers = getattr(Config, 'PLAN_FANOUT_WORKERS', 4)
+        self.fanout_min_days = getattr(Config, 'PLAN_FANOUT_MIN_DAYS', 4)
+        
+        if reuse_from is not None and reuse_from.api_key == self.api_key and reuse_from.base_url == self.base_url:
+            # 凭据未变：沿用已建立连接的客户端与连接池
+            self.client = reuse_from.client
+            self._http_session = reuse_from._http_session
+            self._http_lock = reuse_from._http_lock
+            print("[DeepSeekService] 配置未变，沿用现有的火山方舟客户端与连接池")
+        else:
+            self._http_session = None
+            self._http_lock = threading.Lock()
+            try:
+                self.client = Ark(
+                    api_key=self.api_key,
+                    base_url=self.base_url
+                )
+            except Exception as e:
+                raise Exception(f"初始化火山方舟客户端失败: {str(e)}")
+            if reuse_from is not None:
+                # 新实例创建成功后再释放旧的连接池（创建失败时调用方会继续使用旧实例）
+                reuse_from._close_http_session()
+        
+        # 按天生成线程池的创建锁：每个实例独立，不与沿用的 HTTP 连接池共用一把锁
+        self._fanout_lock = threading.Lock()
+        self._fanout_executor = None
+        if reuse_from is not None and reuse_from._fanout_executor is not None:
+            if reuse_from.fanout_workers == self.fanout_workers:
+                self._fanout_executor = reuse_from._fanout_executor
+            else:
+                # 并行数变化：旧线程池执行完已提交的任务后退出，新线程池在首次使用时按新并行数创建
+                reuse_from._fanout_executor.shutdown(wait=False)
     
     def is_configured(self):
         """检查配置是否完整"""
@@ -68,30 +120,8 @@ class DeepSeekService:
                         "max_tokens": max_tokens
                     }
 
-                    # 决定是否校验证书：优先使用 certifi 提供的 CA 证书；允许通过环境变量 DISABLE_SSL_VERIFY=1 来临时禁用
-                    verify = True
-                    try:
-                        import certifi
-                        verify = certifi.where()
-                    except Exception:
-                        # certifi 不可用时，仍然允许 requests 使用系统默认 CA，除非环境变量要求禁用
-                        if os.getenv('DISABLE_SSL_VERIFY', '0') == '1':
-                            verify = False
-
-                    # 使用带重试的 Session 减少瞬时网络错误影响
-                    session = requests.Session()
-                    try:
-                        from requests.adapters import HTTPAdapter
-                        from urllib3.util.retry import Retry
-                        retries = Retry(total=2, backoff_factor=1, status_forcelist=(429, 500, 502, 503, 504))
-                        adapter = HTTPAdapter(max_retries=retries)
-                        session.mount('https://', adapter)
-                        session.mount('http://', adapter)
-                    except Exception:
-                        # 如果无法导入 Retry，也继续使用默认 session
-                        pass
-
-                    resp = session.post(rest_url, json=payload, headers=headers, timeout=60, verify=verify)
+                    session = self._get_http_session()
+                    resp = session.post(rest_url, json=payload, headers=headers, timeout=self.http_timeout)
                     resp.raise_for_status()
                     result = resp.json()
                     return result.get('choices', [{}])[0].get('message', {}).get('content', '')
@@ -101,13 +131,87 @@ class DeepSeekService:
             # 非 SSL 类问题，直接抛出 SDK 的错误
             raise Exception(f"DeepSeek API调用失败: {err_msg}")
     
-    def generate_travel_plan(self, user_input, user_preferences=None):
-        """生成旅行计划
+    def _close_http_session(self):
+        """关闭 REST 回退的连接池（凭据变化、不再复用时调用）"""
+        with self._http_lock:
+            session, self._http_session = self._http_session, None
+        if session is not None:
+            session.close()
+    
+    def _get_http_session(self):
+        """REST 回退使用的长连接 Session（首次使用时创建，线程安全，多次回退之间复用连接）"""
+        if self._http_session is not None:
+            return self._http_session
+        with self._http_lock:
+            if self._http_session is not None:
+                return self._http_session
+            session = requests.Session()
+            
+            # 决定是否校验证书：优先使用 certifi 提供的 CA 证书；允许通过环境变量 DISABLE_SSL_VERIFY=1 来临时禁用
+            try:
+                import certifi
+                session.verify = certifi.where()
+            except Exception:
+                # certifi 不可用时，仍然允许 requests 使用系统默认 CA，除非环境变量要求禁用
+                if os.getenv('DISABLE_SSL_VERIFY', '0') == '1':
+                    session.verify = False
+            
+            # 使用带重试的连接池减少瞬时网络错误影响（模型调用没有副作用，POST 也允许重试）
+            from requests.adapters import HTTPAdapter
+            try:
+                from urllib3.util.retry import Retry
+                retries = Retry(
+                    total=self.http_retries,
+                    backoff_factor=1,
+                    status_forcelist=(429, 500, 502, 503, 504),
+                    allowed_methods=frozenset(['POST']) | Retry.DEFAULT_ALLOWED_METHODS
+                )
+            except Exception:
+                # 如果无法导入 Retry（或版本过旧），只按次数重试连接错误
+                retries = self.http_retries
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.http_pool_size, max_retries=retries)
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+            self._http_session = session
+            print(f"[DeepSeekService] 已创建 REST 回退连接池（最大连接数 {self.http_pool_size}）")
+            return session
+    
+    def _stream_api(self, messages, temperature=0.7, max_tokens=2000):
+        """以流式方式调用火山方舟 API，逐段产出模型输出的文本
         
-        Args:
-            user_input: 用户输入的旅行需求
-            user_preferences: 用户偏好设置（可选）
+        SDK 流式调用在产出任何内容之前出现 SSL / 握手类错误时，回退为一次性的 _call_api
+        （其内部再回退到 requests），并把完整结果作为一段产出。
         """
+        if not self.is_configured():
+            raise Exception("DeepSeek API未配置")
+        
+        produced = False
+        try:
+            stream = self.client.chat.completions.create(
+                model=self.model,
+                messages=messages,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                stream=True
+            )
+            for chunk in stream:
+                if not chunk.choices:
+                    continue
+                content = chunk.choices[0].delta.content
+                if content:
+                    produced = True
+                    yield content
+        except Exception as e:
+            err_msg = str(e)
+            low = err_msg.lower()
+            if not produced and any(k in low for k in ("ssl", "handshake", "unexpected_eof", "eof occurred", "timed out")):
+                print(f"[DeepSeekService] 流式调用失败，回退为普通调用: {err_msg}")
+                yield self._call_api(messages, temperature=temperature, max_tokens=max_tokens)
+                return
+            raise Exception(f"DeepSeek API流式调用失败: {err_msg}")
+    
+    def _build_plan_messages(self, user_input, pref_text=''):
+        """构建生成旅行计划的对话消息（系统提示 + 结合偏好的用户输入，pref_text 为 _format_preferences 的结果）"""
         system_prompt = """你是一个专业的旅行规划师。根据用户的输入和偏好设置，生成详细的旅行计划。
 
 **重要要求：**
@@ -177,56 +281,407 @@ class DeepSeekService:
 
 **关键：请确保返回的是完整的、有效的JSON格式，所有括号和引号必须闭合，不要包含其他文字或注释。**"""
         
-        # 构建完整的用户输入
-        full_input = user_input
-        
-        # 如果有用户偏好，添加到输入中
-        if user_preferences:
-            from services.preference_service import PreferenceService
-            pref_service = PreferenceService()
-            pref_text = pref_service.format_preferences_for_prompt(user_preferences)
-            if pref_text:
-                full_input = f"{user_input}\n\n{pref_text}"
-        
-        messages = [
+        return [
             {"role": "system", "content": system_prompt},
-            {"role": "user", "content": full_input}
+            {"role": "user", "content": self._compose_user_input(user_input, pref_text)}
         ]
+    
+    def _compose_user_input(self, user_input, pref_text=''):
+        """构建完整的用户输入，如果有用户偏好，添加到输入中"""
+        if pref_text:
+            return f"{user_input}\n\n{pref_text}"
+        return user_input
+    
+    def _format_preferences(self, user_preferences):
+        """把用户偏好格式化为提示词文本（无偏好时返回空字符串）"""
+        if not user_preferences:
+            return ''
+        from services.preference_service import PreferenceService
+        return PreferenceService().format_preferences_for_prompt(user_preferences) or ''
+    
+    def _lookup_cached_plan(self, user_input, pref_text):
+        """查找可复用的计划：先按精确缓存键，再按近似需求索引
+        
+        Returns:
+            (cache_key, scope, plan)；未启用缓存时 cache_key 为 None，未命中时 plan 为 None
+        """
+        if self.plan_cache is None:
+            return None, None, None
+        cache_key = make_plan_cache_key(user_input, pref_text, self.model)
+        scope = make_plan_cache_scope(pref_text, self.model)
+        plan = self.plan_cache.get(cache_key)
+        if plan is not None:
+            print("[DeepSeekService] 命中计划缓存，跳过模型调用")
+            return cache_key, scope, plan
+        
+        if self.plan_index is not None:
+            match = self.plan_index.query(user_input, scope)
+            if match is not None:
+                plan = self.plan_cache.get(match['key'])
+                if plan is None:
+                    # 计划已过期或被淘汰，索引中的记录随之失效
+                    self.plan_index.remove(match['key'])
+                else:
+                    print(f"[DeepSeekService] 命中相似需求（相似度 {match['similarity']}），复用已生成的计划")
+                    return cache_key, scope, plan
+        return cache_key, scope, None
+    
+    def _cache_plan(self, cache_key, scope, user_input, plan):
+        """只缓存成功解析的完整计划（占位结构带有 raw_response、有天数生成失败的计划带有 partial_days，均不缓存）"""
+        if cache_key is None or 'raw_response' in plan or plan.get('partial_days'):
+            return
+        self.plan_cache.put(cache_key, plan)
+        if self.plan_index is not None:
+            self.plan_index.add(user_input, cache_key, scope)
+    
+    def _finalize_plan(self, response):
+        """把模型的完整输出解析为计划；无法解析时返回包含原始响应的占位结构"""
+        print(f"[DeepSeekService] 收到响应，长度: {len(response)} 字符")
+        print(f"[DeepSeekService] 响应前200字符: {response[:200]}")
+        print(f"[DeepSeekService] 响应后200字符: {response[-200:]}")
+        
+        parsed_plan = self._parse_plan_response(response)
+        if parsed_plan is not None:
+            print("[DeepSeekService] JSON 解析成功")
+            return parsed_plan
+        
+        # 兜底：返回包含原始响应的占位结构
+        cleaned_response = self._strip_code_fences(str(response))
+        print("[DeepSeekService] 无法解析模型响应，返回占位数据。")
+        print(f"[DeepSeekService] 完整响应: {cleaned_response}")
+        return {
+            "destination": "未识别",
+            "duration": "未指定",
+            "budget": "未指定",
+            "people": "未指定",
+            "preferences": [],
+            "itinerary": [],
+            "total_budget": 0,
+            "tips": [],
+            "raw_response": cleaned_response
+        }
+    
+    def generate_travel_plan(self, user_input, user_preferences=None):
+        """生成旅行计划
         
+        Args:
+            user_input: 用户输入的旅行需求
+            user_preferences: 用户偏好设置（可选）
+        """
+        # 偏好文本每个请求只格式化一次，缓存键、请求合并和各次模型调用共用
+        pref_text = self._format_preferences(user_preferences)
+        cache_key, scope, cached = self._lookup_cached_plan(user_input, pref_text)
+        if cached is not None:
+            return cached
+        if self.singleflight is None:
+            return self._generate_plan(user_input, pref_text, cache_key, scope)
+        
+        # 相同需求（归一化输入 + 偏好 + 模型）正在生成时共享同一次调用
+        flight_key = cache_key or make_plan_cache_key(
+            user_input, pref_text, self.model
+        )
         try:
-            # 增加 max_tokens 以确保响应不被截断
-            response = self._call_api(messages, temperature=0.7, max_tokens=8000)
-            
-            print(f"[DeepSeekService] 收到响应，长度: {len(response)} 字符")
-            print(f"[DeepSeekService] 响应前200字符: {response[:200]}")
-            print(f"[DeepSeekService] 响应后200字符: {response[-200:]}")
-            
-            parsed_plan = self._parse_plan_response(response)
-            if parsed_plan is not None:
-                print("[DeepSeekService] JSON 解析成功")
-                return parsed_plan
-            
-            # 兜底：返回包含原始响应的占位结构
-            cleaned_response = self._strip_code_fences(str(response))
-            print("[DeepSeekService] 无法解析模型响应，返回占位数据。")
-            print(f"[DeepSeekService] 完整响应: {cleaned_response}")
-            return {
-                "destination": "未识别",
-                "duration": "未指定",
-                "budget": "未指定",
-                "people": "未指定",
-                "preferences": [],
-                "itinerary": [],
-                "total_budget": 0,
-                "tips": [],
-                "raw_response": cleaned_response
-            }
+            plan = self.singleflight.do(
+                flight_key,
+                lambda: self._generate_plan(user_input, pref_text, cache_key, scope),
+                timeout=self.singleflight_timeout
+            )
+        except TimeoutError as e:
+            raise Exception(f"生成旅行计划失败: {str(e)}，请稍后重试")
+        # 每个请求各自得到一份副本（后续会写入 id 等字段）
+        return copy.deepcopy(plan)
+    
+    def _generate_plan(self, user_input, pref_text, cache_key, scope):
+        """调用模型生成计划并写入缓存"""
+        messages = self._build_plan_messages(user_input, pref_text)
+        
+        try:
+            plan = None
+            if self._use_fanout(user_input):
+                plan = self._generate_fanout_plan(user_input, pref_text)
+            if plan is None:
+                # 增加 max_tokens 以确保响应不被截断
+                response = self._call_api(messages, temperature=0.7, max_tokens=8000)
+                if self._fanout_after_truncation(response):
+                    plan = self._generate_fanout_plan(user_input, pref_text)
+                if plan is None:
+                    plan = self._finalize_plan(response)
+            self._cache_plan(cache_key, scope, user_input, plan)
+            return plan
         except Exception as e:
             print(f"[DeepSeekService] 生成旅行计划异常: {str(e)}")
             import traceback
             traceback.print_exc()
             raise Exception(f"生成旅行计划失败: {str(e)}")
     
+    def generate_travel_plan_stream(self, user_input, user_preferences=None):
+        """流式生成旅行计划，逐个产出事件
+        
+        - {'type': 'delta', 'content': 文本片段}：模型输出到达即产出
+        - {'type': 'item', 'key': 'itinerary', 'index': i, 'value': {...}}：某一天行程 / 某个餐厅、住宿推荐闭合即产出
+        - {'type': 'field', 'key': 'destination', 'value': ...}：其他顶层字段闭合即产出
+        - {'type': 'plan', 'plan': 计划}：输出结束后解析得到的完整计划（最后一个事件）
+        
+        命中计划缓存（或相似需求）时只产出 plan 事件（带 'cached': True）；
+        分天并行生成时没有 delta 事件，骨架字段与各天行程按天的顺序产出。
+        一次生成的输出被截断而改为分天生成时，会从第 1 天起重新产出各天行程。
+        """
+        pref_text = self._format_preferences(user_preferences)
+        cache_key, scope, cached = self._lookup_cached_plan(user_input, pref_text)
+        if cached is not None:
+            yield {'type': 'plan', 'plan': cached, 'cached': True}
+            return
+        
+        messages = self._build_plan_messages(user_input, pref_text)
+        
+        try:
+            if self._use_fanout(user_input):
+                plan = yield from self._stream_fanout_plan(user_input, pref_text)
+                if plan is not None:
+                    self._cache_plan(cache_key, scope, user_input, plan)
+                    yield {'type': 'plan', 'plan': plan}
+                    return
+            
+            started = time.time()
+            first_content_at = None
+            parts = []
+            parser = PlanStreamParser()
+            for content in self._stream_api(messages, temperature=0.7, max_tokens=8000):
+                if first_content_at is None:
+                    first_content_at = time.time()
+                    print(f"[DeepSeekService] 首段内容到达，耗时 {first_content_at - started:.2f}秒")
+                parts.append(content)
+                yield {'type': 'delta', 'content': content}
+                yield from parser.feed(content)
+            print(f"[DeepSeekService] 流式输出结束，总耗时 {time.time() - started:.2f}秒")
+            response = ''.join(parts)
+            plan = None
+            if self._fanout_after_truncation(response):
+                plan = yield from self._stream_fanout_plan(user_input, pref_text)
+            if plan is None:
+                plan = self._finalize_plan(response)
+            self._cache_plan(cache_key, scope, user_input, plan)
+            yield {'type': 'plan', 'plan': plan}
+        except Exception as e:
+            print(f"[DeepSeekService] 流式生成旅行计划异常: {str(e)}")
+            import traceback
+            traceback.print_exc()
+            raise Exception(f"生成旅行计划失败: {str(e)}")
+    
+    # ------------------------- 分天并行生成 -------------------------
+    def _use_fanout(self, user_input):
+        """fanout 模式下，明确说明天数且不少于 fanout_min_days 的需求直接按天并行生成"""
+        if self.generation_mode != 'fanout':
+            return False
+        days = extract_trip_facts(user_input)['days']
+        return days is not None and days >= self.fanout_min_days
+    
+    def _fanout_after_truncation(self, response):
+        """fanout 模式下，一次生成的输出被截断（长行程超出 max_tokens）时改为按天并行生成"""
+        if self.generation_mode != 'fanout':
+            return False
+        repairer = JsonRepairer(self._strip_code_fences(response or ''))
+        try:
+            repairer.repair()
+        except RecursionError:
+            return False
+        if 'truncated' not in repairer.fixes:
+            return False
+        print("[DeepSeekService] 一次生成的输出被截断，改为骨架 + 按天并行生成")
+        return True
+    
+    def _get_fanout_executor(self):
+        """按天生成使用的有界线程池（所有请求共享，首次使用时创建）"""
+        if self._fanout_executor is None:
+            with self._fanout_lock:
+                if self._fanout_executor is None:
+                    self._fanout_executor = concurrent.futures.ThreadPoolExecutor(
+                        max_workers=self.fanout_workers, thread_name_prefix='plan-fanout'
+                    )
+        return self._fanout_executor
+    
+    def _generate_skeleton(self, user_input, pref_text=''):
+        """第一步：生成计划骨架（目的地、每日主题与区域、住宿、预算分配），无法解析时返回 None"""
+        system_prompt = """你是一个专业的旅行规划师。根据用户的输入和偏好设置，先给出旅行计划的骨架，不要安排具体活动。
+
+请以JSON格式返回，包含以下字段：
+{
+    "destination": "目的地",
+    "duration": 5,
+    "budget": 5000,
+    "people": 1,
+    "preferences": ["偏好1", "偏好2"],
+    "days": [
+        {"day": 1, "date": "日期", "theme": "当天主题", "area": "主要游览区域", "hotel": "当晚住宿酒店名称", "budget": 800}
+    ],
+    "accommodation_summary": [
+        {"hotel_name": "酒店名称", "nights": 4, "total_cost": 1200, "address": "地址", "features": ["特色1", "特色2"]}
+    ],
+    "restaurant_recommendations": [
+        {"name": "餐厅名称", "cuisine": "菜系", "signature_dishes": ["招牌菜1", "招牌菜2"], "avg_cost": 80, "address": "地址"}
+    ],
+    "total_budget": 5000,
+    "tips": ["建议1", "建议2"]
+}
+
+要求：days 的数量等于行程天数，各天主题和区域不要重复，每日预算之和不超过总预算；住宿和餐厅推荐必须具体。
+只返回JSON，不要包含其他文字或注释。"""
+        messages = [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": self._compose_user_input(user_input, pref_text)}
+        ]
+        started = time.time()
+        # 骨架无法解析时直接回退为一次生成，不再调用模型修复
+        skeleton = self._parse_plan_response(self._call_api(messages, temperature=0.7, max_tokens=3000),
+                                             model_repair=False)
+        if not isinstance(skeleton, dict) or not isinstance(skeleton.get('days'), list) or not skeleton['days']:
+            print("[DeepSeekService] 骨架生成失败，改为一次生成整份计划")
+            return None
+        print(f"[DeepSeekService] 骨架生成完成：{len(skeleton['days'])} 天，耗时 {time.time() - started:.2f}秒")
+        return skeleton
+    
+    def _generate_day(self, skeleton, outline, user_input, pref_text=''):
+        """第二步：按骨架生成某一天的活动，返回 (当天行程, 是否生成成功)；失败时当天只有概要、没有活动"""
+        day_number = outline.get('day')
+        others = [f"第{d.get('day')}天：{d.get('theme', '')}（{d.get('area', '')}）"
+                  for d in skeleton['days'] if d is not outline]
+        system_prompt = """你是一个专业的旅行规划师。请为旅行计划中的某一天安排详细活动。
+
+**重要要求：**
+1. 住宿和餐厅必须具体，包括名称、地址、价格区间、特色
+2. 活动围绕当天主题和区域安排，不要与其他天的安排重复
+3. 当天费用不超过当天预算
+
+请以JSON格式返回这一天：
+{
+    "day": 1,
+    "date": "日期",
+    "activities": [
+        {
+            "time": "时间",
+            "type": "类型（交通/住宿/景点/餐厅）",
+            "name": "名称",
+            "description": "描述",
+            "details": {
+                "address": "具体地址（住宿和餐厅必填）",
+                "price_range": "价格区间",
+                "rating": "评分",
+                "highlights": ["特色1", "特色2"],
+                "contact": "联系方式（可选）"
+            },
+            "location": {"name": "地点名称", "lng": 104.06, "lat": 30.67},
+            "cost": 100,
+            "duration": "预计时长"
+        }
+    ],
+    "total_cost": 500
+}
+
+只返回JSON，不要包含其他文字或注释。"""
+        brief = textwrap.dedent(f"""
+            目的地：{skeleton.get('destination', '')}，共 {len(skeleton['days'])} 天，{skeleton.get('people', 1)} 人，总预算 {skeleton.get('total_budget', skeleton.get('budget', ''))}
+            请安排第 {day_number} 天（{outline.get('date', '')}）：主题「{outline.get('theme', '')}」，区域「{outline.get('area', '')}」，当晚住宿「{outline.get('hotel', '')}」，当天预算 {outline.get('budget', '')}
+            其他天的安排：{'；'.join(others)}
+        """).strip()
+        messages = [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": f"{self._compose_user_input(user_input, pref_text)}\n\n{brief}"}
+        ]
+        try:
+            # 单天无法解析时只保留概要，不为每一天各调用一次模型修复
+            day = self._parse_plan_response(self._call_api(messages, temperature=0.7, max_tokens=3000),
+                                            model_repair=False)
+            if isinstance(day, dict) and isinstance(day.get('activities'), list):
+                day['day'] = day_number
+                day.setdefault('date', outline.get('date', ''))
+                return day, True
+            print(f"[WARN] 第 {day_number} 天行程无法解析，只保留概要")
+        except Exception as e:
+            print(f"[WARN] 第 {day_number} 天行程生成失败，只保留概要: {e}")
+        return {
+            'day': day_number,
+            'date': outline.get('date', ''),
+            'activities': [],
+            'total_cost': outline.get('budget', 0)
+        }, False
+    
+    def _iter_fanout_days(self, skeleton, user_input, pref_text=''):
+        """并行生成各天活动，按天的顺序产出 (序号, 当天行程, 是否生成成功)：前面的天全部完成后才产出后面的天
+
+        调用方提前停止迭代（流式请求的客户端断开、生成器被关闭）时取消尚未开始的天，不再占用线程池和模型调用
+        """
+        for index, outline in enumerate(skeleton['days']):
+            if not isinstance(outline, dict):
+                skeleton['days'][index] = {'day': index + 1}
+            else:
+                outline.setdefault('day', index + 1)
+        started = time.time()
+        executor = self._get_fanout_executor()
+        futures = [
+            executor.submit(self._generate_day, skeleton, outline, user_input, pref_text)
+            for outline in skeleton['days']
+        ]
+        try:
+            for index, future in enumerate(futures):
+                day, complete = future.result()
+                yield index, day, complete
+        finally:
+            cancelled = sum(1 for future in futures if future.cancel())
+            if cancelled:
+                print(f"[DeepSeekService] 按天生成提前结束，已取消 {cancelled} 天")
+        print(f"[DeepSeekService] {len(futures)} 天行程并行生成完成，耗时 {time.time() - started:.2f}秒")
+    
+    def _generate_fanout_plan(self, user_input, pref_text=''):
+        """骨架 + 按天并行生成完整计划；骨架无法生成时返回 None"""
+        skeleton = self._generate_skeleton(user_input, pref_text)
+        if skeleton is None:
+            return None
+        days, failed = [], []
+        for _, day, complete in self._iter_fanout_days(skeleton, user_input, pref_text):
+            days.append(day)
+            if not complete:
+                failed.append(day['day'])
+        return self._merge_skeleton(skeleton, days, failed)
+    
+    def _merge_skeleton(self, skeleton, days, failed_days=()):
+        """把骨架与各天行程合并为与一次生成相同结构的计划；有天数生成失败时记入 partial_days（不缓存）"""
+        plan = {key: value for key, value in skeleton.items() if key != 'days'}
+        plan['duration'] = len(days)
+        plan['itinerary'] = days
+        plan.setdefault('preferences', [])
+        plan.setdefault('accommodation_summary', [])
+        plan.setdefault('restaurant_recommendations', [])
+        plan.setdefault('tips', [])
+        if not plan.get('total_budget'):
+            day_costs = [day.get('total_cost') for day in days]
+            if all(isinstance(cost, (int, float)) for cost in day_costs):
+                plan['total_budget'] = sum(day_costs)
+        if failed_days:
+            plan['partial_days'] = list(failed_days)
+        return plan
+    
+    def _stream_fanout_plan(self, user_input, pref_text=''):
+        """以流式事件产出分天并行生成的计划（先产出骨架字段，再按顺序产出每一天），返回合并后的计划；
+        骨架无法生成时不产出事件，返回 None"""
+        skeleton = self._generate_skeleton(user_input, pref_text)
+        if skeleton is None:
+            return None
+        for key, value in skeleton.items():
+            if key == 'days':
+                continue
+            if key in ('accommodation_summary', 'restaurant_recommendations') and isinstance(value, list):
+                for index, item in enumerate(value):
+                    yield {'type': 'item', 'key': key, 'index': index, 'value': item}
+            else:
+                yield {'type': 'field', 'key': key, 'value': value}
+        days, failed = [], []
+        for index, day, complete in self._iter_fanout_days(skeleton, user_input, pref_text):
+            days.append(day)
+            if not complete:
+                failed.append(day['day'])
+            yield {'type': 'item', 'key': 'itinerary', 'index': index, 'value': day}
+        return self._merge_skeleton(skeleton, days, failed)
+    
     # ------------------------- 辅助方法 -------------------------
     def _strip_code_fences(self, text):
         """移除 Markdown 代码块包裹"""
@@ -257,8 +712,12 @@ class DeepSeekService:
             return None
         return text[start:end + 1]
     
-    def _parse_plan_response(self, response_text):
-        """解析模型返回的文本为 JSON。必要时尝试一次自动修复。"""
+    def _parse_plan_response(self, response_text, model_repair=True):
+        """解析模型返回的文本为 JSON。失败时先本地修复，仍失败才调用模型修复一次（model_repair 为 False 时不调用）。
+
+        输出被截断时本地修复只能补全括号、丢掉后面的行程，这样的结果不采用（否则会被缓存并复用），
+        交给模型修复。
+        """
         if not response_text:
             print("[DeepSeekService] 响应为空")
             return None
@@ -283,15 +742,40 @@ class DeepSeekService:
                 print(f"[DeepSeekService] 候选项 {i+1} 解析失败: {str(e)}")
                 print(f"[DeepSeekService] 失败位置: 第 {e.lineno} 行, 第 {e.colno} 列")
                 print(f"[DeepSeekService] 错误附近内容: {candidate[max(0, e.pos-50):min(len(candidate), e.pos+50)]}")
+            except RecursionError:
+                print(f"[DeepSeekService] 候选项 {i+1} 嵌套过深，无法解析")
+        
+        # 先在本地做确定性修复（悬挂逗号、单引号、注释、未转义换行等）
+        repairer = JsonRepairer(cleaned or response_text)
+        started = time.time()
+        parsed = None
+        try:
+            repaired = repairer.repair()
+            if repaired:
+                parsed = json.loads(repaired)
+        except (RecursionError, ValueError) as e:
+            print(f"[DeepSeekService] 本地修复异常: {type(e).__name__}")
+        if 'truncated' in repairer.fixes:
+            print("[DeepSeekService] 输出被截断，本地修复结果不完整，不予采用")
+        elif isinstance(parsed, dict):
+            print(f"[DeepSeekService] 本地修复 JSON 成功（{', '.join(sorted(repairer.fixes)) or '无改动'}），"
+                  f"耗时 {(time.time() - started) * 1000:.1f}ms")
+            return parsed
+        
+        if not model_repair:
+            print("[DeepSeekService] 本地修复失败")
+            return None
         
-        # 若直接解析失败，尝试让模型自我修复一次
-        print("[DeepSeekService] 尝试自动修复 JSON...")
+        # 本地修复失败时，再让模型自我修复一次
+        print("[DeepSeekService] 本地修复失败，尝试调用模型修复 JSON...")
         repaired = self._attempt_repair_json(cleaned or response_text)
         if repaired:
             try:
                 parsed = json.loads(repaired)
                 print("[DeepSeekService] 修复后的 JSON 解析成功")
                 return parsed
+            except RecursionError:
+                print("[DeepSeekService] 修复后的 JSON 嵌套过深，无法解析")
             except json.JSONDecodeError as e:
                 print(f"[DeepSeekService] 修复后的 JSON 仍然解析失败: {str(e)}")
                 # 再次直接解析失败，尝试截取主体后重试
@@ -0,0 +1,294 @@
+"""
+本地 JSON 修复
+模型输出不是合法 JSON 时，先在本地做确定性修复，只有修复失败才需要再调用模型：
+- 悬挂逗号、缺失的逗号 / 冒号
+- 单引号字符串、未加引号的键或值、Python 字面量（True / False / None）
+- // 与 /* */ 注释
+- 字符串中未转义的换行、制表符和引号
+- 输出被截断：闭合未结束的字符串，丢弃不完整的键，按括号栈补全
+"""
+import json
+import re
+from typing import Optional, List, Tuple, Any
+
+# 词法单元类型
+_PUNCT = 'punct'
+_STRING = 'string'
+_NUMBER = 'number'
+_WORD = 'word'
+
+_NUMBER_RE = re.compile(r'[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?')
+_WORD_STOP = set(',:{}[]"\'\n\r')
+_LITERALS = {
+    'true': True, 'True': True,
+    'false': False, 'False': False,
+    'null': None, 'None': None, 'undefined': None,
+    'NaN': None, 'Infinity': None, '-Infinity': None,
+}
+_ESCAPES = {'n': '\n', 't': '\t', 'r': '\r', 'b': '\b', 'f': '\f', '/': '/', '\\': '\\', '"': '"', "'": "'"}
+
+
+class JsonRepairer:
+    """容错的 JSON 词法 + 语法分析器，解析结果重新序列化为合法 JSON
+
+    repair() 返回修复后的 JSON 文本（根必须是对象或数组），无法修复时返回 None；
+    fixes 记录本次做过的修复类型，便于日志排查。
+    """
+
+    def __init__(self, text: str):
+        self.text = text or ''
+        self.fixes = set()
+        self._tokens: List[Tuple[str, Any, bool]] = []  # (类型, 值, 是否被截断)
+        self._index = 0
+
+    def repair(self) -> Optional[str]:
+        start = min((i for i in (self.text.find('{'), self.text.find('[')) if i != -1), default=-1)
+        if start == -1:
+            return None
+        self._tokenize(start)
+        if not self._tokens:
+            return None
+        value = self._parse_value()
+        if not isinstance(value, (dict, list)):
+            return None
+        return json.dumps(value, ensure_ascii=False)
+
+    # ------------------------- 词法 -------------------------
+    def _tokenize(self, pos: int):
+        text = self.text
+        n = len(text)
+        while pos < n:
+            c = text[pos]
+            if c.isspace():
+                pos += 1
+            elif c in '{}[]:,':
+                self._tokens.append((_PUNCT, c, False))
+                pos += 1
+            elif c == '/' and text.startswith('//', pos):
+                self.fixes.add('comment')
+                end = text.find('\n', pos)
+                pos = n if end == -1 else end + 1
+            elif c == '/' and text.startswith('/*', pos):
+                self.fixes.add('comment')
+                end = text.find('*/', pos + 2)
+                pos = n if end == -1 else end + 2
+            elif c == '`' and text.startswith('```', pos):
+                # 代码块结束标记之后的内容不再是 JSON
+                break
+            elif c in '"\'':
+                pos = self._read_string(pos, c)
+            else:
+                match = _NUMBER_RE.match(text, pos)
+                end = match.end() if match else pos
+                if match and (end >= n or text[end] in _WORD_STOP or text[end].isspace() or text[end] == '/'):
+                    self._tokens.append((_NUMBER, match.group(), end >= n))
+                    pos = end
+                else:
+                    pos = self._read_word(pos)
+
+    def _read_string(self, pos: int, quote: str) -> int:
+        text = self.text
+        n = len(text)
+        if quote == "'":
+            self.fixes.add('single_quote')
+        chars = []
+        i = pos + 1
+        while i < n:
+            c = text[i]
+            if c == '\\':
+                if i + 1 >= n:
+                    break
+                nxt = text[i + 1]
+                if nxt == 'u' and re.fullmatch(r'[0-9a-fA-F]{4}', text[i + 2:i + 6] or ''):
+                    chars.append(chr(int(text[i + 2:i + 6], 16)))
+                    i += 6
+                    continue
+                chars.append(_ESCAPES.get(nxt, nxt))
+                i += 2
+                continue
+            if c == quote:
+                if self._closes_string(i + 1):
+                    self._tokens.append((_STRING, ''.join(chars), False))
+                    return i + 1
+                # 字符串内部未转义的引号
+                self.fixes.add('unescaped_quote')
+            elif c in '\n\r\t':
+                self.fixes.add('control_char')
+            chars.append(c)
+            i += 1
+        self.fixes.add('truncated')
+        self._tokens.append((_STRING, ''.join(chars), True))
+        return n
+
+    def _closes_string(self, pos: int) -> bool:
+        """引号之后（跳过空白）是分隔符、另一个字符串、注释或文本结束，才视为字符串结束"""
+        text = self.text
+        n = len(text)
+        while pos < n and text[pos].isspace():
+            pos += 1
+        if pos >= n:
+            return True
+        c = text[pos]
+        return c in ',:}]"\'' or text.startswith('//', pos) or text.startswith('/*', pos) or text.startswith('```', pos)
+
+    def _read_word(self, pos: int) -> int:
+        """未加引号的键 / 值 / 字面量，读到分隔符或换行为止"""
+        text = self.text
+        n = len(text)
+        end = pos
+        while end < n and text[end] not in _WORD_STOP and not text.startswith('//', end):
+            end += 1
+        word = text[pos:end].strip()
+        if word:
+            self._tokens.append((_WORD, word, end >= n))
+        return max(end, pos + 1)
+
+    # ------------------------- 语法 -------------------------
+    def _peek(self):
+        return self._tokens[self._index] if self._index < len(self._tokens) else None
+
+    def _next(self):
+        token = self._peek()
+        self._index += 1
+        return token
+
+    def _parse_value(self):
+        token = self._next()
+        if token is None:
+            return None
+        kind, value, truncated = token
+        if kind == _PUNCT:
+            if value == '{':
+                return self._parse_object()
+            if value == '[':
+                return self._parse_array()
+            return None
+        if kind == _STRING:
+            return value
+        if kind == _NUMBER:
+            return self._number(value)
+        if value in _LITERALS:
+            if value not in ('true', 'false', 'null'):
+                self.fixes.add('python_literal')
+            return _LITERALS[value]
+        self.fixes.add('bare_word')
+        return value
+
+    def _number(self, raw: str):
+        raw = raw.lstrip('+')
+        try:
+            number = json.loads(raw)
+        except ValueError:
+            # 截断的数字（如 "12." "1e"）或 ".5" 这类非标准写法
+            self.fixes.add('number')
+            try:
+                number = float(raw.rstrip('eE+-').rstrip('.') or 0)
+            except ValueError:
+                return None
+            if number.is_integer() and '.' not in raw:
+                number = int(number)
+        return number
+
+    def _is_value_start(self, token) -> bool:
+        return token is not None and (token[0] != _PUNCT or token[1] in '{[')
+
+    def _parse_object(self) -> dict:
+        result = {}
+        expect_comma = False
+        while True:
+            token = self._peek()
+            if token is None:
+                self.fixes.add('truncated')
+                return result
+            kind, value, truncated = token
+            if kind == _PUNCT and value in '}]':
+                if value == '}':
+                    self._index += 1
+                else:
+                    self.fixes.add('mismatched_bracket')
+                return result
+            if kind == _PUNCT and value == ',':
+                self._index += 1
+                if self._peek() is not None and self._peek()[:2] == (_PUNCT, '}'):
+                    self.fixes.add('trailing_comma')
+                expect_comma = False
+                continue
+            if kind == _PUNCT and value == ':':
+                self._index += 1
+                continue
+            if kind == _PUNCT and value in '{[':
+                # 缺少键的值，跳过
+                self._parse_value()
+                expect_comma = True
+                continue
+            if expect_comma:
+                self.fixes.add('missing_comma')
+
+            # 键
+            self._index += 1
+            if kind == _WORD:
+                self.fixes.add('unquoted_key')
+            key = str(value)
+            if truncated:
+                return result
+            colon = self._peek()
+            if colon is None:
+                self.fixes.add('truncated')
+                return result
+            if colon[:2] == (_PUNCT, ':'):
+                self._index += 1
+            elif self._is_value_start(colon):
+                self.fixes.add('missing_colon')
+            else:
+                # 只有键没有值（如 {"a", "b": 1}）
+                expect_comma = True
+                continue
+            if self._peek() is None:
+                self.fixes.add('truncated')
+                return result
+            if not self._is_value_start(self._peek()):
+                result[key] = None
+            else:
+                item = self._peek()
+                if item[2] and item[0] in (_WORD, _NUMBER) and item[1] not in _LITERALS:
+                    # 截断的字面量（如 "tru"、半个单词）
+                    self._index += 1
+                    self.fixes.add('truncated')
+                    return result
+                result[key] = self._parse_value()
+            expect_comma = True
+
+    def _parse_array(self) -> list:
+        result = []
+        expect_comma = False
+        while True:
+            token = self._peek()
+            if token is None:
+                self.fixes.add('truncated')
+                return result
+            kind, value, truncated = token
+            if kind == _PUNCT and value in ']}':
+                if value == ']':
+                    self._index += 1
+                else:
+                    self.fixes.add('mismatched_bracket')
+                return result
+            if kind == _PUNCT and value in ',:':
+                self._index += 1
+                if value == ',' and self._peek() is not None and self._peek()[:2] == (_PUNCT, ']'):
+                    self.fixes.add('trailing_comma')
+                expect_comma = False
+                continue
+            if expect_comma:
+                self.fixes.add('missing_comma')
+            if truncated and kind in (_WORD, _NUMBER) and value not in _LITERALS:
+                self._index += 1
+                self.fixes.add('truncated')
+                return result
+            result.append(self._parse_value())
+            expect_comma = True
+
+
+def repair_json(text: str) -> Optional[str]:
+    """修复模型输出的 JSON，返回合法 JSON 文本；找不到可修复的对象 / 数组时返回 None"""
+    return JsonRepairer(text).repair()
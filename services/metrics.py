@@ -0,0 +1,57 @@
+"""
+进程内指标
+语音链路与计划生成任务共用的直方图
+"""
+import threading
+from collections import deque
+from typing import Dict, Any, Sequence
+
+
+class Histogram:
+    """固定分桶直方图（累计计数）+ 最近样本窗口（用于分位数），线程安全"""
+
+    def __init__(self, bounds: Sequence[float], window: int = 1000):
+        self.bounds = tuple(bounds)
+        self._counts = [0] * (len(self.bounds) + 1)  # 最后一个桶为 +Inf
+        self._recent = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self.count = 0
+        self.total = 0.0
+        self.max = None
+
+    def observe(self, value: float):
+        with self._lock:
+            index = len(self.bounds)
+            for i, bound in enumerate(self.bounds):
+                if value <= bound:
+                    index = i
+                    break
+            self._counts[index] += 1
+            self._recent.append(value)
+            self.count += 1
+            self.total += value
+            self.max = value if self.max is None else max(self.max, value)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            recent = sorted(self._recent)
+            buckets = {}
+            cumulative = 0
+            for bound, count in zip(self.bounds + ('+Inf',), self._counts):
+                cumulative += count
+                buckets[str(bound)] = cumulative
+
+            def percentile(p):
+                if not recent:
+                    return None
+                return round(recent[min(len(recent) - 1, int(len(recent) * p))], 1)
+
+            return {
+                'count': self.count,
+                'avg': round(self.total / self.count, 1) if self.count else None,
+                'max': round(self.max, 1) if self.max is not None else None,
+                'p50': percentile(0.5),
+                'p90': percentile(0.9),
+                'p99': percentile(0.99),
+                'buckets': buckets
+            }
@@ -0,0 +1,207 @@
+"""
+旅行计划生成结果缓存
+相同或仅有空白、标点差异的请求直接复用已生成的计划，避免重复的长输出 LLM 调用。
+内存层：TTL + LRU（按条目数与字节数限制）；可选磁盘层：进程重启后仍可命中
+"""
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Optional, Dict, Any
+
+
+def normalize_plan_input(text: str) -> str:
+    """折叠全半角、大小写、空白与标点，例如 "成都 5天，美食之旅！" 与 "成都5天美食之旅" 相同"""
+    text = unicodedata.normalize('NFKC', text or '').lower()
+    return ''.join(
+        ch for ch in text
+        if not ch.isspace() and not unicodedata.category(ch).startswith('P')
+    )
+
+
+def make_plan_cache_scope(preferences_text: str, model: str) -> str:
+    """缓存作用域：模型 ID + 偏好提示词的哈希（只有同一作用域内的计划可以互相复用）"""
+    preferences_hash = hashlib.sha256((preferences_text or '').encode('utf-8')).hexdigest()
+    return hashlib.sha256(f"{model or ''}\x1f{preferences_hash}".encode('utf-8')).hexdigest()
+
+
+def make_plan_cache_key(augmented_input: str, preferences_text: str, model: str) -> str:
+    """缓存键：作用域 + 归一化后的输入"""
+    raw = make_plan_cache_scope(preferences_text, model) + '\x1f' + normalize_plan_input(augmented_input)
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+class PlanCache:
+    """线程安全的计划缓存
+
+    计划以 JSON 字符串保存，get() 每次返回新的对象，调用方修改（如补全字段、写入 id）不影响缓存。
+    """
+
+    def __init__(self, ttl: float = 86400.0, max_entries: int = 256, max_bytes: int = 32 * 1024 * 1024,
+                 disk_dir: Optional[str] = None, disk_max_entries: int = 2000):
+        """
+        Args:
+            ttl: 条目有效期（秒）
+            max_entries: 内存层最多条目数
+            max_bytes: 内存层最多占用字节数（按序列化后的 JSON 计）
+            disk_dir: 磁盘层目录；为空时只使用内存层
+            disk_max_entries: 磁盘层最多文件数（超出时删除最旧的）
+        """
+        self.ttl = ttl
+        self.max_entries = max(1, int(max_entries))
+        self.max_bytes = max(1, int(max_bytes))
+        self.disk_dir = disk_dir or None
+        self.disk_max_entries = disk_max_entries
+        if self.disk_dir:
+            os.makedirs(self.disk_dir, exist_ok=True)
+
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (expires_at, payload)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._disk_writes = 0
+
+        # 统计
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """读取缓存的计划，未命中或已过期返回 None"""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return json.loads(entry[1])
+                self._remove(key)
+                self.expirations += 1
+
+        entry = self._read_disk(key, now)
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+            self._store(key, entry[0], entry[1])
+        return json.loads(entry[1])
+
+    def put(self, key: str, plan: Dict[str, Any]):
+        """写入计划（内存层，以及启用时的磁盘层）"""
+        payload = json.dumps(plan, ensure_ascii=False)
+        expires_at = time.time() + self.ttl
+        with self._lock:
+            self._store(key, expires_at, payload)
+        self._write_disk(key, expires_at, payload)
+
+    def clear(self):
+        """清空内存层（磁盘层保留）"""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_entries': self.max_entries,
+                'max_bytes': self.max_bytes,
+                'ttl_seconds': self.ttl,
+                'hits': self.hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'hit_rate': round((self.hits + self.disk_hits) / lookups, 4) if lookups else None,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'disk_enabled': bool(self.disk_dir)
+            }
+
+    # ------------------------- 内存层 -------------------------
+    def _store(self, key: str, expires_at: float, payload: str):
+        """写入内存层并按 LRU 淘汰（调用方持有锁）"""
+        if key in self._entries:
+            self._remove(key)
+        size = len(payload.encode('utf-8'))
+        if size > self.max_bytes:
+            return
+        self._entries[key] = (expires_at, payload)
+        self._bytes += size
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def _remove(self, key: str):
+        _, payload = self._entries.pop(key)
+        self._bytes -= len(payload.encode('utf-8'))
+
+    # ------------------------- 磁盘层 -------------------------
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, f"{key}.json")
+
+    def _read_disk(self, key: str, now: float) -> Optional[tuple]:
+        if not self.disk_dir:
+            return None
+        path = self._disk_path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                record = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            print(f"[PlanCache] 读取磁盘缓存失败: {e}")
+            return None
+        if record.get('expires_at', 0) <= now:
+            self._delete_file(path)
+            with self._lock:
+                self.expirations += 1
+            return None
+        return record['expires_at'], record['plan']
+
+    def _write_disk(self, key: str, expires_at: float, payload: str):
+        if not self.disk_dir:
+            return
+        try:
+            # 先写临时文件再替换，避免并发读取到半个文件
+            fd, tmp_path = tempfile.mkstemp(dir=self.disk_dir, suffix='.tmp')
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump({'expires_at': expires_at, 'plan': payload}, f, ensure_ascii=False)
+            os.replace(tmp_path, self._disk_path(key))
+        except OSError as e:
+            print(f"[PlanCache] 写入磁盘缓存失败: {e}")
+            return
+        with self._lock:
+            self._disk_writes += 1
+            prune = self._disk_writes % 50 == 0
+        if prune:
+            self._prune_disk()
+
+    def _prune_disk(self):
+        """删除过期文件，并把文件数限制在 disk_max_entries 以内（先删最旧的）"""
+        try:
+            paths = [os.path.join(self.disk_dir, name) for name in os.listdir(self.disk_dir)
+                     if name.endswith('.json')]
+            paths.sort(key=os.path.getmtime)
+        except OSError:
+            return
+        now = time.time()
+        excess = len(paths) - self.disk_max_entries
+        for index, path in enumerate(paths):
+            if index < excess or os.path.getmtime(path) + self.ttl < now:
+                self._delete_file(path)
+
+    @staticmethod
+    def _delete_file(path: str):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
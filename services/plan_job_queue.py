@@ -0,0 +1,189 @@
+"""
+旅行计划异步生成任务队列
+提交后立即返回任务 ID，由有界工作线程池执行生成与保存；客户端轮询任务状态或通过 Socket.IO 接收推送。
+按用户限制同时进行的任务数，并统计排队深度、等待与执行耗时
+"""
+import concurrent.futures
+import threading
+import time
+import traceback
+import uuid
+from typing import Callable, Dict, Any, Optional
+
+from services.metrics import Histogram
+
+# 任务等待 / 执行耗时直方图的桶上界（秒）
+JOB_SECONDS_BUCKETS = (1, 2, 5, 10, 20, 30, 45, 60, 90, 120, 300)
+
+QUEUED = 'queued'
+RUNNING = 'running'
+SUCCEEDED = 'succeeded'
+FAILED = 'failed'
+
+
+class PlanJobQueue:
+    """计划生成任务队列（线程池执行，任务状态保存在内存中）"""
+
+    def __init__(self, runner: Callable[[Dict[str, Any]], Dict[str, Any]], max_workers: int = 4,
+                 max_queue: int = 50, max_per_user: int = 2, result_ttl: float = 3600.0,
+                 on_update: Optional[Callable[[Dict[str, Any]], None]] = None):
+        """
+        Args:
+            runner: 执行一个任务，参数为提交时的请求数据，返回生成（并保存）后的计划
+            max_workers: 同时执行的任务数
+            max_queue: 允许排队（含执行中）的最大任务数，超过则拒绝提交
+            max_per_user: 每个用户同时排队或执行的最大任务数
+            result_ttl: 已结束任务的保留时间（秒），过期后无法再查询
+            on_update: 任务状态变化时回调（参数为任务快照），用于推送
+        """
+        self.runner = runner
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.max_per_user = max_per_user
+        self.result_ttl = result_ttl
+        self.on_update = on_update
+
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='plan-job')
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        self._active_by_user: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+        # 统计
+        self.wait_seconds = Histogram(JOB_SECONDS_BUCKETS)
+        self.run_seconds = Histogram(JOB_SECONDS_BUCKETS)
+        self.submitted = 0
+        self.succeeded = 0
+        self.failed = 0
+        self.rejected_queue_full = 0
+        self.rejected_user_limit = 0
+
+    def submit(self, user_key: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """提交任务，返回任务快照；队列已满或该用户任务过多时抛出 RuntimeError"""
+        with self._lock:
+            self._expire_locked()
+            active = sum(1 for job in self._jobs.values() if job['status'] in (QUEUED, RUNNING))
+            if active >= self.max_queue:
+                self.rejected_queue_full += 1
+                raise RuntimeError(f"计划生成任务过多（{self.max_queue}），请稍后重试")
+            if self._active_by_user.get(user_key, 0) >= self.max_per_user:
+                self.rejected_user_limit += 1
+                raise RuntimeError(f"您已有 {self.max_per_user} 个计划正在生成，请等待完成后再提交")
+
+            job_id = uuid.uuid4().hex
+            job = {
+                'id': job_id,
+                'status': QUEUED,
+                'user_key': user_key,
+                'created_at': time.time(),
+                'started_at': None,
+                'finished_at': None,
+                'plan': None,
+                'error': None
+            }
+            self._jobs[job_id] = job
+            self._active_by_user[user_key] = self._active_by_user.get(user_key, 0) + 1
+            self.submitted += 1
+            snapshot = self._snapshot_locked(job)
+
+        self._executor.submit(self._run, job_id, payload)
+        print(f"[OK] 计划生成任务已提交: {job_id}（排队第 {snapshot['position']} 位）")
+        return snapshot
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return self._snapshot_locked(job) if job else None
+
+    def _run(self, job_id: str, payload: Dict[str, Any]):
+        with self._lock:
+            job = self._jobs[job_id]
+            job['status'] = RUNNING
+            job['started_at'] = time.time()
+            snapshot = self._snapshot_locked(job)
+        self.wait_seconds.observe(job['started_at'] - job['created_at'])
+        self._notify(snapshot)
+
+        plan, error = None, None
+        try:
+            plan = self.runner(payload)
+        except Exception as e:
+            error = str(e)
+            print(f"[X] 计划生成任务失败 {job_id}: {error}")
+            traceback.print_exc()
+
+        with self._lock:
+            job['finished_at'] = time.time()
+            job['status'] = FAILED if error is not None else SUCCEEDED
+            job['plan'] = plan
+            job['error'] = error
+            remaining = self._active_by_user.get(job['user_key'], 1) - 1
+            if remaining > 0:
+                self._active_by_user[job['user_key']] = remaining
+            else:
+                self._active_by_user.pop(job['user_key'], None)
+            if error is None:
+                self.succeeded += 1
+            else:
+                self.failed += 1
+            snapshot = self._snapshot_locked(job)
+        self.run_seconds.observe(job['finished_at'] - job['started_at'])
+        self._notify(snapshot)
+
+    def _notify(self, snapshot: Dict[str, Any]):
+        if not self.on_update:
+            return
+        try:
+            self.on_update(snapshot)
+        except Exception as e:
+            print(f"[WARN] 推送计划任务状态失败: {e}")
+
+    def _snapshot_locked(self, job: Dict[str, Any]) -> Dict[str, Any]:
+        """对外的任务视图（不含用户标识）；排队中的任务附带排队位置"""
+        snapshot = {
+            'id': job['id'],
+            'status': job['status'],
+            'created_at': job['created_at'],
+            'started_at': job['started_at'],
+            'finished_at': job['finished_at']
+        }
+        if job['status'] == QUEUED:
+            snapshot['position'] = 1 + sum(
+                1 for other in self._jobs.values()
+                if other['status'] == QUEUED and other['created_at'] < job['created_at']
+            )
+        elif job['status'] == SUCCEEDED:
+            snapshot['plan'] = job['plan']
+        elif job['status'] == FAILED:
+            snapshot['error'] = job['error']
+        return snapshot
+
+    def _expire_locked(self):
+        now = time.time()
+        expired = [job_id for job_id, job in self._jobs.items()
+                   if job['finished_at'] is not None and now - job['finished_at'] > self.result_ttl]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            queued = sum(1 for job in self._jobs.values() if job['status'] == QUEUED)
+            running = sum(1 for job in self._jobs.values() if job['status'] == RUNNING)
+            counters = {
+                'queued': queued,
+                'running': running,
+                'max_workers': self.max_workers,
+                'max_queue': self.max_queue,
+                'max_per_user': self.max_per_user,
+                'users_active': len(self._active_by_user),
+                'jobs_retained': len(self._jobs),
+                'submitted': self.submitted,
+                'succeeded': self.succeeded,
+                'failed': self.failed,
+                'rejected_queue_full': self.rejected_queue_full,
+                'rejected_user_limit': self.rejected_user_limit
+            }
+        return {
+            **counters,
+            'wait_seconds': self.wait_seconds.snapshot(),
+            'run_seconds': self.run_seconds.snapshot()
+        }
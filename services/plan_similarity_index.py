@@ -0,0 +1,348 @@
+"""
+旅行需求近似匹配索引
+精确缓存键只能命中字面相同的需求；这里抽取需求的目的地、天数、其他数字（预算、人数、日期）和内容用字
+（去掉句式、语气用字后的字符集合），对内容用字做 MinHash + LSH 分桶；目的地、天数和数字必须一致，
+内容用字的 Jaccard 相似度达到阈值即视为同一需求（同一行程换一种说法），
+找到足够相似的已生成计划时直接复用，不再调用模型。天数必须相同：住宿晚数、预算、返程等都按整段行程生成，
+截取更长计划的前几天得到的计划并不成立
+"""
+import re
+import threading
+import zlib
+from collections import OrderedDict
+from typing import Optional, Dict, Any, List
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from services.plan_cache import normalize_plan_input
+
+
+_CN_DIGITS = {'零': 0, '〇': 0, '一': 1, '二': 2, '两': 2, '三': 3, '四': 4,
+              '五': 5, '六': 6, '七': 7, '八': 8, '九': 9}
+_CN_UNITS = {'十': 10, '百': 100, '千': 1000, '万': 10000}
+_CN_NUM = '[零〇一二两三四五六七八九十百千万]+'
+
+# app.py 追加到需求末尾的出行天数 / 出发日期行
+_META_DAYS_RE = re.compile(r'预计出行天数\s*[:：]\s*(\d+)')
+_DAYS_RE = re.compile(rf'(?<![月\d零〇一二两三四五六七八九十百千万])(\d+|{_CN_NUM})\s*个?\s*(天|日|晚|夜|周|星期)')
+_ARABIC_RE = re.compile(r'(\d+(?:\.\d+)?)\s*([千万kKwW]?)')
+# 中文数字只在后接量词时才算数字（避免 "三亚"、"一起" 之类被误读）
+_CN_NUMBER_RE = re.compile(rf'({_CN_NUM})(?=[人位个元块岁月号])')
+
+_DEST_STOP = r'(?=玩|旅|游|看|吃|逛|度假|自驾|出差|过|的|，|,|。|\s|\d|[一二两三四五六七八九十]+[天日晚夜周]|$)'
+_DEST_PATTERNS = (
+    re.compile(r'(?:去|到|在|前往|飞|游览|游玩|玩转)([\u4e00-\u9fff]{2,6}?)' + _DEST_STOP),
+    re.compile(r'^([\u4e00-\u9fff]{2,6}?)(?=\d|[一二两三四五六七八九十]+[天日晚夜周]|之旅|旅游|旅行|自由行|游|玩|看|吃|逛|度假|自驾)'),
+)
+_DEST_PREFIX = ('我想', '想要', '我要', '计划', '打算', '准备', '我们', '想')
+_DEST_PREFIX_RE = re.compile('^(?:' + '|'.join(_DEST_PREFIX) + ')+')
+
+# 句式、语气和时长量词用字：不计入内容用字
+# （调换顺序、换说法的需求内容用字基本相同，"美食" 换成 "古镇" 这类内容替换则相差很大）
+_FILLER_CHARS = frozenset('我们想要去到在玩游旅行程之计划打算准备的了和与及跟还也很都个请帮给做安排一下吧呢啊呀吗'
+                          '次趟时间里天日晚夜周星期元块预算人均喜欢偏好主要是希望看比较特别最0')
+
+
+def _cn_to_number(text: str) -> Optional[int]:
+    """中文数字转整数（"五" -> 5，"十二" -> 12，"五千" -> 5000，"一万五千" -> 15000）"""
+    total, section, digit = 0, 0, None
+    for ch in text:
+        if ch in _CN_DIGITS:
+            digit = _CN_DIGITS[ch]
+        elif ch == '万':
+            total = (total + section + (digit or 0)) * 10000
+            section, digit = 0, None
+        elif ch in _CN_UNITS:
+            section += (1 if digit is None else digit) * _CN_UNITS[ch]
+            digit = None
+        else:
+            return None
+    return total + section + (digit or 0)
+
+
+def _parse_number(token: str) -> Optional[float]:
+    try:
+        return float(token)
+    except ValueError:
+        value = _cn_to_number(token)
+        return float(value) if value is not None else None
+
+
+def _normalize_destination(name: str) -> str:
+    for prefix in _DEST_PREFIX:
+        if name.startswith(prefix) and len(name) - len(prefix) >= 2:
+            name = name[len(prefix):]
+            break
+    return name[:-1] if len(name) > 2 and name[-1] in '市省县' else name
+
+
+def extract_trip_facts(text: str) -> Dict[str, Any]:
+    """从需求文本抽取目的地、天数和其余数字
+
+    Returns:
+        {'destination': '成都' 或 None, 'days': 5 或 None, 'numbers': (5000.0, ...)}
+    """
+    text = text or ''
+    days = None
+    spans = []
+    meta = _META_DAYS_RE.search(text)
+    if meta:
+        days = int(meta.group(1))
+        spans.append(meta.span())
+    for match in _DAYS_RE.finditer(text):
+        spans.append(match.span())
+        if days is None:
+            value = _parse_number(match.group(1))
+            if value is None:
+                continue
+            unit = match.group(2)
+            if unit in ('周', '星期'):
+                value *= 7
+            elif unit in ('晚', '夜'):
+                value += 1
+            days = int(value)
+
+    # 去掉天数片段后收集其余数字（预算、人数、出发日期等）
+    rest = text
+    for start, end in sorted(spans, reverse=True):
+        rest = rest[:start] + ' ' + rest[end:]
+    numbers = []
+    for match in _ARABIC_RE.finditer(rest):
+        value = float(match.group(1))
+        scale = match.group(2).lower()
+        if scale in ('千', 'k'):
+            value *= 1000
+        elif scale in ('万', 'w'):
+            value *= 10000
+        numbers.append(value)
+    for match in _CN_NUMBER_RE.finditer(rest):
+        value = _parse_number(match.group(1))
+        if value is not None:
+            numbers.append(value)
+
+    destination = None
+    first_line = _DEST_PREFIX_RE.sub('', text.strip().split('\n', 1)[0])
+    for pattern in _DEST_PATTERNS:
+        match = pattern.search(first_line)
+        if match:
+            destination = _normalize_destination(match.group(1))
+            break
+
+    return {'destination': destination, 'days': days, 'numbers': tuple(sorted(numbers))}
+
+
+def _shingle_text(text: str) -> str:
+    """用于抽取内容用字的文本：去掉 app.py 追加的出发日期 / 天数行，数字统一替换为 0
+
+    数字（天数、预算、人数）已由 extract_trip_facts 精确比较，这里不让 "5天" / "五天" 的写法差异影响内容用字
+    """
+    text = '\n'.join(line for line in (text or '').split('\n')
+                     if not line.startswith(('出发日期', '预计出行天数')))
+    text = _DAYS_RE.sub(r'0\2', text)
+    text = _ARABIC_RE.sub('0', text)
+    text = _CN_NUMBER_RE.sub('0', text)
+    return normalize_plan_input(text)
+
+
+class PlanSimilarityIndex:
+    """MinHash/LSH 近似需求索引（仅保存在内存中，按插入顺序淘汰最旧条目）
+
+    每条记录保存：计划缓存键、作用域（模型 + 偏好的哈希，只在同一作用域内匹配）、
+    内容用字的 MinHash 签名与抽取出的事实；作用域、目的地、天数和数字计入分桶键，不兼容的记录不会进入候选集。签名存放在一个连续的 numpy 矩阵中，
+    LSH 分桶只保存槽位号，十几万条记录下单次查询仍是毫秒级。
+    """
+
+    def __init__(self, threshold: float = 0.65, max_entries: int = 100000, num_perm: int = 64,
+                 bands: int = 12, rows: int = 2, max_candidates: int = 256, seed: int = 20240501):
+        """
+        Args:
+            threshold: 内容用字的相似度（Jaccard，替换的字额外计入分母）达到该值才视为同一需求
+            max_entries: 最多索引的需求数
+            num_perm: MinHash 签名长度
+            bands / rows: LSH 分桶参数（使用签名的前 bands * rows 位）
+            max_candidates: 单次查询最多校验的候选数
+        """
+        if np is None:
+            raise ImportError("近似需求匹配需要 numpy: pip install numpy")
+        if bands * rows > num_perm:
+            raise ValueError("bands * rows 不能超过 num_perm")
+        self.threshold = threshold
+        self.max_entries = max(1, int(max_entries))
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = rows
+        self.max_candidates = max_candidates
+
+        # 通用哈希族 (a * x + b) mod p，p 为大于 2^32 的素数
+        rng = np.random.RandomState(seed)
+        self._prime = np.uint64(4294967311)
+        self._a = rng.randint(1, 2 ** 32 - 1, size=num_perm, dtype=np.uint64)
+        self._b = rng.randint(0, 2 ** 32 - 1, size=num_perm, dtype=np.uint64)
+
+        self._signatures = np.zeros((min(self.max_entries, 1024), num_perm), dtype=np.uint32)
+        self._slots: List[Optional[tuple]] = []     # 槽位 -> (key, scope, facts)
+        self._free: List[int] = []
+        self._by_key: "OrderedDict[str, int]" = OrderedDict()
+        self._buckets = [dict() for _ in range(bands)]  # 分桶哈希 -> 槽位号或槽位列表
+        self._lock = threading.Lock()
+
+        # 统计
+        self.queries = 0
+        self.matches = 0
+        self.candidates_checked = 0
+
+    def signature(self, text: str) -> "np.ndarray":
+        """计算需求内容用字集合的 MinHash 签名"""
+        return self._fingerprint(text)[0]
+
+    def _minhash(self, content: frozenset) -> "np.ndarray":
+        # 内容用字为空（如 "成都5天"）的需求之间视为相同
+        shingles = content or ('',)
+        hashes = np.fromiter((zlib.crc32(s.encode('utf-8')) for s in shingles),
+                             dtype=np.uint64, count=len(shingles))
+        values = (self._a[:, None] * hashes[None, :] + self._b[:, None]) % self._prime
+        return (values.min(axis=1) & np.uint64(0xFFFFFFFF)).astype(np.uint32)
+
+    def _fingerprint(self, text: str) -> tuple:
+        """返回 (MinHash 签名, 事实)；事实中的 content 为去掉句式用字和目的地后的用字集合"""
+        facts = extract_trip_facts(text)
+        content = set(_shingle_text(text)) - _FILLER_CHARS
+        if facts['destination']:
+            # 目的地已单独精确比较，不让它抬高不同需求之间的相似度
+            content -= set(facts['destination'])
+        facts['content'] = frozenset(content)
+        return self._minhash(facts['content']), facts
+
+    def _band_keys(self, scope: str, facts: Dict[str, Any], signature) -> List[int]:
+        """LSH 分桶键；作用域、目的地、天数和其余数字必须一致才可能复用，一并计入分桶以缩小候选集"""
+        partition = (scope, facts['destination'], facts['days'], facts['numbers'])
+        rows = self.rows
+        return [hash((partition, signature[i * rows:(i + 1) * rows].tobytes())) for i in range(self.bands)]
+
+    def add(self, text: str, key: str, scope: str = ''):
+        """索引一条已生成计划的需求文本（key 为该计划在 PlanCache 中的键）"""
+        signature, facts = self._fingerprint(text)
+        band_keys = self._band_keys(scope, facts, signature)
+        with self._lock:
+            if key in self._by_key:
+                self._remove_slot(self._by_key.pop(key))
+            while len(self._by_key) >= self.max_entries:
+                _, oldest = self._by_key.popitem(last=False)
+                self._remove_slot(oldest)
+
+            slot = self._free.pop() if self._free else len(self._slots)
+            if slot == len(self._slots):
+                self._slots.append(None)
+                if slot >= len(self._signatures):
+                    grown = np.zeros((min(self.max_entries, len(self._signatures) * 2), self.num_perm), dtype=np.uint32)
+                    grown[:len(self._signatures)] = self._signatures
+                    self._signatures = grown
+            self._signatures[slot] = signature
+            self._slots[slot] = (key, scope, facts)
+            self._by_key[key] = slot
+            for buckets, band_key in zip(self._buckets, band_keys):
+                current = buckets.get(band_key)
+                if current is None:
+                    buckets[band_key] = slot
+                elif isinstance(current, list):
+                    current.append(slot)
+                else:
+                    buckets[band_key] = [current, slot]
+
+    def remove(self, key: str):
+        """移除一条记录（例如对应的缓存计划已过期）"""
+        with self._lock:
+            slot = self._by_key.pop(key, None)
+            if slot is not None:
+                self._remove_slot(slot)
+
+    def _remove_slot(self, slot: int):
+        """调用方持有锁"""
+        _, scope, facts = self._slots[slot]
+        for buckets, band_key in zip(self._buckets, self._band_keys(scope, facts, self._signatures[slot])):
+            current = buckets.get(band_key)
+            if isinstance(current, list):
+                current.remove(slot)
+                if len(current) == 1:
+                    buckets[band_key] = current[0]
+            elif current == slot:
+                del buckets[band_key]
+        self._slots[slot] = None
+        self._free.append(slot)
+
+    def query(self, text: str, scope: str = '') -> Optional[Dict[str, Any]]:
+        """查找与需求相似且兼容的已索引需求
+
+        Returns:
+            {'key': 缓存键, 'similarity': 估计相似度} 或 None
+        """
+        signature, facts = self._fingerprint(text)
+        band_keys = self._band_keys(scope, facts, signature)
+        with self._lock:
+            self.queries += 1
+            candidates = []
+            seen = set()
+            for buckets, band_key in zip(self._buckets, band_keys):
+                current = buckets.get(band_key)
+                if current is None:
+                    continue
+                # 桶很大时优先校验最近加入的记录
+                for slot in (reversed(current) if isinstance(current, list) else (current,)):
+                    if slot not in seen:
+                        seen.add(slot)
+                        candidates.append(slot)
+                if len(candidates) >= self.max_candidates:
+                    break
+            if not candidates:
+                return None
+            candidates = candidates[:self.max_candidates]
+            self.candidates_checked += len(candidates)
+
+            # 候选按估计相似度排序，再用内容用字精确计算 Jaccard
+            estimates = (self._signatures[candidates] == signature).mean(axis=1)
+            best = None
+            for index in np.argsort(-estimates, kind='stable'):
+                key, entry_scope, entry_facts = self._slots[candidates[index]]
+                if entry_scope != scope or not self._compatible(facts, entry_facts):
+                    continue
+                similarity = self._content_similarity(facts['content'], entry_facts['content'])
+                if similarity >= self.threshold and (best is None or similarity > best['similarity']):
+                    best = {'key': key, 'similarity': round(similarity, 3)}
+                    if similarity == 1.0:
+                        break
+            if best is not None:
+                self.matches += 1
+                self._by_key.move_to_end(best['key'])
+            return best
+
+    @staticmethod
+    def _compatible(requested: Dict[str, Any], cached: Dict[str, Any]) -> bool:
+        """目的地（含均未识别）、天数（含均未识别）和其余数字一致"""
+        return (requested['destination'] == cached['destination'] and requested['days'] == cached['days']
+                and requested['numbers'] == cached['numbers'])
+
+    @staticmethod
+    def _content_similarity(a: frozenset, b: frozenset) -> float:
+        """内容用字集合的 Jaccard 相似度（均为空时为 1）
+
+        两边各有对方没有的字（"夜景" 换成 "古镇"）比单边多出几个字（多一个 "吃"）更可能是不同需求，
+        替换的字数额外计入分母
+        """
+        union = len(a | b)
+        if not union:
+            return 1.0
+        return len(a & b) / (union + min(len(a - b), len(b - a)))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'entries': len(self._by_key),
+                'max_entries': self.max_entries,
+                'threshold': self.threshold,
+                'queries': self.queries,
+                'matches': self.matches,
+                'candidates_checked': self.candidates_checked
+            }
@@ -0,0 +1,186 @@
+"""
+旅行计划流式 JSON 解析
+挂在 LLM 流式输出上的增量解析器：逐字符扫描，某个值的右括号（或结束引号/分隔符）一到就产出事件，
+不必等整段 JSON 生成完毕
+"""
+import json
+from typing import List, Dict, Any, Optional, Iterable
+
+
+# 按元素逐个产出的顶层数组字段
+DEFAULT_ITEM_KEYS = ('itinerary', 'restaurant_recommendations', 'accommodation_summary')
+
+_WHITESPACE = ' \t\r\n'
+
+
+class PlanStreamParser:
+    """增量解析旅行计划 JSON
+
+    feed() 每次接收一段模型输出，返回本段内完成的事件：
+    - {'type': 'item', 'key': 'itinerary', 'index': 0, 'value': {...}}：item_keys 中数组的一个元素
+    - {'type': 'field', 'key': 'destination', 'value': '成都'}：其他顶层字段（标量、数组或对象）
+
+    第一个 '{' 之前的内容（如 ```json 代码块标记）会被忽略，根对象闭合后停止解析。
+    单个值无法解析（模型输出不合法）时跳过该值，最终仍以 _parse_plan_response 的结果为准。
+    """
+
+    def __init__(self, item_keys: Iterable[str] = DEFAULT_ITEM_KEYS):
+        self.item_keys = frozenset(item_keys)
+        self._buf = ''
+        self._offset = 0        # _buf[0] 在整段输出中的位置
+        self._pos = 0           # 下一个待扫描字符的绝对位置
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self.finished = False
+
+        # 根对象内：'key' 等待键，'colon' 等待冒号，'value' 等待值，'comma' 值已结束
+        self._expect = 'key'
+        self._key_start: Optional[int] = None
+        self._key: Optional[str] = None
+        # 当前顶层字段值
+        self._field_start: Optional[int] = None
+        self._field_literal = False   # 数字 / true / false / null
+        # 当前逐项产出的数组
+        self._array_key: Optional[str] = None
+        self._item_index = 0
+        self._item_start: Optional[int] = None
+        self._item_literal = False
+
+    def feed(self, text: str) -> List[Dict[str, Any]]:
+        """输入一段输出文本，返回新完成的事件"""
+        if self.finished or not text:
+            return []
+        self._buf += text
+        events = []
+        end = self._offset + len(self._buf)
+        while self._pos < end and not self.finished:
+            self._scan(self._buf[self._pos - self._offset], events)
+            self._pos += 1
+        self._compact()
+        return events
+
+    # ------------------------- 扫描 -------------------------
+    def _scan(self, c: str, events: list):
+        i = self._pos
+        depth = self._depth
+
+        if self._in_string:
+            if self._escape:
+                self._escape = False
+            elif c == '\\':
+                self._escape = True
+            elif c == '"':
+                self._in_string = False
+                self._close_string(i, events)
+            return
+
+        if depth == 0:
+            if c == '{':
+                self._depth = 1
+                self._expect = 'key'
+            return
+
+        # 数字 / 字面量在分隔符、空白或括号处结束
+        if c in _WHITESPACE or c in ',}]':
+            self._finish_literal(i, events)
+
+        if c == '"':
+            self._in_string = True
+            if depth == 1 and self._expect == 'key':
+                self._key_start = i
+            else:
+                self._start_value(i, literal=False)
+        elif c in '{[':
+            if depth == 1 and self._expect == 'value' and c == '[' and self._key in self.item_keys:
+                self._array_key = self._key
+                self._item_index = 0
+                self._expect = 'comma'
+            else:
+                self._start_value(i, literal=False)
+            self._depth += 1
+        elif c in '}]':
+            self._depth -= 1
+            if self._depth == 0:
+                self.finished = True
+            elif self._depth == 1:
+                if self._array_key is not None and self._field_start is None:
+                    self._array_key = None
+                else:
+                    self._emit_field(i + 1, events)
+            elif self._depth == 2 and self._array_key is not None:
+                self._emit_item(i + 1, events)
+        elif c == ':':
+            if depth == 1 and self._expect == 'colon':
+                self._expect = 'value'
+        elif c == ',':
+            if depth == 1:
+                self._expect = 'key'
+        elif c not in _WHITESPACE:
+            self._start_value(i, literal=True)
+
+    def _start_value(self, i: int, literal: bool):
+        """在根对象（字段值）或逐项数组（元素）中开始一个新值"""
+        if self._depth == 1 and self._expect == 'value' and self._field_start is None:
+            self._field_start = i
+            self._field_literal = literal
+            self._expect = 'comma'
+        elif self._depth == 2 and self._array_key is not None and self._item_start is None:
+            self._item_start = i
+            self._item_literal = literal
+
+    def _close_string(self, i: int, events: list):
+        depth = self._depth
+        if depth == 1 and self._key_start is not None:
+            self._key = self._decode(self._key_start, i + 1)
+            self._key_start = None
+            self._expect = 'colon'
+        elif depth == 1 and self._field_start is not None and not self._field_literal:
+            self._emit_field(i + 1, events)
+        elif depth == 2 and self._array_key is not None and self._item_start is not None and not self._item_literal:
+            self._emit_item(i + 1, events)
+
+    def _finish_literal(self, i: int, events: list):
+        if self._field_literal and self._field_start is not None and self._depth == 1:
+            self._emit_field(i, events)
+        elif self._item_literal and self._item_start is not None and self._depth == 2:
+            self._emit_item(i, events)
+
+    # ------------------------- 产出 -------------------------
+    def _emit_field(self, end: int, events: list):
+        start, self._field_start = self._field_start, None
+        self._field_literal = False
+        if start is None or self._key is None:
+            return
+        value = self._decode(start, end)
+        if value is not _INVALID:
+            events.append({'type': 'field', 'key': self._key, 'value': value})
+
+    def _emit_item(self, end: int, events: list):
+        start, self._item_start = self._item_start, None
+        self._item_literal = False
+        if start is None:
+            return
+        value = self._decode(start, end)
+        if value is not _INVALID:
+            events.append({'type': 'item', 'key': self._array_key, 'index': self._item_index, 'value': value})
+            self._item_index += 1
+
+    def _decode(self, start: int, end: int):
+        raw = self._buf[start - self._offset:end - self._offset]
+        try:
+            return json.loads(raw)
+        except ValueError:
+            return _INVALID
+
+    def _compact(self):
+        """丢弃已扫描且不再需要的前缀，避免缓冲区随输出增长"""
+        pending = [p for p in (self._key_start, self._field_start, self._item_start) if p is not None]
+        keep_from = min(pending) if pending else self._pos
+        drop = keep_from - self._offset
+        if drop > 4096 or (drop > 0 and drop == len(self._buf)):
+            self._buf = self._buf[drop:]
+            self._offset = keep_from
+
+
+_INVALID = object()
@@ -0,0 +1,126 @@
+"""
+语音识别中间结果节流
+限制中间结果的下发频率、跳过未变化的文本，并只下发相对上次已发送文本的变化后缀；
+被节流跳过的最新中间结果会在间隔结束后补发（或在结束识别时由 flush 取出），不会丢失句尾
+"""
+import threading
+import time
+from typing import Optional, Dict, Any, Callable
+
+
+def common_prefix_length(a: str, b: str) -> int:
+    """两个字符串的公共前缀长度"""
+    limit = min(len(a), len(b))
+    i = 0
+    while i < limit and a[i] == b[i]:
+        i += 1
+    return i
+
+
+class InterimResultThrottle:
+    """单个识别会话的结果下发策略
+
+    - 最终结果总是完整下发：{'text', 'is_final': True}
+    - 中间结果与上次下发的文本相同则跳过；距上次下发不足 min_interval 秒则跳过
+    - delta 模式下中间结果只下发变化部分：{'offset', 'delta', 'is_final': False}，
+      客户端用 已有文本[:offset] + delta 还原完整文本
+    - 因间隔不足被跳过的最新中间结果记为待补发：提供 on_trailing 时在间隔结束后由定时器补发；
+      结束识别时调用 flush() 取出（识别流可能不带 is_final 就结束）
+    """
+
+    def __init__(self, min_interval: float = 0.15, skip_unchanged: bool = True, delta: bool = True,
+                 on_trailing: Optional[Callable[[Dict[str, Any]], None]] = None):
+        self.min_interval = min_interval
+        self.skip_unchanged = skip_unchanged
+        self.delta = delta
+        self.on_trailing = on_trailing
+
+        self._last_text = ''
+        self._last_emit_at = 0.0
+        self._pending: Optional[str] = None
+        self._timer: Optional[threading.Timer] = None
+        # 补发在定时器线程中进行，持锁下发以保证与后续增量消息的先后顺序
+        self._lock = threading.Lock()
+        self.emitted = 0
+        self.suppressed = 0
+        self.trailing = 0
+
+    def process(self, text: str, is_final: bool) -> Optional[Dict[str, Any]]:
+        """返回需要下发的消息，None 表示本次不下发"""
+        with self._lock:
+            if is_final:
+                self._clear_pending_locked()
+                self._last_text = text
+                self._last_emit_at = time.monotonic()
+                self.emitted += 1
+                return {'text': text, 'is_final': True}
+
+            if self.skip_unchanged and text == self._last_text:
+                # 文本回到了已下发的状态，之前待补发的内容已过时
+                self._clear_pending_locked()
+                self.suppressed += 1
+                return None
+
+            now = time.monotonic()
+            wait = self.min_interval - (now - self._last_emit_at)
+            if wait > 0:
+                self._pending = text
+                self.suppressed += 1
+                if self.on_trailing and self._timer is None:
+                    self._timer = threading.Timer(wait, self._fire_trailing)
+                    self._timer.daemon = True
+                    self._timer.start()
+                return None
+
+            self._clear_pending_locked()
+            return self._emit_locked(text, now)
+
+    def flush(self) -> Optional[Dict[str, Any]]:
+        """取出待补发的中间结果（结束识别、下发结束通知之前调用），没有则返回 None"""
+        with self._lock:
+            text = self._pending
+            self._clear_pending_locked()
+            if text is None:
+                return None
+            self.trailing += 1
+            return self._emit_locked(text, time.monotonic())
+
+    def close(self):
+        """丢弃待补发的结果并取消定时器"""
+        with self._lock:
+            self._clear_pending_locked()
+
+    def _fire_trailing(self):
+        with self._lock:
+            if self._timer is not threading.current_thread():
+                # 已被取消（等锁期间有新结果下发）
+                return
+            self._timer = None
+            text = self._pending
+            self._pending = None
+            if text is None:
+                return
+            self.trailing += 1
+            message = self._emit_locked(text, time.monotonic())
+            try:
+                self.on_trailing(message)
+            except Exception as e:
+                print(f"[WARN] 补发中间结果失败: {e}")
+
+    def _clear_pending_locked(self):
+        self._pending = None
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+    def _emit_locked(self, text: str, now: float) -> Dict[str, Any]:
+        if self.delta:
+            offset = common_prefix_length(self._last_text, text)
+            message = {'offset': offset, 'delta': text[offset:], 'is_final': False}
+        else:
+            message = {'text': text, 'is_final': False}
+
+        self._last_text = text
+        self._last_emit_at = now
+        self.emitted += 1
+        return message
@@ -0,0 +1,80 @@
+"""
+进程内请求合并（singleflight）
+同一个键的调用正在进行时，后续相同调用不再重复执行，而是等待并共享这次调用的结果（或异常）。
+调用在第一个调用方（leader）自己的线程中执行，不额外创建线程，并发度仍受调用方所在线程池限制；
+其他等待方可以各自超时放弃，不会中断共享的调用
+"""
+import concurrent.futures
+import threading
+from typing import Callable, Dict, Any, Optional
+
+
+class SingleFlight:
+    """按键合并并发调用"""
+
+    def __init__(self, name: str = 'singleflight'):
+        self.name = name
+        self._calls: Dict[str, concurrent.futures.Future] = {}
+        self._lock = threading.Lock()
+
+        # 统计
+        self.executed = 0   # 实际执行的调用数
+        self.shared = 0     # 加入已有调用的等待数
+        self.timeouts = 0   # 等待超时的次数
+
+    def do(self, key: str, fn: Callable[[], Any], timeout: Optional[float] = None) -> Any:
+        """执行 fn 或加入同键的进行中调用，返回其结果
+
+        Args:
+            key: 合并键
+            fn: 无参可调用对象
+            timeout: 加入进行中调用时等待的最长时间（秒），None 表示一直等待；
+                超时抛出 TimeoutError，共享的调用继续执行，结果仍会交给其他等待方。
+                发起调用的一方直接执行 fn，不受此限制
+        """
+        with self._lock:
+            future = self._calls.get(key)
+            if future is None:
+                future = concurrent.futures.Future()
+                self._calls[key] = future
+                self.executed += 1
+                start = True
+            else:
+                self.shared += 1
+                start = False
+
+        if start:
+            self._run(key, fn, future)
+        else:
+            print(f"[OK] 相同请求正在处理，等待共享结果: {key[:12]}")
+
+        try:
+            return future.result(timeout=timeout)
+        except concurrent.futures.TimeoutError:
+            with self._lock:
+                self.timeouts += 1
+            raise TimeoutError(f"等待结果超时（{timeout:g}秒）")
+
+    def _run(self, key: str, fn: Callable[[], Any], future: concurrent.futures.Future):
+        try:
+            result = fn()
+        except BaseException as e:
+            self._finish(key)
+            future.set_exception(e)
+        else:
+            self._finish(key)
+            future.set_result(result)
+
+    def _finish(self, key: str):
+        # 先移除再交付结果：之后到达的相同请求会发起新调用（通常已能命中缓存）
+        with self._lock:
+            self._calls.pop(key, None)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'in_flight': len(self._calls),
+                'executed': self.executed,
+                'shared': self.shared,
+                'timeouts': self.timeouts
+            }
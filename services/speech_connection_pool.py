@@ -0,0 +1,192 @@
+"""
+语音识别预热连接池
+预先建立并完成初始化握手（full client request）的 ASR WebSocket 会话，
+开始录音时直接租用，后台随即补充新的预热连接；空闲过久的连接会被回收
+"""
+import threading
+import time
+from collections import deque
+from typing import Callable, Optional, Tuple
+
+
+class SpeechConnectionPool:
+    """已完成握手的 SpeechRecognitionService 预热池"""
+
+    def __init__(self, loop_host, factory: Callable, size: int = 2, idle_ttl: float = 20.0,
+                 retry_delay: float = 5.0):
+        """
+        Args:
+            loop_host: SpeechLoopHost，预热连接运行在其事件循环上
+            factory: 无参可调用对象，返回一个未连接的 SpeechRecognitionService
+            size: 保持的空闲预热连接数
+            idle_ttl: 空闲连接最长保留秒数，超时后断开并重新预热
+            retry_delay: 预热失败后的重试间隔（秒）
+        """
+        self.loop_host = loop_host
+        self.factory = factory
+        self.size = max(0, int(size))
+        self.idle_ttl = idle_ttl
+        self.retry_delay = retry_delay
+
+        self._idle = deque()  # (service, worker, ready_at)
+        self._warming = 0
+        self._generation = 0  # clear() 后递增，旧凭据下预热的连接作废
+        self._retry_at = 0.0
+        self._closed = False
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._maintainer: Optional[threading.Thread] = None
+
+        # 统计
+        self.leased = 0
+        self.misses = 0
+        self.expired = 0
+        self.warm_failures = 0
+
+    def start(self):
+        """启动后台维护线程（定期回收过期连接并补足预热连接）"""
+        if self._maintainer or self.size == 0:
+            return
+        self._maintainer = threading.Thread(target=self._maintain, name="speech-pool", daemon=True)
+        self._maintainer.start()
+
+    def _maintain(self):
+        interval = max(1.0, min(self.idle_ttl / 2, 5.0))
+        while not self._closed:
+            try:
+                self._reap()
+                self._fill()
+            except Exception as e:
+                print(f"[X] 预热连接池维护失败: {str(e)}")
+            self._wakeup.wait(interval)
+            self._wakeup.clear()
+
+    def _fill(self):
+        """补足预热连接"""
+        with self._lock:
+            if self._closed or time.monotonic() < self._retry_at:
+                return
+            need = self.size - len(self._idle) - self._warming
+            if need <= 0:
+                return
+            self._warming += need
+        for _ in range(need):
+            self._warm_one()
+
+    def _warm_one(self):
+        generation = self._generation
+        try:
+            worker = self.loop_host.acquire()
+            service = self.factory()
+
+            async def warm():
+                service.use_session(worker.session)
+                await service.connect()
+
+            future = worker.submit(warm())
+        except Exception:
+            with self._lock:
+                self._warming -= 1
+            raise
+        future.add_done_callback(lambda f: self._on_warmed(f, service, worker, generation))
+
+    def _on_warmed(self, future, service, worker, generation):
+        with self._lock:
+            self._warming -= 1
+            failed = future.cancelled() or future.exception() is not None
+            if failed:
+                self.warm_failures += 1
+                self._retry_at = time.monotonic() + self.retry_delay
+            elif not self._closed and generation == self._generation:
+                self._idle.append((service, worker, time.monotonic()))
+                return
+        if not failed:
+            # 连接池已关闭或已清空，直接断开
+            self._discard(service, worker)
+
+    def _usable(self, service, ready_at: float, now: float) -> bool:
+        return (service.is_connected and service.ws is not None and not service.ws.closed
+                and now - ready_at < self.idle_ttl)
+
+    def _reap(self):
+        """回收过期或已断开的空闲连接"""
+        now = time.monotonic()
+        stale = []
+        with self._lock:
+            keep = deque()
+            for entry in self._idle:
+                if self._usable(entry[0], entry[2], now):
+                    keep.append(entry)
+                else:
+                    stale.append(entry)
+            self._idle = keep
+            self.expired += len(stale)
+        for service, worker, _ in stale:
+            self._discard(service, worker)
+
+    def lease(self, worker=None) -> Optional[Tuple[object, object]]:
+        """租用一个预热连接，返回 (service, worker)；池中无可用连接时返回 None
+
+        指定 worker 时只租用运行在该事件循环上的连接（如断线重连时接管）。
+        """
+        now = time.monotonic()
+        leased = None
+        stale = []
+        with self._lock:
+            keep = deque()
+            while self._idle:
+                entry = self._idle.popleft()
+                service, entry_worker, ready_at = entry
+                if not self._usable(service, ready_at, now):
+                    stale.append((service, entry_worker))
+                elif worker is not None and entry_worker is not worker:
+                    keep.append(entry)
+                else:
+                    leased = (service, entry_worker)
+                    break
+            self._idle.extendleft(reversed(keep))
+            self.expired += len(stale)
+            if leased:
+                self.leased += 1
+            else:
+                self.misses += 1
+        for service, worker in stale:
+            self._discard(service, worker)
+        # 唤醒维护线程立即补充
+        self._wakeup.set()
+        return leased
+
+    def _discard(self, service, worker):
+        try:
+            worker.submit(service.disconnect())
+        except Exception:
+            pass
+
+    def clear(self):
+        """断开所有空闲连接（如凭据变更后）"""
+        with self._lock:
+            entries = list(self._idle)
+            self._idle.clear()
+            self._generation += 1
+            self._retry_at = 0.0
+        for service, worker, _ in entries:
+            self._discard(service, worker)
+        self._wakeup.set()
+
+    def close(self):
+        """关闭连接池"""
+        self._closed = True
+        self.clear()
+
+    def stats(self) -> dict:
+        """连接池统计"""
+        with self._lock:
+            return {
+                'size': self.size,
+                'idle': len(self._idle),
+                'warming': self._warming,
+                'leased': self.leased,
+                'misses': self.misses,
+                'expired': self.expired,
+                'warm_failures': self.warm_failures
+            }
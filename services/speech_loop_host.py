@@ -0,0 +1,116 @@
+"""
+语音识别事件循环宿主
+使用少量常驻后台线程承载所有语音识别会话的协程，并共享 aiohttp ClientSession / 连接器
+"""
+import asyncio
+import threading
+import aiohttp
+from concurrent.futures import Future
+from typing import Optional, List
+
+
+class _LoopWorker:
+    """单个常驻事件循环（一个后台线程 + 一个 ClientSession）"""
+
+    def __init__(self, name: str, connector_limit: int = 0):
+        self.name = name
+        self.connector_limit = connector_limit
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.session: Optional[aiohttp.ClientSession] = None
+        self.thread: Optional[threading.Thread] = None
+        self._ready = threading.Event()
+
+    def start(self):
+        """启动后台线程并等待事件循环就绪"""
+        self.thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self.thread.start()
+        self._ready.wait()
+
+    def _run(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        try:
+            self.loop.run_until_complete(self._open_session())
+            self._ready.set()
+            self.loop.run_forever()
+        finally:
+            try:
+                self.loop.run_until_complete(self._close_session())
+            except Exception:
+                pass
+            self.loop.close()
+            self._ready.set()
+
+    async def _open_session(self):
+        # ClientSession 必须在所属事件循环中创建
+        connector = aiohttp.TCPConnector(limit=self.connector_limit, ttl_dns_cache=300)
+        self.session = aiohttp.ClientSession(connector=connector)
+
+    async def _close_session(self):
+        if self.session:
+            await self.session.close()
+            self.session = None
+
+    @property
+    def is_running(self) -> bool:
+        return bool(self.loop and self.loop.is_running())
+
+    def submit(self, coro) -> Future:
+        """线程安全地提交协程，返回 concurrent.futures.Future"""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def stop(self):
+        """停止事件循环"""
+        if self.loop and self.loop.is_running():
+            self.loop.call_soon_threadsafe(self.loop.stop)
+        if self.thread:
+            self.thread.join(timeout=5)
+
+
+class SpeechLoopHost:
+    """语音识别事件循环宿主：固定数量的常驻事件循环，会话按轮询分配"""
+
+    def __init__(self, num_loops: int = 1, connector_limit: int = 0):
+        self.num_loops = max(1, int(num_loops))
+        self.connector_limit = connector_limit
+        self._workers: List[_LoopWorker] = []
+        self._next = 0
+        self._lock = threading.Lock()
+
+    def _ensure_started(self):
+        if self._workers:
+            return
+        for i in range(self.num_loops):
+            worker = _LoopWorker(f"speech-loop-{i}", self.connector_limit)
+            worker.start()
+            self._workers.append(worker)
+        print(f"[OK] 语音识别事件循环已启动 (数量: {self.num_loops})")
+
+    def acquire(self) -> _LoopWorker:
+        """为新会话分配一个事件循环（线程安全）"""
+        with self._lock:
+            self._ensure_started()
+            worker = self._workers[self._next % len(self._workers)]
+            self._next += 1
+            return worker
+
+    def shutdown(self):
+        """关闭所有事件循环及共享的 ClientSession"""
+        with self._lock:
+            workers = self._workers
+            self._workers = []
+        for worker in workers:
+            worker.stop()
+
+
+_default_host: Optional[SpeechLoopHost] = None
+_default_host_lock = threading.Lock()
+
+
+def get_default_loop_host() -> SpeechLoopHost:
+    """获取进程内默认的事件循环宿主（单个事件循环）"""
+    global _default_host
+    with _default_host_lock:
+        if _default_host is None:
+            _default_host = SpeechLoopHost()
+        return _default_host
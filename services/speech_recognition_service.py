@@ -4,16 +4,29 @@
 """
 import asyncio
 import aiohttp
+import concurrent.futures
 import json
+import logging
+import time
 import struct
 import gzip
 import uuid
 import base64
 from typing import Optional, Dict, Any, Callable
 
+from services.audio_framer import AudioRingBuffer, AudioReplayBuffer
+from services.voice_activity import VoiceActivityDetector, SilenceGate
+from services.audio_ingest_queue import AudioIngestQueue, OverflowPolicy
+from services.audio_resampler import AudioResampler, needs_conversion, validate_format
+from services.voice_metrics import SessionTimeline
+
+logger = logging.getLogger(__name__)
+
 
 # ==================== 协议常量 ====================
 
+DEFAULT_ASR_URL = "wss://openspeech.bytedance.com/api/v3/sauc/bigmodel_async"
+
 class ProtocolVersion:
     V1 = 0b0001
 
@@ -38,6 +51,64 @@ class CompressionType:
     GZIP = 0b0001
 
 
+# ==================== 压缩策略 ====================
+
+class AudioCompressionMode:
+    NONE = 'none'          # 不压缩（头部 CompressionType 置为 NO_COMPRESSION）
+    FAST = 'fast'          # gzip 快速档（默认 level 1）
+    GZIP = 'gzip'          # gzip 最高压缩（level 9，旧行为）
+    ADAPTIVE = 'adaptive'  # 按实测压缩率在 fast / none 之间切换
+
+
+class CompressionPolicy:
+    """请求负载压缩策略
+    
+    原始 PCM 几乎不可压缩，默认使用 gzip 快速档；adaptive 模式下，
+    若快速档实测压缩率高于阈值（收益太小），则在接下来的若干帧中不压缩，之后重新探测。
+    """
+    
+    def __init__(self, mode: str = AudioCompressionMode.FAST, fast_level: int = 1,
+                 adaptive_threshold: float = 0.9, probe_interval: int = 50):
+        if mode not in (AudioCompressionMode.NONE, AudioCompressionMode.FAST,
+                        AudioCompressionMode.GZIP, AudioCompressionMode.ADAPTIVE):
+            raise ValueError(f"不支持的压缩模式: {mode}")
+        self.mode = mode
+        self.fast_level = fast_level
+        self.adaptive_threshold = adaptive_threshold
+        self.probe_interval = probe_interval
+        
+        self._skip_frames = 0  # adaptive 模式下剩余的不压缩帧数
+        self.last_ratio = None
+    
+    def compress(self, data) -> tuple:
+        """压缩音频负载，返回 (compression_type, payload)"""
+        if self.mode == AudioCompressionMode.NONE:
+            return CompressionType.NO_COMPRESSION, data
+        if self.mode == AudioCompressionMode.GZIP:
+            return CompressionType.GZIP, gzip.compress(data, compresslevel=9)
+        if self.mode == AudioCompressionMode.FAST:
+            return CompressionType.GZIP, gzip.compress(data, compresslevel=self.fast_level)
+        
+        # adaptive
+        if self._skip_frames > 0:
+            self._skip_frames -= 1
+            return CompressionType.NO_COMPRESSION, data
+        compressed = gzip.compress(data, compresslevel=self.fast_level)
+        size = len(data)
+        self.last_ratio = len(compressed) / size if size else 1.0
+        if self.last_ratio > self.adaptive_threshold:
+            self._skip_frames = self.probe_interval
+            return CompressionType.NO_COMPRESSION, data
+        return CompressionType.GZIP, compressed
+    
+    def compress_json(self, data: bytes) -> tuple:
+        """压缩 JSON 负载（JSON 压缩收益稳定，adaptive 模式直接使用快速档）"""
+        if self.mode == AudioCompressionMode.NONE:
+            return CompressionType.NO_COMPRESSION, data
+        level = 9 if self.mode == AudioCompressionMode.GZIP else self.fast_level
+        return CompressionType.GZIP, gzip.compress(data, compresslevel=level)
+
+
 # ==================== 请求头构建 ====================
 
 class AsrRequestHeader:
@@ -58,6 +129,10 @@ class AsrRequestHeader:
         self.message_type_specific_flags = flags
         return self
     
+    def with_compression_type(self, compression_type: int):
+        self.compression_type = compression_type
+        return self
+    
     def to_bytes(self) -> bytes:
         """转换为字节"""
         header = bytearray()
@@ -85,8 +160,11 @@ class RequestBuilder:
         }
     
     @staticmethod
-    def new_full_client_request(seq: int) -> bytes:
-        """生成完整客户端请求（第一个包）"""
+    def new_full_client_request(seq: int, compression: Optional[CompressionPolicy] = None) -> bytes:
+        """生成完整客户端请求（第一个包）
+        
+        compression 为 None 时沿用默认 gzip 压缩
+        """
         # 第一个包使用 NO_SEQUENCE 标志，让服务器自动分配序列号
         header = AsrRequestHeader() \
             .with_message_type_specific_flags(MessageTypeSpecificFlags.NO_SEQUENCE)
@@ -113,7 +191,11 @@ class RequestBuilder:
         }
         
         payload_bytes = json.dumps(payload).encode('utf-8')
-        compressed_payload = gzip.compress(payload_bytes)
+        if compression is None:
+            compressed_payload = gzip.compress(payload_bytes)
+        else:
+            compression_type, compressed_payload = compression.compress_json(payload_bytes)
+            header.with_compression_type(compression_type)
         payload_size = len(compressed_payload)
         
         request = bytearray()
@@ -125,8 +207,12 @@ class RequestBuilder:
         return bytes(request)
     
     @staticmethod
-    def new_audio_only_request(seq: int, segment: bytes, is_last: bool = False) -> bytes:
-        """生成纯音频请求"""
+    def new_audio_only_request(seq: int, segment: bytes, is_last: bool = False,
+                               compression: Optional[CompressionPolicy] = None) -> bytes:
+        """生成纯音频请求
+        
+        compression 为 None 时沿用默认 gzip 压缩
+        """
         header = AsrRequestHeader()
         
         # 使用 NO_SEQUENCE 标志，让服务器自动管理序列号
@@ -139,11 +225,16 @@ class RequestBuilder:
         
         header.with_message_type(MessageType.CLIENT_AUDIO_ONLY_REQUEST)
         
+        if compression is None:
+            compressed_segment = gzip.compress(segment)
+        else:
+            compression_type, compressed_segment = compression.compress(segment)
+            header.with_compression_type(compression_type)
+        
         request = bytearray()
         request.extend(header.to_bytes())
         # NO_SEQUENCE 模式下不包含序列号字段
         
-        compressed_segment = gzip.compress(segment)
         request.extend(struct.pack('>I', len(compressed_segment)))
         request.extend(compressed_segment)
         
@@ -153,114 +244,117 @@ class RequestBuilder:
 # ==================== 响应解析 ====================
 
 class ResponseParser:
-    """解析服务器响应（完全按照官方示例实现）"""
+    """解析服务器响应（协议与官方示例一致）
+    
+    使用预编译的 struct.Struct + unpack_from 按偏移读取字段，payload 通过 memoryview 切片，
+    不再逐段拷贝消息；调试输出通过 logging 的 DEBUG 级别控制。
+    """
+    
+    _INT32 = struct.Struct('>i')
+    _UINT32 = struct.Struct('>I')
+    _ERROR_PREFIX = struct.Struct('>iI')  # 错误码 + payload_size
     
     @staticmethod
     def parse_response(msg: bytes) -> Dict[str, Any]:
         """解析二进制响应"""
+        debug = logger.isEnabledFor(logging.DEBUG)
         try:
-            if len(msg) < 4:
-                return {"error": f"Response too short: {len(msg)} bytes"}
+            total = len(msg)
+            if total < 4:
+                return {"error": f"Response too short: {total} bytes"}
             
-            # 解析头部（与官方示例完全一致）
+            # 解析头部
             header_size = msg[0] & 0x0f
             message_type = msg[1] >> 4
             message_type_specific_flags = msg[1] & 0x0f
             serialization_method = msg[2] >> 4
             message_compression = msg[2] & 0x0f
             
-            print(f"[调试响应] header_size={header_size}, msg_type={message_type}, flags={message_type_specific_flags:04b}, serialization={serialization_method}, compression={message_compression}")
+            if debug:
+                logger.debug("响应头 header_size=%d, msg_type=%d, flags=%s, serialization=%d, compression=%d",
+                             header_size, message_type, format(message_type_specific_flags, '04b'),
+                             serialization_method, message_compression)
             
-            # 跳过头部，获取payload部分
-            payload = msg[header_size * 4:]
-            
-            if len(payload) == 0:
+            # 跳过头部，offset 指向 payload 部分
+            offset = header_size * 4
+            if offset >= total:
                 return {"error": "Empty payload after header"}
             
             # 解析序列号（根据flags条件解析）
             seq = 0
             if message_type_specific_flags & 0x01:  # 如果有序列号标志
-                if len(payload) < 4:
+                if total - offset < 4:
                     return {"error": "Payload too short for sequence"}
-                seq = struct.unpack('>i', payload[:4])[0]
-                payload = payload[4:]
-                print(f"[调试响应] 解析到序列号: {seq}")
+                seq = ResponseParser._INT32.unpack_from(msg, offset)[0]
+                offset += 4
             
             # 解析is_last标志
-            is_last = False
-            if message_type_specific_flags & 0x02:  # 如果是最后一个包
-                is_last = True
-                print(f"[调试响应] 这是最后一个包")
+            is_last = bool(message_type_specific_flags & 0x02)
             
             # 解析event（如果有）
             event = 0
             if message_type_specific_flags & 0x04:  # 如果有event标志
-                if len(payload) < 4:
+                if total - offset < 4:
                     return {"error": "Payload too short for event"}
-                event = struct.unpack('>i', payload[:4])[0]
-                payload = payload[4:]
-                print(f"[调试响应] 解析到event: {event}")
+                event = ResponseParser._INT32.unpack_from(msg, offset)[0]
+                offset += 4
             
             # 根据message_type解析payload_size
             payload_size = 0
             code = 0
             if message_type == MessageType.SERVER_FULL_RESPONSE:
-                if len(payload) < 4:
+                if total - offset < 4:
                     return {"error": "Payload too short for payload_size"}
-                payload_size = struct.unpack('>I', payload[:4])[0]
-                payload = payload[4:]
-                print(f"[调试响应] SERVER_FULL_RESPONSE, payload_size={payload_size}")
+                payload_size = ResponseParser._UINT32.unpack_from(msg, offset)[0]
+                offset += 4
             elif message_type == MessageType.SERVER_ERROR_RESPONSE:
-                if len(payload) < 8:
+                if total - offset < 8:
                     return {"error": "Payload too short for error code and payload_size"}
-                code = struct.unpack('>i', payload[:4])[0]
-                payload_size = struct.unpack('>I', payload[4:8])[0]
-                payload = payload[8:]
-                print(f"[调试响应] SERVER_ERROR_RESPONSE, code={code}, payload_size={payload_size}")
+                code, payload_size = ResponseParser._ERROR_PREFIX.unpack_from(msg, offset)
+                offset += 8
+            
+            if debug:
+                logger.debug("seq=%d, is_last=%s, event=%d, code=%d, payload_size=%d",
+                             seq, is_last, event, code, payload_size)
             
-            # 提取实际的payload数据
+            # 提取实际的payload数据（memoryview 切片，不拷贝）
+            available = total - offset
             if payload_size > 0:
-                if len(payload) < payload_size:
-                    print(f"[警告] Payload数据不完整: 需要{payload_size}, 实际{len(payload)}")
-                    payload_data = payload
+                if available < payload_size:
+                    logger.warning("Payload数据不完整: 需要%d, 实际%d", payload_size, available)
+                    end = total
                 else:
-                    payload_data = payload[:payload_size]
+                    end = offset + payload_size
             else:
-                payload_data = payload
-            
-            print(f"[调试响应] payload_data长度: {len(payload_data)}")
+                end = total
+            payload_data = memoryview(msg)[offset:end]
             
             # 解压缩
             if message_compression == CompressionType.GZIP:
                 try:
                     payload_data = gzip.decompress(payload_data)
-                    print(f"[调试响应] 解压后长度: {len(payload_data)}")
                 except Exception as e:
-                    print(f"[调试响应] 解压失败: {e}")
+                    logger.debug("解压失败: %s", e)
                     return {"error": f"Decompression failed: {str(e)}"}
             
             # 反序列化
             payload_msg = None
             if serialization_method == SerializationType.JSON:
                 if len(payload_data) == 0:
-                    print("[调试响应] Payload为空")
                     payload_msg = {}
                 else:
+                    payload_str = None
                     try:
-                        payload_str = payload_data.decode('utf-8')
-                        print(f"[调试响应] 数据内容 (前200字符): {payload_str[:200]}")
-                        
-                        # 尝试解析为 JSON
+                        payload_str = str(payload_data, 'utf-8')
+                        if debug:
+                            logger.debug("数据内容 (前200字符): %s", payload_str[:200])
                         payload_msg = json.loads(payload_str)
-                        print(f"[调试响应] JSON解析成功")
-                    except json.JSONDecodeError as e:
+                    except json.JSONDecodeError:
                         # 如果不是有效的 JSON，可能是纯文本（如 UUID）
-                        print(f"[调试响应] 非JSON格式，作为纯文本处理: {e}")
-                        # 将纯文本包装成字典
                         payload_msg = {"text": payload_str}
                     except Exception as e:
-                        print(f"[调试响应] 解析失败: {e}")
-                        print(f"[调试响应] 原始数据 (hex): {payload_data[:100].hex()}")
+                        if debug:
+                            logger.debug("解析失败: %s, 原始数据 (hex): %s", e, bytes(payload_data[:100]).hex())
                         # 不返回错误，而是将原始数据作为文本
                         payload_msg = {"raw": payload_str}
             
@@ -274,9 +368,7 @@ class ResponseParser:
                 "payload_size": payload_size
             }
         except Exception as e:
-            print(f"[调试响应] 解析异常: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("解析响应异常: %s", e)
             return {"error": f"Failed to parse response: {str(e)}"}
 
 
@@ -285,27 +377,75 @@ class ResponseParser:
 class SpeechRecognitionService:
     """火山方舟流式语音识别客户端"""
     
-    def __init__(self, app_id: str, access_key: str, secret_key: str, model_id: str):
+    def __init__(self, app_id: str, access_key: str, secret_key: str, model_id: str,
+                 compression: str = AudioCompressionMode.FAST,
+                 vad_enabled: bool = False, vad_end_silence_ms: int = 0, url: Optional[str] = None,
+                 reconnect_attempts: int = 2, replay_seconds: float = 20.0):
         self.app_key = str(app_id)  # app_key 就是 app_id
         self.access_key = access_key
         self.secret_key = secret_key
         self.model_id = model_id
         
         # 使用双向流式模式（优化版本）
-        self.url = "wss://openspeech.bytedance.com/api/v3/sauc/bigmodel_async"
+        self.url = url or DEFAULT_ASR_URL
         
         self.session = None
+        self._owns_session = False  # 由外部（事件循环宿主）提供的共享 session 不在此关闭
         self.ws = None
         self.is_connected = False
         self.seq = 1  # 序列号从1开始，不是0
         
+        # 负载压缩策略
+        self.compression = CompressionPolicy(compression)
+        
         # 回调函数
         self.on_result_callback = None
         self.on_error_callback = None
+        self.on_auto_end_callback = None
         
-        # 音频缓冲
-        self.audio_buffer = bytearray()
+        # 音频缓冲（环形缓冲区，按帧输出 memoryview）
         self.chunk_size = 6400  # 200ms @ 16kHz, 16bit, mono = 16000 * 0.2 * 2 = 6400 bytes
+        self.audio_buffer = AudioRingBuffer(self.chunk_size)
+        self._end_sent = False
+        
+        # 可选的语音活动检测：长静音只发送短保活包，尾部静音足够长时自动发送结束信号
+        self.silence_gate = None
+        if vad_enabled:
+            frame_ms = self.chunk_size * 1000 // (16000 * 2)
+            end_frames = -(-vad_end_silence_ms // frame_ms) if vad_end_silence_ms > 0 else 0
+            self.silence_gate = SilenceGate(VoiceActivityDetector(), end_silence_frames=end_frames)
+        self._keepalive_frame = bytes(320)  # 10ms 静音
+        
+        # 客户端音频格式不是 16kHz 单声道时，在分帧前重采样 / 混音
+        self.resampler: Optional[AudioResampler] = None
+        
+        # 断线重连：保留最近已发送的 PCM，连接意外断开后重新握手并回放（reconnect_attempts=0 关闭）
+        self.reconnect_attempts = max(0, int(reconnect_attempts))
+        self.replay_buffer = None
+        if self.reconnect_attempts:
+            self.replay_buffer = AudioReplayBuffer(int(replay_seconds * 16000 * 2))
+        # 可选：无参可调用对象，返回同一事件循环上已完成握手的 SpeechRecognitionService（如预热连接），供重连时接管
+        self.reconnect_source: Optional[Callable] = None
+        self.reconnecting = False
+        self.reconnects = 0
+        self._send_lock: Optional[asyncio.Lock] = None
+        self._server_error = False
+        # 重连后结果文本 = 未回放部分的已识别文本（前缀）+ 当前识别会话返回的文本
+        self._text_prefix = ''
+        self._session_text = ''
+        self._session_start = 0   # 当前识别会话第一字节音频在回放缓冲区中的偏移
+        self._acked_offset = 0    # 收到最近一条结果时已发送的字节偏移
+        
+        # 可选的延迟指标记录（发往 ASR 的帧、结束信号、首个中间结果 / 最终结果）
+        self.timeline: Optional[SessionTimeline] = None
+    
+    def set_input_format(self, sample_rate: int = 16000, channels: int = 1):
+        """声明客户端实际送来的 16bit PCM 格式（采样率 / 声道数），不合法时抛出 ValueError"""
+        sample_rate, channels = validate_format(sample_rate, channels)
+        if needs_conversion(sample_rate, channels):
+            self.resampler = AudioResampler(sample_rate, channels)
+        else:
+            self.resampler = None
     
     async def connect(self):
         """建立 WebSocket 连接"""
@@ -313,19 +453,12 @@ class SpeechRecognitionService:
             # 重置序列号和缓冲区
             self.seq = 1
             self.audio_buffer.clear()
+            self._end_sent = False
+            if self.silence_gate:
+                self.silence_gate.reset()
+            self._reset_replay_state()
             
-            headers = RequestBuilder.new_auth_headers(self.app_key, self.access_key)
-            print(f"[调试] 准备连接: {self.url}")
-            print(f"[调试] 请求头: {list(headers.keys())}")
-            
-            self.session = aiohttp.ClientSession()
-            self.ws = await self.session.ws_connect(self.url, headers=headers)
-            
-            self.is_connected = True
-            print(f"[OK] 语音识别服务已连接: {self.url}")
-            
-            # 发送初始化请求
-            await self._send_full_request()
+            await self._open_connection()
             
             # 启动接收任务并保存引用，便于后续取消和等待
             self._receive_task = asyncio.create_task(self._receive_messages())
@@ -348,11 +481,50 @@ class SpeechRecognitionService:
                 self.on_error_callback(error_msg)
             raise
     
+    async def _open_connection(self, allow_adopt: bool = False):
+        """建立 WebSocket 并完成初始化握手；allow_adopt 时优先接管 reconnect_source 提供的预热连接"""
+        if allow_adopt and self.reconnect_source:
+            donor = self.reconnect_source()
+            if donor is not None and await self._adopt_connection(donor):
+                print("[OK] 已接管预热的语音识别连接")
+                return
+        
+        headers = RequestBuilder.new_auth_headers(self.app_key, self.access_key)
+        logger.debug("准备连接: %s, 请求头: %s", self.url, list(headers.keys()))
+        
+        if self.session is None or self.session.closed:
+            self.session = aiohttp.ClientSession()
+            self._owns_session = True
+        self.ws = await self.session.ws_connect(self.url, headers=headers)
+        
+        self.is_connected = True
+        print(f"[OK] 语音识别服务已连接: {self.url}")
+        
+        # 发送初始化请求
+        await self._send_full_request()
+    
+    async def _adopt_connection(self, donor: 'SpeechRecognitionService') -> bool:
+        """接管另一个服务实例已完成握手的连接（两者须运行在同一事件循环）"""
+        task = getattr(donor, '_receive_task', None)
+        if task:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        if donor.ws is None or donor.ws.closed:
+            return False
+        self.ws, donor.ws = donor.ws, None
+        self.seq = donor.seq
+        donor.is_connected = False
+        self.is_connected = True
+        return True
+    
     async def _send_full_request(self):
         """发送初始化请求"""
         try:
-            request = RequestBuilder.new_full_client_request(self.seq)
-            print(f"[调试] 发送初始化请求 (NO_SEQUENCE), request_size={len(request)}")
+            request = RequestBuilder.new_full_client_request(self.seq, compression=self.compression)
+            logger.debug("发送初始化请求 (NO_SEQUENCE), request_size=%d", len(request))
             
             await self.ws.send_bytes(request)
             print("[OK] 已发送初始化请求")
@@ -366,12 +538,12 @@ class SpeechRecognitionService:
                 self.is_connected = False
                 raise Exception(error_msg)
             
-            print(f"[调试] 收到响应类型: {msg.type}")
+            logger.debug("收到响应类型: %s", msg.type)
             
             if msg.type == aiohttp.WSMsgType.BINARY:
-                print(f"[调试] 响应数据长度: {len(msg.data)}")
+                logger.debug("响应数据长度: %d", len(msg.data))
                 response = ResponseParser.parse_response(msg.data)
-                print(f"[调试] 解析后的响应: {response}")
+                logger.debug("解析后的响应: %s", response)
                 
                 # 检查是否有解析错误
                 if 'error' in response:
@@ -432,7 +604,32 @@ class SpeechRecognitionService:
             raise
     
     async def _receive_messages(self):
-        """接收 WebSocket 消息"""
+        """接收 WebSocket 消息；连接意外断开时按配置重连并回放已发送的音频"""
+        try:
+            while True:
+                reason = await self._receive_until_closed()
+                if reason is None:
+                    return
+                
+                if not self._can_reconnect():
+                    self.is_connected = False
+                    if reason and self.on_error_callback:
+                        self.on_error_callback(reason)
+                    return
+                
+                if not await self._reconnect(reason):
+                    self.is_connected = False
+                    if self.on_error_callback:
+                        self.on_error_callback("语音识别连接中断，重连失败")
+                    return
+                
+        except (asyncio.CancelledError, GeneratorExit):
+            # 任务被取消或生成器退出，静默结束
+            print("[INFO] 接收任务已取消或生成器退出，退出接收循环")
+            return
+    
+    async def _receive_until_closed(self) -> Optional[str]:
+        """读取当前连接直到结束：收到最后一包返回 None，否则返回断开原因（正常关闭为空字符串）"""
         try:
             async for msg in self.ws:
                 if msg.type == aiohttp.WSMsgType.BINARY:
@@ -441,28 +638,107 @@ class SpeechRecognitionService:
                     
                     if response.get('is_last'):
                         print("[OK] 收到最后一个响应")
-                        break
+                        return None
                         
                 elif msg.type == aiohttp.WSMsgType.ERROR:
                     print(f"[X] WebSocket错误: {msg.data}")
-                    if self.on_error_callback:
-                        self.on_error_callback(f"WebSocket错误: {msg.data}")
-                    break
+                    return f"WebSocket错误: {msg.data}"
                     
                 elif msg.type == aiohttp.WSMsgType.CLOSED:
-                    print("[OK] WebSocket连接已关闭")
-                    self.is_connected = False
                     break
+            
+            print("[OK] WebSocket连接已关闭")
+            return ''
                     
         except (asyncio.CancelledError, GeneratorExit):
-            # 任务被取消或生成器退出，静默结束
-            print("[INFO] 接收任务已取消或生成器退出，退出接收循环")
-            return
+            raise
         except Exception as e:
             print(f"[X] 接收消息错误: {str(e)}")
-            self.is_connected = False
-            if self.on_error_callback:
-                self.on_error_callback(f"接收消息错误: {str(e)}")
+            return f"接收消息错误: {str(e)}"
+    
+    def _can_reconnect(self) -> bool:
+        """是否允许重连（已启用回放缓冲区、已发送过音频，且不是服务端返回错误后关闭的连接）
+
+        预热池中未被租用的连接没有发送过音频，空闲时被服务端关闭直接结束，由连接池丢弃后重新预热
+        """
+        return (self.replay_buffer is not None and self.replay_buffer.total > 0
+                and not self._server_error)
+    
+    def _get_send_lock(self) -> asyncio.Lock:
+        """发送锁：保证实时音频与重连回放按顺序写入连接"""
+        if self._send_lock is None:
+            self._send_lock = asyncio.Lock()
+        return self._send_lock
+    
+    def _reset_replay_state(self):
+        if self.replay_buffer is not None:
+            self.replay_buffer.clear()
+        self._server_error = False
+        self._text_prefix = ''
+        self._session_text = ''
+        self._session_start = 0
+        self._acked_offset = 0
+    
+    async def _reconnect(self, reason: str) -> bool:
+        """重新建立连接并回放当前识别会话的音频，成功返回 True"""
+        print(f"[WARN] 语音识别连接意外断开{f'（{reason}）' if reason else ''}，尝试重连")
+        self.reconnecting = True
+        try:
+            async with self._get_send_lock():
+                for attempt in range(1, self.reconnect_attempts + 1):
+                    try:
+                        await self._close_ws()
+                        await self._open_connection(allow_adopt=True)
+                        replayed = await self._replay()
+                        self.reconnects += 1
+                        self.is_connected = True
+                        print(f"[OK] 语音识别已重连（第 {attempt} 次尝试），回放音频 {replayed / 32000:.1f}秒")
+                        return True
+                    except Exception as e:
+                        print(f"[X] 重连失败（第 {attempt} 次）: {type(e).__name__}: {str(e)}")
+                        if attempt < self.reconnect_attempts:
+                            await asyncio.sleep(min(0.2 * 2 ** (attempt - 1), 2.0))
+                return False
+        finally:
+            self.reconnecting = False
+    
+    async def _close_ws(self):
+        if self.ws:
+            try:
+                await self.ws.close()
+            except Exception:
+                pass
+            self.ws = None
+    
+    async def _replay(self) -> int:
+        """把当前识别会话的音频重新发送到新连接（不做实时节拍），返回回放字节数"""
+        buffer = self.replay_buffer
+        if buffer.base > self._session_start:
+            # 缓冲区已不含本次识别会话的开头：已识别出的文本固定为前缀，只回放最近一条结果之后的音频
+            self._text_prefix += self._session_text
+            self._session_start = max(self._acked_offset, buffer.base)
+        self._session_text = ''
+        self._acked_offset = self._session_start
+        
+        replayed = 0
+        for frame in buffer.frames_from(self._session_start):
+            request = RequestBuilder.new_audio_only_request(self.seq, frame, compression=self.compression)
+            self.seq += 1
+            await self.ws.send_bytes(request)
+            replayed += len(frame)
+        if self._end_sent:
+            request = RequestBuilder.new_audio_only_request(self.seq, b'', is_last=True, compression=self.compression)
+            await self.ws.send_bytes(request)
+        return replayed
+    
+    def _track_result(self, text: str, is_final: bool) -> str:
+        """记录当前识别会话的最新文本，返回拼接重连前缀后的完整文本"""
+        if self.timeline:
+            self.timeline.result(is_final)
+        self._session_text = text
+        if self.replay_buffer is not None:
+            self._acked_offset = self.replay_buffer.total
+        return self._text_prefix + text
     
     def _handle_response(self, response: Dict[str, Any]):
         """处理识别结果"""
@@ -479,6 +755,7 @@ class SpeechRecognitionService:
             
             # 检查错误响应类型
             if message_type == MessageType.SERVER_ERROR_RESPONSE:
+                self._server_error = True
                 code = response.get('code', 0)
                 error_msg = payload.get('error', payload.get('message', f'错误码: {code}'))
                 print(f"[X] 识别错误 (code={code}): {error_msg}")
@@ -502,6 +779,7 @@ class SpeechRecognitionService:
                 is_final = result.get('is_final', False)
                 
                 if text:
+                    text = self._track_result(text, is_final)
                     print(f"[语音识别] {'最终' if is_final else '临时'}结果: {text}")
                     
                     if self.on_result_callback:
@@ -516,6 +794,7 @@ class SpeechRecognitionService:
                 is_final = result.get('is_final', False)
                 
                 if text:
+                    text = self._track_result(text, is_final)
                     print(f"[语音识别] {'最终' if is_final else '临时'}结果: {text}")
                     
                     if self.on_result_callback:
@@ -584,77 +863,143 @@ class SpeechRecognitionService:
         return bytes(wav)
     
     async def send_audio(self, audio_data: bytes):
-        """发送音频数据"""
+        """发送音频数据（重连回放进行中时等待回放完成）"""
+        async with self._get_send_lock():
+            await self._send_audio(audio_data)
+    
+    async def _send_audio(self, audio_data):
         try:
             if not self.is_connected or not self.ws:
                 print("[WARN] 未连接，跳过音频发送")
                 return
             
-            if self.ws.closed:
+            # 启用重连时连接断开后继续接收音频，记入回放缓冲区，重连后一并发送
+            if self.ws.closed and not self._can_reconnect():
                 print("[WARN] WebSocket已关闭，跳过音频发送")
                 self.is_connected = False
                 return
             
-            # 如果是Base64编码的，先解码
+            # 已发送结束信号（如 VAD 自动结束）后不再接收音频
+            if self._end_sent:
+                return
+            
+            # 二进制附件（bytes/bytearray/memoryview）直接写入缓冲区；字符串按 Base64 兼容模式解码
             if isinstance(audio_data, str):
                 audio_data = base64.b64decode(audio_data)
+            elif not isinstance(audio_data, (bytes, bytearray, memoryview)):
+                print(f"[WARN] 不支持的音频数据类型: {type(audio_data).__name__}，已忽略")
+                return
+            
+            # 按客户端声明的格式转换为 16kHz 单声道
+            if self.resampler:
+                audio_data = self.resampler.process(audio_data)
+                if not audio_data:
+                    return
             
-            # 添加到缓冲区
-            self.audio_buffer.extend(audio_data)
+            # 添加到缓冲区（唯一一次拷贝）
+            self.audio_buffer.write(audio_data)
             
             # 当缓冲区达到chunk_size时，发送一个包
-            while len(self.audio_buffer) >= self.chunk_size:
-                chunk = bytes(self.audio_buffer[:self.chunk_size])
-                self.audio_buffer = self.audio_buffer[self.chunk_size:]
+            while True:
+                # chunk 为环形缓冲区的 memoryview，必须在下一次读写缓冲区前完成打包
+                chunk = self.audio_buffer.read_frame()
+                if chunk is None:
+                    break
+                
+                # 语音活动检测：长静音帧丢弃或替换为短保活包
+                if self.silence_gate:
+                    action = self.silence_gate.process(chunk)
+                    if action == SilenceGate.DROP:
+                        continue
+                    if action == SilenceGate.KEEPALIVE:
+                        chunk = self._keepalive_frame
                 
                 # 根据官方示例，直接发送原始PCM数据（从WAV文件中提取的data部分）
                 # 不包装成任何格式，API会根据初始化请求中的配置来解析
                 
-                # 构建音频请求
-                request = RequestBuilder.new_audio_only_request(
-                    self.seq,
-                    chunk,  # 直接发送原始PCM数据
-                    is_last=False
-                )
-                self.seq += 1
-                
-                await self.ws.send_bytes(request)
+                await self._send_frame(chunk)
                 # print(f"[语音识别] 已发送音频包 seq={self.seq-1}, size={len(chunk)}")
                 
+                # 检测到语音后尾部静音足够长，自动结束本次识别
+                if self.silence_gate and self.silence_gate.should_end:
+                    print(f"[OK] 检测到尾部静音，自动结束识别 (跳过静音帧: {self.silence_gate.frames_skipped})")
+                    await self._send_end_signal()
+                    if self.on_auto_end_callback:
+                        self.on_auto_end_callback()
+                    break
+                
         except Exception as e:
             print(f"[X] 发送音频失败: {str(e)}")
     
+    async def _send_frame(self, chunk, is_last: bool = False):
+        """发送一个音频包；启用重连时先记入回放缓冲区，连接已断开则留待重连后回放"""
+        if self.replay_buffer is not None:
+            self.replay_buffer.append(chunk)
+            if self.ws is None or self.ws.closed:
+                return
+        
+        # 根据官方示例，直接发送原始PCM数据（从WAV文件中提取的data部分）
+        # 不包装成任何格式，API会根据初始化请求中的配置来解析
+        request = RequestBuilder.new_audio_only_request(
+            self.seq,
+            chunk,
+            is_last=is_last,
+            compression=self.compression
+        )
+        if not is_last:
+            self.seq += 1
+        try:
+            await self.ws.send_bytes(request)
+        except (ConnectionError, RuntimeError, aiohttp.ClientError):
+            # 连接正在关闭：已记入回放缓冲区的音频由接收任务重连后回放
+            if self.replay_buffer is None:
+                raise
+            return
+        if self.timeline and len(chunk):
+            self.timeline.frame_sent()
+    
     async def send_end_signal(self):
-        """发送结束信号"""
+        """发送结束信号（每次连接只发送一次）"""
+        async with self._get_send_lock():
+            await self._send_end_signal()
+    
+    async def _send_end_signal(self):
         try:
-            if not self.is_connected or not self.ws:
+            if not self.is_connected or not self.ws or self._end_sent:
                 return
+            self._end_sent = True
+            if self.timeline:
+                self.timeline.end_sent()
+            
+            # 推出重采样滤波器中的剩余样本
+            if self.resampler:
+                self.audio_buffer.write(self.resampler.flush())
             
             # 发送缓冲区剩余数据（如果有）
             if len(self.audio_buffer) > 0:
-                chunk = bytes(self.audio_buffer)
-                # 直接发送原始PCM数据
-                request = RequestBuilder.new_audio_only_request(
-                    self.seq,
-                    chunk,  # 直接发送原始PCM数据
-                    is_last=True
-                )
-                await self.ws.send_bytes(request)
+                chunk = self.audio_buffer.read_all()
+                await self._send_frame(chunk, is_last=True)
                 print(f"[OK] 已发送最后一个音频包 (size={len(chunk)})")
                 self.audio_buffer.clear()
             else:
                 # 发送空的结束包
-                request = RequestBuilder.new_audio_only_request(
-                    self.seq,
-                    b'',
-                    is_last=True
-                )
-                await self.ws.send_bytes(request)
+                await self._send_frame(b'', is_last=True)
                 print("[OK] 已发送结束信号")
                 
         except Exception as e:
             print(f"[X] 发送结束信号失败: {str(e)}")
     
+    async def wait_final(self, timeout: Optional[float] = None) -> bool:
+        """等待接收任务结束（收到最后一包或连接关闭），超时返回 False；timeout 为 None 时一直等待"""
+        task = getattr(self, '_receive_task', None)
+        if task is None or task.done():
+            return True
+        try:
+            await asyncio.wait_for(asyncio.shield(task), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+    
     async def disconnect(self):
         """断开连接"""
         try:
@@ -677,12 +1022,13 @@ class SpeechRecognitionService:
                     pass
                 self.ws = None
 
-            if self.session:
+            if self.session and self._owns_session:
                 try:
                     await self.session.close()
                 except Exception:
                     pass
-                self.session = None
+            self.session = None
+            self._owns_session = False
             
             # 重置序列号和缓冲区
             self.seq = 1
@@ -693,86 +1039,163 @@ class SpeechRecognitionService:
         except Exception as e:
             print(f"[X] 断开连接失败: {str(e)}")
     
-    def set_callbacks(self, on_result: Optional[Callable] = None, on_error: Optional[Callable] = None):
+    def use_session(self, session: aiohttp.ClientSession):
+        """使用外部共享的 ClientSession（需与本服务运行在同一事件循环）"""
+        self.session = session
+        self._owns_session = False
+    
+    def set_callbacks(self, on_result: Optional[Callable] = None, on_error: Optional[Callable] = None,
+                      on_auto_end: Optional[Callable] = None):
         """设置回调函数"""
         if on_result:
             self.on_result_callback = on_result
         if on_error:
             self.on_error_callback = on_error
+        if on_auto_end:
+            self.on_auto_end_callback = on_auto_end
 
 
 # ==================== 同步包装器 ====================
 
 class SpeechRecognitionSyncWrapper:
-    """语音识别服务的同步包装器（用于 Flask-SocketIO）"""
+    """语音识别服务的同步包装器（用于 Flask-SocketIO）
     
-    def __init__(self, app_id: str, access_key: str, secret_key: str, model_id: str):
-        self.service = SpeechRecognitionService(app_id, access_key, secret_key, model_id)
+    协程运行在共享的事件循环宿主上，不再为每次录音创建线程和事件循环。
+    """
+    
+    def __init__(self, app_id: str, access_key: str, secret_key: str, model_id: str, loop_host=None,
+                 connection_pool=None, connect_timeout: float = 12.0,
+                 ingest_max_frames: int = 50, ingest_policy: str = OverflowPolicy.DROP_OLDEST,
+                 timeline: Optional[SessionTimeline] = None, final_timeout: float = 3.0, **service_options):
+        # service_options 透传给 SpeechRecognitionService（如 compression）
+        self.service = SpeechRecognitionService(app_id, access_key, secret_key, model_id, **service_options)
+        if loop_host is None:
+            from services.speech_loop_host import get_default_loop_host
+            loop_host = get_default_loop_host()
+        self.loop_host = loop_host
+        # 可选的预热连接池（SpeechConnectionPool），有可用连接时直接租用
+        self.connection_pool = connection_pool
+        self.connect_timeout = connect_timeout
+        self.startup_seconds = None
+        self.leased_from_pool = False
+        # 有界接收队列：Socket.IO 线程写入，事件循环中的单个发送任务消费
+        self.ingest_max_frames = ingest_max_frames
+        self.ingest_policy = ingest_policy
+        self.ingest_queue: Optional[AudioIngestQueue] = None
+        self._sender_future = None
+        # 延迟指标记录；停止时最多等待 final_timeout 秒的最终结果再断开
+        self.timeline = timeline
+        self.final_timeout = final_timeout
+        self.worker = None
         self.loop = None
-        self.thread = None
-        self.is_running = False
     
-    def start(self, on_result: Optional[Callable] = None, on_error: Optional[Callable] = None):
-        """启动服务"""
-        import threading
-        import time
+    @property
+    def is_running(self):
+        """所属事件循环是否在运行"""
+        return bool(self.worker and self.worker.is_running)
+    
+    def start(self, on_result: Optional[Callable] = None, on_error: Optional[Callable] = None,
+              on_auto_end: Optional[Callable] = None, sample_rate: int = 16000, channels: int = 1):
+        """启动服务
         
-        self.service.set_callbacks(on_result, on_error)
-        self._connection_error = None  # 存储连接错误
+        等待 connect()（含初始化握手）返回的 Future，连接就绪或失败时立即返回，
+        超过 connect_timeout 仍未就绪则取消连接并抛出超时异常。
+        启动耗时记录在 startup_seconds，leased_from_pool 表示是否使用了预热连接。
+        sample_rate / channels 为客户端实际音频格式，非 16kHz 单声道时在服务端重采样。
+        """
+        # 先校验音频格式，避免无效格式占用连接
+        sample_rate, channels = validate_format(sample_rate, channels)
+        started_at = time.monotonic()
+        self.startup_seconds = None
+        self.leased_from_pool = False
         
-        def run_loop():
-            self.loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(self.loop)
-            self.is_running = True
-            
-            try:
-                # 连接服务
-                self.loop.run_until_complete(self.service.connect())
-            except Exception as e:
-                # 捕获连接错误
-                self._connection_error = str(e)
-                print(f"[X] 连接线程中的错误: {e}")
-                import traceback
-                traceback.print_exc()
-                if on_error:
-                    on_error(f"连接失败: {str(e)}")
-                return
-            
-            # 保持循环运行
-            try:
-                self.loop.run_forever()
-            finally:
-                self.loop.close()
-                self.is_running = False
-        
-        self.thread = threading.Thread(target=run_loop, daemon=True)
-        self.thread.start()
-        
-        # 等待连接建立（最多等待3秒）
-        for i in range(30):  # 30 * 0.1 = 3秒
-            time.sleep(0.1)
-            if self._connection_error:
-                raise Exception(self._connection_error)
-            if self.service.is_connected:
+        # 优先租用已完成握手的预热连接
+        if self.connection_pool:
+            leased = self.connection_pool.lease()
+            if leased:
+                self.service, self.worker = leased
+                self.loop = self.worker.loop
+                self.service.set_callbacks(on_result, on_error, on_auto_end)
+                self.service.set_input_format(sample_rate, channels)
+                self.service.reconnect_source = self._lease_replacement
+                self.service.timeline = self.timeline
+                self.leased_from_pool = True
+                self._start_sender()
+                self.startup_seconds = time.monotonic() - started_at
+                print("[OK] 已租用预热的语音识别连接")
                 return
         
-        # 如果3秒后还没连接，检查是否有错误
-        if self._connection_error:
-            raise Exception(self._connection_error)
-        if not self.service.is_connected:
-            raise Exception("连接超时：3秒内未能建立连接")
+        self.service.set_callbacks(on_result, on_error, on_auto_end)
+        self.service.set_input_format(sample_rate, channels)
+        if self.connection_pool:
+            self.service.reconnect_source = self._lease_replacement
+        self.service.timeline = self.timeline
+        
+        self.worker = self.loop_host.acquire()
+        self.loop = self.worker.loop
+        
+        async def connect():
+            # 共享事件循环宿主的 ClientSession 与连接器
+            self.service.use_session(self.worker.session)
+            await self.service.connect()
+        
+        future = self.worker.submit(connect())
+        try:
+            future.result(timeout=self.connect_timeout)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            self.worker.submit(self.service.disconnect())
+            raise Exception(f"连接超时：{self.connect_timeout:g}秒内未能建立连接")
+        except Exception as e:
+            # connect() 内部已通过 on_error 回调通知错误
+            raise Exception(f"连接失败: {str(e)}")
+        
+        self._start_sender()
+        self.startup_seconds = time.monotonic() - started_at
+        print(f"[OK] 语音识别连接就绪，耗时 {self.startup_seconds * 1000:.0f}ms")
     
-    def send_audio(self, audio_data):
-        """发送音频数据（线程安全）"""
-        if self.loop and self.is_running:
-            asyncio.run_coroutine_threadsafe(
-                self.service.send_audio(audio_data),
-                self.loop
-            )
+    def _lease_replacement(self):
+        """断线重连时从预热连接池租用同一事件循环上的连接，没有则返回 None"""
+        leased = self.connection_pool.lease(worker=self.worker) if self.connection_pool else None
+        return leased[0] if leased else None
+    
+    def _start_sender(self):
+        """创建接收队列并在事件循环中启动发送任务"""
+        self.ingest_queue = AudioIngestQueue(self.ingest_max_frames, self.ingest_policy)
+        self._sender_future = self.worker.submit(self._drain_ingest(self.ingest_queue))
+    
+    async def _drain_ingest(self, queue: AudioIngestQueue):
+        """按顺序把队列中的音频交给识别服务，队列关闭且取空后退出"""
+        while True:
+            audio_data = await queue.get()
+            if audio_data is None:
+                return
+            await self.service.send_audio(audio_data)
+    
+    def send_audio(self, audio_data) -> bool:
+        """发送音频数据（线程安全），队列溢出时按策略处理，返回是否被接收"""
+        if self.timeline:
+            self.timeline.frame_received()
+        if self.ingest_queue is not None and self.is_running:
+            return self.ingest_queue.put(audio_data)
+        return False
     
     def stop(self):
-        """停止服务"""
+        """停止服务（只结束本会话，共享事件循环继续运行）
+        
+        发送结束信号后最多等待 final_timeout 秒，让最终结果到达后再断开。
+        """
+        if self.timeline:
+            self.timeline.stop_requested()
         if self.loop and self.is_running:
+            # 先让发送任务取完队列中剩余的音频
+            if self.ingest_queue is not None:
+                self.ingest_queue.close()
+                try:
+                    self._sender_future.result(timeout=5)
+                except Exception:
+                    pass
+            
             # 发送结束信号
             send_fut = asyncio.run_coroutine_threadsafe(self.service.send_end_signal(), self.loop)
             # 等待 send_end_signal 完成（短超时）
@@ -780,21 +1203,27 @@ class SpeechRecognitionSyncWrapper:
                 send_fut.result(timeout=5)
             except Exception:
                 pass
+            
+            # 等待最终结果
+            if self.final_timeout > 0:
+                final_fut = asyncio.run_coroutine_threadsafe(self.service.wait_final(self.final_timeout), self.loop)
+                try:
+                    final_fut.result(timeout=self.final_timeout + 1)
+                except Exception:
+                    pass
 
             disc_fut = asyncio.run_coroutine_threadsafe(self.service.disconnect(), self.loop)
-            # 等待 disconnect 完成，确保所有任务已清理
+            # 等待 disconnect 完成，确保本会话的任务已清理
             try:
                 disc_fut.result(timeout=10)
             except Exception:
                 pass
-
-            # 停止事件循环
-            try:
-                self.loop.call_soon_threadsafe(self.loop.stop)
-            except Exception:
-                pass
+        
+        # 汇总本会话的延迟指标（仅统计成功启动的会话）
+        if self.timeline and self.startup_seconds is not None:
+            self.timeline.finish()
     
     @property
     def is_connected(self):
-        """是否已连接"""
-        return self.service.is_connected
+        """是否已连接（断线重连进行中也视为已连接，期间的音频在队列中等待）"""
+        return self.service.is_connected or self.service.reconnecting
@@ -0,0 +1,221 @@
+"""
+语音识别会话管理器
+按 Socket.IO 连接（sid）为每个说话人维护独立的语音识别会话
+"""
+import threading
+from collections import deque
+from typing import Optional, Callable, Dict, Any
+
+from services.speech_recognition_service import SpeechRecognitionService, SpeechRecognitionSyncWrapper
+from services.speech_loop_host import SpeechLoopHost
+from services.speech_connection_pool import SpeechConnectionPool
+from services.voice_metrics import VoiceMetrics
+
+
+class SpeechSessionManager:
+    """按 sid 管理语音识别会话，每个活跃说话人独占一个 SpeechRecognitionService"""
+
+    def __init__(self, app_id: str, access_key: str, secret_key: str, model_id: str, max_sessions: int = 50,
+                 loop_host: Optional[SpeechLoopHost] = None, service_options: Optional[Dict[str, Any]] = None,
+                 pool_size: int = 0, pool_idle_ttl: float = 20.0, connect_timeout: float = 12.0,
+                 ingest_max_frames: int = 50, ingest_policy: str = 'drop_oldest'):
+        self.app_id = app_id
+        self.access_key = access_key
+        self.secret_key = secret_key
+        self.model_id = model_id
+        self.max_sessions = max_sessions
+        self.connect_timeout = connect_timeout
+        self.ingest_max_frames = ingest_max_frames
+        self.ingest_policy = ingest_policy
+        # 所有会话共享的事件循环宿主
+        self.loop_host = loop_host or SpeechLoopHost()
+        # 透传给每个 SpeechRecognitionService 的选项（如 compression、vad_enabled）
+        self.service_options = dict(service_options or {})
+
+        self._sessions: Dict[str, SpeechRecognitionSyncWrapper] = {}
+        self._lock = threading.Lock()
+
+        # 启动耗时统计（最近 N 次）
+        self._startup_times = deque(maxlen=500)
+        self._startups_total = 0
+        self._startups_pooled = 0
+        self._startup_failures = 0
+        # 已结束会话的接收队列丢弃计数（累计）
+        self._ingest_dropped_total = 0
+        self._ingest_dropped_bytes_total = 0
+        # 已结束会话的断线重连次数（累计）
+        self._reconnects_total = 0
+        # 延迟直方图（首个中间结果、停止后最终结果、上行帧率）
+        self.metrics = VoiceMetrics()
+
+        # 可选的预热连接池
+        self.connection_pool = None
+        if pool_size > 0:
+            self.connection_pool = SpeechConnectionPool(
+                self.loop_host, self._create_service, size=pool_size, idle_ttl=pool_idle_ttl
+            )
+            self.connection_pool.start()
+
+    def update_credentials(self, app_id: str, access_key: str, secret_key: str, model_id: str):
+        """更新凭据（仅对之后新建的会话生效，不影响正在进行的会话）"""
+        with self._lock:
+            self.app_id = app_id
+            self.access_key = access_key
+            self.secret_key = secret_key
+            self.model_id = model_id
+        # 预热连接使用的是旧凭据，全部作废
+        if self.connection_pool:
+            self.connection_pool.clear()
+
+    def _create_service(self) -> SpeechRecognitionService:
+        """创建未连接的识别服务（供预热连接池使用）"""
+        return SpeechRecognitionService(
+            self.app_id, self.access_key, self.secret_key, self.model_id, **self.service_options
+        )
+
+    def _create_session(self) -> SpeechRecognitionSyncWrapper:
+        """创建新的语音识别会话"""
+        return SpeechRecognitionSyncWrapper(
+            app_id=self.app_id,
+            access_key=self.access_key,
+            secret_key=self.secret_key,
+            model_id=self.model_id,
+            loop_host=self.loop_host,
+            connection_pool=self.connection_pool,
+            connect_timeout=self.connect_timeout,
+            ingest_max_frames=self.ingest_max_frames,
+            ingest_policy=self.ingest_policy,
+            timeline=self.metrics.new_session(),
+            **self.service_options
+        )
+
+    def start(self, sid: str, on_result: Optional[Callable] = None, on_error: Optional[Callable] = None,
+              on_auto_end: Optional[Callable] = None, sample_rate: int = 16000,
+              channels: int = 1) -> SpeechRecognitionSyncWrapper:
+        """为指定连接启动语音识别会话（如已存在旧会话则先关闭）
+
+        sample_rate / channels 为客户端声明的实际音频格式。
+        """
+        self.stop(sid)
+
+        with self._lock:
+            if len(self._sessions) >= self.max_sessions:
+                raise Exception(f"语音识别会话数已达上限（{self.max_sessions}），请稍后重试")
+            session = self._create_session()
+            # 先占位，避免并发启动时超出上限
+            self._sessions[sid] = session
+
+        try:
+            session.start(on_result=on_result, on_error=on_error, on_auto_end=on_auto_end,
+                          sample_rate=sample_rate, channels=channels)
+        except Exception:
+            with self._lock:
+                if self._sessions.get(sid) is session:
+                    del self._sessions[sid]
+                self._startup_failures += 1
+            session.stop()
+            raise
+
+        with self._lock:
+            self._startups_total += 1
+            if session.leased_from_pool:
+                self._startups_pooled += 1
+            if session.startup_seconds is not None:
+                self._startup_times.append(session.startup_seconds)
+        return session
+
+    def get(self, sid: str) -> Optional[SpeechRecognitionSyncWrapper]:
+        """获取指定连接的会话"""
+        with self._lock:
+            return self._sessions.get(sid)
+
+    def send_audio(self, sid: str, audio_data) -> bool:
+        """向指定连接的会话发送音频，会话不存在或未连接时返回 False"""
+        session = self.get(sid)
+        if not session or not session.is_connected:
+            return False
+        session.send_audio(audio_data)
+        return True
+
+    def _record_finished(self, session: SpeechRecognitionSyncWrapper):
+        """累计已结束会话的队列丢弃计数与重连次数"""
+        with self._lock:
+            self._reconnects_total += session.service.reconnects
+        if session.ingest_queue is not None:
+            queue_stats = session.ingest_queue.stats()
+            with self._lock:
+                self._ingest_dropped_total += queue_stats['dropped']
+                self._ingest_dropped_bytes_total += queue_stats['dropped_bytes']
+
+    def stop(self, sid: str) -> bool:
+        """停止并移除指定连接的会话，返回是否存在已连接的会话"""
+        with self._lock:
+            session = self._sessions.pop(sid, None)
+        if not session:
+            return False
+        was_connected = session.is_connected
+        session.stop()
+        self._record_finished(session)
+        return was_connected
+
+    def stop_all(self):
+        """停止所有会话"""
+        with self._lock:
+            sessions = list(self._sessions.values())
+            self._sessions.clear()
+        for session in sessions:
+            try:
+                session.stop()
+                self._record_finished(session)
+            except Exception as e:
+                print(f"[X] 关闭语音识别会话失败: {str(e)}")
+
+    @property
+    def active_count(self) -> int:
+        """当前会话数"""
+        with self._lock:
+            return len(self._sessions)
+
+    def metrics_snapshot(self) -> Dict[str, Any]:
+        """语音链路延迟直方图"""
+        snapshot = self.metrics.snapshot()
+        snapshot['active_sessions'] = self.active_count
+        return snapshot
+
+    def stats(self) -> Dict[str, Any]:
+        """会话与启动耗时统计"""
+        with self._lock:
+            times = sorted(self._startup_times)
+            queues = [session.ingest_queue.stats() for session in self._sessions.values()
+                      if session.ingest_queue is not None]
+            stats = {
+                'active_sessions': len(self._sessions),
+                'max_sessions': self.max_sessions,
+                'reconnects_total': self._reconnects_total + sum(
+                    session.service.reconnects for session in self._sessions.values()
+                ),
+                'startup': {
+                    'total': self._startups_total,
+                    'pooled': self._startups_pooled,
+                    'failures': self._startup_failures,
+                    'recent_count': len(times),
+                    'last_ms': round(self._startup_times[-1] * 1000, 1) if times else None,
+                    'avg_ms': round(sum(times) / len(times) * 1000, 1) if times else None,
+                    'p50_ms': round(times[len(times) // 2] * 1000, 1) if times else None,
+                    'p95_ms': round(times[min(len(times) - 1, int(len(times) * 0.95))] * 1000, 1) if times else None,
+                    'max_ms': round(times[-1] * 1000, 1) if times else None
+                },
+                'ingest': {
+                    'policy': self.ingest_policy,
+                    'max_frames': self.ingest_max_frames,
+                    'depth': sum(q['depth'] for q in queues),
+                    'max_depth': max((q['max_depth'] for q in queues), default=0),
+                    'dropped_active': sum(q['dropped'] for q in queues),
+                    'coalesced_active': sum(q['coalesced'] for q in queues),
+                    'dropped_total': self._ingest_dropped_total + sum(q['dropped'] for q in queues),
+                    'dropped_bytes_total': self._ingest_dropped_bytes_total + sum(q['dropped_bytes'] for q in queues)
+                }
+            }
+        if self.connection_pool:
+            stats['pool'] = self.connection_pool.stats()
+        return stats
@@ -0,0 +1,118 @@
+"""
+服务端语音活动检测（VAD）
+基于短时能量 + 过零率的向量化检测，用于在音频送往 ASR 之前压缩静音段
+"""
+from typing import Optional
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+class VoiceActivityDetector:
+    """能量 / 过零率 VAD
+
+    每帧（如 200ms）切分为若干个 20ms 子窗口，一次性向量化计算每个子窗口的
+    能量（dBFS）与过零率；有足够多子窗口判为有声时，整帧判为语音。
+    阈值取固定下限与自适应噪声底噪 + 余量中的较大值。
+    """
+
+    def __init__(self, sample_rate: int = 16000, window_ms: int = 20,
+                 energy_threshold_db: float = -50.0, noise_margin_db: float = 10.0,
+                 zcr_max: float = 0.35, min_voiced_windows: int = 2):
+        if np is None:
+            raise ImportError("语音活动检测需要 numpy: pip install numpy")
+        self.sample_rate = sample_rate
+        self.window = max(1, sample_rate * window_ms // 1000)
+        self.energy_threshold_db = energy_threshold_db
+        self.noise_margin_db = noise_margin_db
+        self.zcr_max = zcr_max
+        self.min_voiced_windows = min_voiced_windows
+        self.noise_floor_db: Optional[float] = None
+
+    def is_speech(self, frame) -> bool:
+        """判断一帧 16bit 单声道 PCM 是否包含语音"""
+        samples = np.frombuffer(frame, dtype='<i2')
+        usable = len(samples) - len(samples) % self.window
+        if usable == 0:
+            return False
+        windows = samples[:usable].reshape(-1, self.window).astype(np.float32)
+
+        # 短时能量（dBFS）
+        power = np.mean(windows * windows, axis=1)
+        energy_db = 10.0 * np.log10(power / (32768.0 * 32768.0) + 1e-12)
+
+        # 过零率：相邻采样符号变化的比例（清音/噪声的过零率偏高）
+        signs = np.signbit(windows)
+        zcr = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / (self.window - 1)
+
+        threshold = self.energy_threshold_db
+        if self.noise_floor_db is not None:
+            threshold = max(threshold, self.noise_floor_db + self.noise_margin_db)
+
+        voiced = (energy_db > threshold) & (zcr < self.zcr_max)
+        speech = int(np.count_nonzero(voiced)) >= self.min_voiced_windows
+
+        # 以静音帧的最低能量更新噪声底噪（缓慢上升、快速下降）
+        quietest = float(np.min(energy_db))
+        if self.noise_floor_db is None:
+            self.noise_floor_db = quietest
+        elif quietest < self.noise_floor_db:
+            self.noise_floor_db = quietest
+        elif not speech:
+            self.noise_floor_db += 0.05 * (quietest - self.noise_floor_db)
+        return speech
+
+    def reset(self):
+        self.noise_floor_db = None
+
+
+class SilenceGate:
+    """静音门：决定每帧是发送、以保活包替代还是丢弃，并判断是否应自动结束
+
+    - 语音帧及其后 hangover_frames 帧照常发送（保留尾音上下文）
+    - 更长的静音只每隔 keepalive_frames 帧发送一个很短的静音保活包
+    - 检测到语音后，若连续静音达到 end_silence_frames（>0）则请求自动结束
+    """
+
+    SEND = 'send'
+    KEEPALIVE = 'keepalive'
+    DROP = 'drop'
+
+    def __init__(self, detector: VoiceActivityDetector, hangover_frames: int = 2,
+                 keepalive_frames: int = 5, end_silence_frames: int = 0):
+        self.detector = detector
+        self.hangover_frames = hangover_frames
+        self.keepalive_frames = max(1, keepalive_frames)
+        self.end_silence_frames = end_silence_frames
+        self.reset()
+
+    def reset(self):
+        self.detector.reset()
+        self.heard_speech = False
+        self.silent_frames = 0
+        self.frames_total = 0
+        self.frames_skipped = 0
+
+    def process(self, frame) -> str:
+        """处理一帧，返回 SEND / KEEPALIVE / DROP"""
+        self.frames_total += 1
+        if self.detector.is_speech(frame):
+            self.heard_speech = True
+            self.silent_frames = 0
+            return self.SEND
+
+        self.silent_frames += 1
+        if self.silent_frames <= self.hangover_frames:
+            return self.SEND
+        self.frames_skipped += 1
+        if (self.silent_frames - self.hangover_frames - 1) % self.keepalive_frames == 0:
+            return self.KEEPALIVE
+        return self.DROP
+
+    @property
+    def should_end(self) -> bool:
+        """是否已满足自动结束条件"""
+        return (self.end_silence_frames > 0 and self.heard_speech
+                and self.silent_frames >= self.end_silence_frames)
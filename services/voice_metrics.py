@@ -0,0 +1,141 @@
+"""
+语音链路延迟指标
+按会话记录关键时间点（收到音频帧、发往 ASR、首个中间结果、最终结果），
+汇总为直方图：首个中间结果延迟、停止后最终结果延迟、每会话上行帧率
+"""
+import threading
+import time
+from typing import Dict, Any, Optional
+
+from services.metrics import Histogram
+
+
+# 毫秒延迟直方图的桶上界
+LATENCY_BUCKETS_MS = (25, 50, 100, 200, 300, 500, 750, 1000, 1500, 2500, 5000, 10000)
+# 帧率直方图的桶上界（帧/秒，实时推流约 5 帧/秒）
+RATE_BUCKETS = (1, 2, 3, 4, 5, 6, 8, 10, 20, 50)
+
+
+class VoiceMetrics:
+    """语音识别延迟指标汇总（所有会话共享）"""
+
+    def __init__(self):
+        self.time_to_first_partial_ms = Histogram(LATENCY_BUCKETS_MS)
+        self.final_lag_ms = Histogram(LATENCY_BUCKETS_MS)
+        self.frames_per_second = Histogram(RATE_BUCKETS)
+        self._lock = threading.Lock()
+        self.sessions = 0
+        self.sessions_without_final = 0
+        self.frames_received = 0
+        self.frames_sent = 0
+        self.started_at = time.time()
+
+    def new_session(self) -> 'SessionTimeline':
+        return SessionTimeline(self)
+
+    def _session_finished(self, timeline: 'SessionTimeline'):
+        with self._lock:
+            self.sessions += 1
+            self.frames_received += timeline.frames_received
+            self.frames_sent += timeline.frames_sent
+            if timeline.final_at is None and timeline.frames_sent:
+                self.sessions_without_final += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            counters = {
+                'sessions_finished': self.sessions,
+                'sessions_without_final': self.sessions_without_final,
+                'frames_received': self.frames_received,
+                'frames_sent': self.frames_sent,
+                'uptime_seconds': round(time.time() - self.started_at, 1)
+            }
+        return {
+            **counters,
+            'time_to_first_partial_ms': self.time_to_first_partial_ms.snapshot(),
+            'final_lag_ms': self.final_lag_ms.snapshot(),
+            'frames_per_second': self.frames_per_second.snapshot()
+        }
+
+
+class SessionTimeline:
+    """单个识别会话的时间点记录（time.monotonic()）
+
+    - frame_received：Socket.IO 收到客户端音频帧
+    - frame_sent：音频包发往 ASR
+    - result：收到识别结果（首个中间结果 / 最终结果）
+    - stop_requested / end_sent：客户端请求停止 / 已向 ASR 发送结束信号
+    """
+
+    def __init__(self, metrics: Optional[VoiceMetrics] = None):
+        self.metrics = metrics
+        self.first_frame_received: Optional[float] = None
+        self.last_frame_received: Optional[float] = None
+        self.first_frame_sent: Optional[float] = None
+        self.last_frame_sent: Optional[float] = None
+        self.first_partial_at: Optional[float] = None
+        self.stop_requested_at: Optional[float] = None
+        self.end_sent_at: Optional[float] = None
+        self.final_at: Optional[float] = None
+        self.frames_received = 0
+        self.frames_sent = 0
+        self._finished = False
+
+    def frame_received(self):
+        now = time.monotonic()
+        if self.first_frame_received is None:
+            self.first_frame_received = now
+        self.last_frame_received = now
+        self.frames_received += 1
+
+    def frame_sent(self):
+        now = time.monotonic()
+        if self.first_frame_sent is None:
+            self.first_frame_sent = now
+        self.last_frame_sent = now
+        self.frames_sent += 1
+
+    def stop_requested(self):
+        if self.stop_requested_at is None:
+            self.stop_requested_at = time.monotonic()
+
+    def end_sent(self):
+        if self.end_sent_at is None:
+            self.end_sent_at = time.monotonic()
+
+    def result(self, is_final: bool):
+        now = time.monotonic()
+        if is_final:
+            if self.final_at is not None:
+                return
+            self.final_at = now
+            # 用户停止录音（或 VAD 自动结束时发送结束信号）到最终结果
+            stopped = self.stop_requested_at or self.end_sent_at
+            if stopped is not None and self.metrics:
+                self.metrics.final_lag_ms.observe((now - stopped) * 1000)
+            return
+        if self.first_partial_at is None:
+            self.first_partial_at = now
+            start = self.first_frame_received or self.first_frame_sent
+            if start is not None and self.metrics:
+                self.metrics.time_to_first_partial_ms.observe((now - start) * 1000)
+
+    @property
+    def frames_per_second(self) -> Optional[float]:
+        """上行帧率（发往 ASR 的帧数 / 首末帧间隔）"""
+        if self.frames_sent < 2:
+            return None
+        span = self.last_frame_sent - self.first_frame_sent
+        return (self.frames_sent - 1) / span if span > 0 else None
+
+    def finish(self):
+        """会话结束时汇总（只生效一次）"""
+        if self._finished:
+            return
+        self._finished = True
+        if not self.metrics:
+            return
+        rate = self.frames_per_second
+        if rate is not None:
+            self.metrics.frames_per_second.observe(rate)
+        self.metrics._session_finished(self)
@@ -3,6 +3,8 @@ let map = null;
 let markers = [];
 let currentUser = null;
 let socket = null;
+// 当前识别文本（用于还原增量下发的中间结果）
+let recognitionText = '';
 // 防止重复提交生成旅行计划
 let isGeneratingPlan = false;
 // isRecording 现在由 audio-recorder.js 管理
@@ -105,7 +107,13 @@ function initSocket() {
         const inputElement = document.getElementById('travelInput');
         const voiceBtn = document.getElementById('generatePlanFromVoiceBtn');
         
-        const text = data.text;
+        // 中间结果可能以增量形式下发：已有文本[:offset] + delta
+        if (typeof data.text === 'string') {
+            recognitionText = data.text;
+        } else if (typeof data.delta === 'string') {
+            recognitionText = recognitionText.slice(0, data.offset || 0) + data.delta;
+        }
+        const text = recognitionText;
         const isFinal = data.is_final;
         
         console.log(`[语音识别] ${isFinal ? '最终' : '临时'}结果:`, text);
@@ -162,6 +170,19 @@ function initSocket() {
         }
     });
     
+    // 服务端检测到尾部静音后自动结束识别：停止本地录音，等待最终结果
+    socket.on('recording_auto_stopped', (data) => {
+        console.log('[语音识别]', data.message);
+        if (window.AudioRecorder && window.AudioRecorder.isRecording) {
+            window.AudioRecorder.stopStreamingRecording();
+        }
+        stopRecordingUI();
+        const voiceBtn = document.getElementById('generatePlanFromVoiceBtn');
+        if (voiceBtn) {
+            voiceBtn.style.display = 'block';
+        }
+    });
+    
     socket.on('recording_stopped', (data) => {
         console.log('[豆包] 对话已停止:', data.message);
         stopRecordingUI();
@@ -286,6 +307,7 @@ function switchInputMethod(method) {
 async function startRecording() {
     try {
         // 清空之前的结果
+        recognitionText = '';
         const resultElement = document.getElementById('recognitionResult');
         if (resultElement) {
             resultElement.textContent = '';
@@ -301,8 +323,11 @@ async function startRecording() {
             throw new Error('录音模块未加载');
         }
         
+        // 先打开麦克风和音频上下文，告知服务器实际的音频格式
+        const audioFormat = await window.AudioRecorder.prepareStreamingRecording();
+        
         // 通知服务器开始录音
-        socket.emit('start_recording');
+        socket.emit('start_recording', audioFormat);
         
         // 等待服务器确认
         await new Promise((resolve, reject) => {
@@ -340,6 +365,10 @@ async function startRecording() {
             alert(errorMsg);
         }
         
+        // 释放已打开的麦克风和音频上下文
+        if (window.AudioRecorder) {
+            window.AudioRecorder.stopStreamingRecording();
+        }
         stopRecordingUI();
         
         // 自动切换到文字输入模式
@@ -430,6 +459,7 @@ async function generateTravelPlan() {
     // 防止并发重复提交
     if (isGeneratingPlan) return;
     isGeneratingPlan = true;
+    streamingPlan = null;
 
     // 禁用生成按钮，显示按钮内 spinner，防止多次点击
     const genBtn = document.getElementById('generatePlanBtn');
@@ -448,20 +478,12 @@ async function generateTravelPlan() {
     showLoading();
 
     try {
-        const response = await fetch('/api/travel/plan', {
-            method: 'POST',
-            headers: {
-                'Content-Type': 'application/json'
-            },
-            body: JSON.stringify({
-                input: input,
-                user_id: currentUser?.id,
-                departure_date: departureDate || null,
-                trip_days: tripDays || null
-            })
-        });
-
-        const data = await response.json();
+        const data = await requestTravelPlan({
+            input: input,
+            user_id: currentUser?.id,
+            departure_date: departureDate || null,
+            trip_days: tripDays || null
+        }, handleStreamingPlanEvent);
         hideLoading();
 
         if (data.success) {
@@ -492,8 +514,130 @@ async function generateTravelPlan() {
     }
 }
 
+// 请求生成旅行计划：优先使用流式接口（边生成边显示进度），不支持时回退到普通接口
+// onEvent 接收流式接口解析出的 item / field 事件（如已完成的某一天行程）
+async function requestTravelPlan(body, onEvent) {
+    const init = {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/json'
+        },
+        body: JSON.stringify(body)
+    };
+
+    if (!window.ReadableStream || !window.TextDecoder) {
+        const response = await fetch('/api/travel/plan', init);
+        return response.json();
+    }
+
+    const response = await fetch('/api/travel/plan/stream', init);
+    if (!response.ok || !response.body) {
+        return response.json();
+    }
+
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffered = '';
+    let received = '';
+    let result = { success: false, message: '生成中断，未收到完整计划' };
+
+    const handleLine = (line) => {
+        if (!line.trim()) return;
+        const event = JSON.parse(line);
+        if (event.type === 'delta') {
+            received += event.content;
+            updateLoadingProgress(`已生成 ${received.length} 字：${received.slice(-60).replace(/\s+/g, ' ')}`);
+        } else if (event.type === 'item' || event.type === 'field') {
+            if (onEvent) onEvent(event);
+        } else if (event.type === 'plan') {
+            result = { success: true, plan: event.plan };
+        } else if (event.type === 'error') {
+            result = { success: false, message: event.message };
+        }
+    };
+
+    while (true) {
+        const { done, value } = await reader.read();
+        if (done) break;
+        buffered += decoder.decode(value, { stream: true });
+        const lines = buffered.split('\n');
+        buffered = lines.pop();
+        lines.forEach(handleLine);
+    }
+    handleLine(buffered + decoder.decode());
+    return result;
+}
+
+// 流式生成中的计划（已收到的顶层字段），完整计划到达后由 displayTravelPlan 重新渲染
+let streamingPlan = null;
+
+// 处理流式接口的增量事件：每完成一天行程就渲染并在地图上标记，不等整份计划生成完
+function handleStreamingPlanEvent(event) {
+    if (!streamingPlan) {
+        streamingPlan = {};
+    }
+    if (event.type === 'field') {
+        streamingPlan[event.key] = event.value;
+    } else if (event.key === 'itinerary') {
+        if (event.index === 0) {
+            // 第一天行程到达：关闭遮罩，开始逐天显示
+            hideLoading();
+            clearMarkers();
+            document.getElementById('planContent').innerHTML = '';
+            document.getElementById('planDetails').style.display = 'block';
+        }
+        renderItineraryDay(event.value, document.getElementById('planContent'));
+        if (markers.length > 0) {
+            map.setFitView(markers);
+        }
+    } else {
+        return;
+    }
+    if (streamingPlan.destination || event.key === 'itinerary') {
+        const dest = streamingPlan.destination || '旅行计划';
+        document.getElementById('planTitle').textContent = `${dest}（生成中...）`;
+    }
+}
+
+// 渲染一天的行程并在地图上标记位置
+function renderItineraryDay(day, planContent) {
+    const dayDiv = document.createElement('div');
+    dayDiv.className = 'itinerary-day';
+    
+    dayDiv.innerHTML = `
+        <div class="day-header">第${day.day}天 - ${day.date || ''}</div>
+        ${day.activities ? day.activities.map(activity => `
+            <div class="activity-item">
+                <div class="activity-time">${activity.time || ''}</div>
+                <div class="activity-name">${activity.name || ''}</div>
+                <div class="activity-description">${activity.description || ''}</div>
+                ${activity.location ? `<div>📍 ${activity.location.name || ''}</div>` : ''}
+                ${activity.cost ? `<div class="activity-cost">💰 ¥${activity.cost}</div>` : ''}
+            </div>
+        `).join('') : ''}
+        ${day.total_cost ? `<div style="text-align: right; margin-top: 0.5rem; font-weight: bold;">当日总费用: ¥${day.total_cost}</div>` : ''}
+    `;
+    
+    planContent.appendChild(dayDiv);
+    
+    // 在地图上标记位置
+    if (day.activities) {
+        day.activities.forEach(activity => {
+            if (activity.location && activity.location.lng && activity.location.lat) {
+                addMarker(
+                    activity.location.lng,
+                    activity.location.lat,
+                    activity.name || '',
+                    activity.description || ''
+                );
+            }
+        });
+    }
+}
+
 // 显示旅行计划
 function displayTravelPlan(plan) {
+    streamingPlan = null;
     // 清除旧标记
     clearMarkers();
     
@@ -511,40 +655,7 @@ function displayTravelPlan(plan) {
     
     // 生成行程内容
     if (plan.itinerary && plan.itinerary.length > 0) {
-        plan.itinerary.forEach(day => {
-            const dayDiv = document.createElement('div');
-            dayDiv.className = 'itinerary-day';
-            
-            dayDiv.innerHTML = `
-                <div class="day-header">第${day.day}天 - ${day.date || ''}</div>
-                ${day.activities ? day.activities.map(activity => `
-                    <div class="activity-item">
-                        <div class="activity-time">${activity.time || ''}</div>
-                        <div class="activity-name">${activity.name || ''}</div>
-                        <div class="activity-description">${activity.description || ''}</div>
-                        ${activity.location ? `<div>📍 ${activity.location.name || ''}</div>` : ''}
-                        ${activity.cost ? `<div class="activity-cost">💰 ¥${activity.cost}</div>` : ''}
-                    </div>
-                `).join('') : ''}
-                ${day.total_cost ? `<div style="text-align: right; margin-top: 0.5rem; font-weight: bold;">当日总费用: ¥${day.total_cost}</div>` : ''}
-            `;
-            
-            planContent.appendChild(dayDiv);
-            
-            // 在地图上标记位置
-            if (day.activities) {
-                day.activities.forEach(activity => {
-                    if (activity.location && activity.location.lng && activity.location.lat) {
-                        addMarker(
-                            activity.location.lng,
-                            activity.location.lat,
-                            activity.name || '',
-                            activity.description || ''
-                        );
-                    }
-                });
-            }
-        });
+        plan.itinerary.forEach(day => renderItineraryDay(day, planContent));
     }
     
     // 显示预算信息（如果为0或未指定则显示友好提示）
@@ -663,9 +774,17 @@ async function loadPlan(planId) {
 
 // 加载提示
 function showLoading() {
+    updateLoadingProgress('');
     document.getElementById('loadingOverlay').style.display = 'flex';
 }
 
+function updateLoadingProgress(text) {
+    const progress = document.getElementById('loadingProgress');
+    if (progress) {
+        progress.textContent = text;
+    }
+}
+
 function hideLoading() {
     document.getElementById('loadingOverlay').style.display = 'none';
 }
@@ -9,35 +9,81 @@ let audioContextRecorder = null;
 let audioSource = null;
 let audioProcessor = null;
 let isRecording = false;
+// 音频传输方式：'binary'（默认，直接发送 ArrayBuffer）或 'base64'（兼容模式）
+let audioTransport = 'binary';
 
 /**
- * 开始流式录音（直接生成 PCM）
- * @param {Socket} socket - Socket.IO 连接
- * @returns {Promise<MediaStream>}
+ * 将 Int16 PCM 转为 Base64（兼容模式使用）
+ * @param {Int16Array} pcmData
+ * @returns {string}
  */
-async function startStreamingRecording(socket) {
+function pcmToBase64(pcmData) {
+    const bytes = new Uint8Array(pcmData.buffer);
+    let binary = '';
+    // 分块转换，避免逐字节拼接字符串
+    const chunkSize = 0x8000;
+    for (let i = 0; i < bytes.length; i += chunkSize) {
+        binary += String.fromCharCode.apply(null, bytes.subarray(i, i + chunkSize));
+    }
+    return btoa(binary);
+}
+
+/**
+ * 准备录音：获取麦克风并创建音频上下文（不开始发送）
+ * 浏览器可能忽略 16kHz 的请求，返回实际采样率供服务端重采样
+ * @returns {Promise<{sample_rate: number, channels: number}>}
+ */
+async function prepareStreamingRecording() {
+    if (audioContextRecorder && audioSource) {
+        return { sample_rate: audioContextRecorder.sampleRate, channels: 1 };
+    }
     try {
         // 获取麦克风流
         audioStream = await navigator.mediaDevices.getUserMedia({ 
             audio: {
                 channelCount: 1,
-                sampleRate: 16000,  // 语音识别要求 16kHz
+                sampleRate: 16000,  // 语音识别要求 16kHz（浏览器不一定遵守）
                 echoCancellation: true,
                 noiseSuppression: true,
                 autoGainControl: true
             } 
         });
         
-        // 创建音频上下文
-        audioContextRecorder = new (window.AudioContext || window.webkitAudioContext)({
-            sampleRate: 16000  // 直接使用 16kHz
-        });
+        const AudioContextClass = window.AudioContext || window.webkitAudioContext;
+        try {
+            // 优先直接使用 16kHz，省去服务端重采样
+            audioContextRecorder = new AudioContextClass({ sampleRate: 16000 });
+            audioSource = audioContextRecorder.createMediaStreamSource(audioStream);
+        } catch (error) {
+            // 部分浏览器不支持与麦克风不同的采样率，退回设备默认采样率
+            if (audioContextRecorder) {
+                audioContextRecorder.close();
+            }
+            audioContextRecorder = new AudioContextClass();
+            audioSource = audioContextRecorder.createMediaStreamSource(audioStream);
+        }
+        
+        // ScriptProcessorNode 只取 1 个输入声道，发送的总是单声道
+        return { sample_rate: audioContextRecorder.sampleRate, channels: 1 };
         
-        // 创建音频源
-        audioSource = audioContextRecorder.createMediaStreamSource(audioStream);
+    } catch (error) {
+        console.error('[录音] 准备失败:', error);
+        stopStreamingRecording();
+        throw error;
+    }
+}
+
+/**
+ * 开始流式录音（直接生成 PCM，采样率为音频上下文的实际采样率）
+ * @param {Socket} socket - Socket.IO 连接
+ * @returns {Promise<MediaStream>}
+ */
+async function startStreamingRecording(socket) {
+    try {
+        await prepareStreamingRecording();
         
         // 使用 ScriptProcessorNode 获取原始音频数据
-        // 缓冲区大小：4096 samples (约 256ms @ 16kHz)
+        // 缓冲区大小：4096 samples (约 256ms @ 16kHz, 85ms @ 48kHz)
         audioProcessor = audioContextRecorder.createScriptProcessor(4096, 1, 1);
         
         audioProcessor.onaudioprocess = (event) => {
@@ -54,16 +100,12 @@ async function startStreamingRecording(socket) {
                 pcmData[i] = s < 0 ? s * 0x8000 : s * 0x7FFF;
             }
             
-            // 转换为 Base64
-            const bytes = new Uint8Array(pcmData.buffer);
-            let binary = '';
-            for (let i = 0; i < bytes.length; i++) {
-                binary += String.fromCharCode(bytes[i]);
+            // 发送给服务器：默认以二进制附件发送（ArrayBuffer），Base64 仅作兼容模式
+            if (audioTransport === 'base64') {
+                socket.emit('audio_data', pcmToBase64(pcmData));
+            } else {
+                socket.emit('audio_data', pcmData.buffer);
             }
-            const base64Audio = btoa(binary);
-            
-            // 发送给服务器
-            socket.emit('audio_data', base64Audio);
             // console.log('[录音] 发送PCM音频:', pcmData.length, 'samples');
         };
         
@@ -72,7 +114,7 @@ async function startStreamingRecording(socket) {
         audioProcessor.connect(audioContextRecorder.destination);
         
         isRecording = true;
-        console.log('[录音] 流式录音已启动 (PCM 16kHz)');
+        console.log(`[录音] 流式录音已启动 (PCM ${audioContextRecorder.sampleRate}Hz)`);
         return audioStream;
         
     } catch (error) {
@@ -115,8 +157,11 @@ function stopStreamingRecording() {
 
 // 导出函数
 window.AudioRecorder = {
+    prepareStreamingRecording,
     startStreamingRecording,
     stopStreamingRecording,
-    get isRecording() { return isRecording; }
+    get isRecording() { return isRecording; },
+    get transport() { return audioTransport; },
+    set transport(value) { audioTransport = value === 'base64' ? 'base64' : 'binary'; }
 };
 